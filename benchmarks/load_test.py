@@ -0,0 +1,510 @@
+"""
+End-to-end load test of the MCP server over streamable-http.
+
+Starts a mock Dropinbase (see mock_dropinbase.py) and `server/main.py` in HTTP
+mode, then runs `--users` concurrent simulated agent sessions that pick
+weighted scenarios (tree browsing, batch edits, doc loads and both wizards)
+for `--duration` seconds.
+
+Reported:
+- throughput (tool calls per second) and errors
+- p50/p95/p99 latency per tool
+- outbound amplification: requests to Dropinbase per tool call
+
+Usage (from the repository root):
+
+    python benchmarks/load_test.py --users 8 --duration 30 --output bench.json
+    python benchmarks/load_test.py --users 8 --duration 30 --baseline bench.json
+
+With `--baseline` the run is compared against an earlier report and the
+script exits with status 1 when a tool's p95 or the throughput regressed by
+more than `--tolerance`.
+
+Note: the wizards persist their state as usual, so a run overwrites the local
+wizard state files.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from mock_dropinbase import MockConfig, create_server
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FAILED_STATUSES = {"error", "validation_error", "partial"}
+
+DEFAULT_MIX = "tree=4,edits=2,docs=3,event_wizard=1,app_wizard=1"
+
+# Answers valid against the mock's saved responses
+EVENT_ANSWERS: dict[str, dict[str, Any]] = {
+    "select_event_trigger": {"item_event_trigger": "1"},
+    "select_dropin_or_new_dropin": {"dropin_choice": "new"},
+    "create_new_dropin": {"new_dropin_name": "loadtest"},
+    "function_name": {"function_name": "onLoadTest"},
+    "response_type": {"response_type": "actions"},
+    "add_confirmation_message": {"confirmation_message": "Are you sure?"},
+    "confirm_creation": {"confirm_creation": True},
+}
+APP_ANSWERS: dict[str, dict[str, Any]] = {
+    "choose_db": {"db_name": "5"},
+    "choose_base_container_template": {"base_container_template": "1"},
+    "set_base_container_name": {"base_container_name": "loadtest"},
+    "grid_forms_for_all_tables": {
+        "grids_for_all_tables": True,
+        "forms_for_all_tables": True,
+    },
+    "table_display_options_on_forms": {"table_display_on_forms": "none"},
+    "design_definitions_for_forms_and_grids": {
+        "form_design_definition": "6",
+        "grid_design_definition": "3",
+    },
+    "regular_expression_conversions": {
+        "regex_for_container_names": "^(.*)$",
+        "regex_for_container_captions": "^(.*)$",
+        "regex_for_item_names": "^(.*)$",
+        "regex_for_field_captions": "^(.*)$",
+    },
+    "configure_tables_for_db": {
+        "table_settings": [{"id": 185, "name": "orders", "ignore": False}]
+    },
+    "confirm_creation": {"confirm_creation": True},
+}
+
+
+@dataclass
+class ToolSample:
+    tool: str
+    seconds: float
+    ok: bool
+    # Size of the result as the model reads it (text content)
+    response_bytes: int = 0
+
+
+@dataclass
+class Recorder:
+    samples: list[ToolSample] = field(default_factory=list)
+
+    def add(self, tool: str, seconds: float, ok: bool, response_bytes: int = 0) -> None:
+        self.samples.append(ToolSample(tool, seconds, ok, response_bytes))
+
+
+def _result_json(result: Any) -> dict[str, Any]:
+    """The JSON object returned by a tool, structured or as text content."""
+    data = result.structuredContent
+    if data is None and result.content:
+        try:
+            data = json.loads(result.content[0].text)
+        except (AttributeError, ValueError):
+            data = None
+    if isinstance(data, dict) and set(data) == {"result"}:
+        data = data["result"]
+    return data if isinstance(data, dict) else {}
+
+
+class TimedSession:
+    """ClientSession wrapper that records the latency of every tool call."""
+
+    def __init__(self, session: ClientSession, recorder: Recorder) -> None:
+        self.session = session
+        self.recorder = recorder
+
+    async def call(self, tool: str, arguments: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        ok = False
+        response_bytes = 0
+        try:
+            result = await self.session.call_tool(tool, arguments)
+            # Tools report most failures in their result rather than as errors
+            status = _result_json(result).get("status")
+            ok = not result.isError and status not in FAILED_STATUSES
+            response_bytes = sum(
+                len(getattr(block, "text", "").encode()) for block in result.content
+            )
+            return result
+        finally:
+            self.recorder.add(tool, time.perf_counter() - started, ok, response_bytes)
+
+
+# Scenarios, each one a short realistic sequence of tool calls
+
+
+async def scenario_tree(session: TimedSession, rng: random.Random) -> None:
+    await session.call("get_all_avail_groups", {})
+    await session.call("get_all_avail_containers", {})
+    await session.call("get_project_tree", {"container_id": 1, "group_id": 1})
+    for _ in range(rng.randint(1, 3)):
+        node_id = str(rng.randint(1, 500))
+        await session.call(
+            "get_node_info_from_id_and_type", {"node_id": node_id, "node_type": "item"}
+        )
+
+
+async def scenario_edits(session: TimedSession, rng: random.Random) -> None:
+    await session.call("get_project_tree", {"container_id": 1, "group_id": 1})
+    for _ in range(rng.randint(3, 6)):
+        await session.call(
+            "update_node_info",
+            {
+                "node_id": str(rng.randint(1, 500)),
+                "field_name": "caption",
+                "value": f"Caption {rng.randint(1, 1000)}",
+                "root_container_id": 1,
+            },
+        )
+
+
+async def scenario_docs(session: TimedSession, rng: random.Random) -> None:
+    await session.call("list_dib_doc_topics", {})
+    listing = await session.call("list_dib_docs", {})
+    names = [doc["name"] for doc in _result_json(listing).get("docs", [])]
+    for name in rng.sample(names, min(2, len(names))):
+        await session.call("load_dib_doc", {"name": name})
+
+
+async def scenario_event_wizard(session: TimedSession, rng: random.Random) -> None:
+    await session.call(
+        "run_event_wizard",
+        {
+            "event_type": "item",
+            "event_side": "php",
+            "node_id": str(rng.randint(1, 500)),
+            "answers": EVENT_ANSWERS,
+        },
+    )
+
+
+async def scenario_app_wizard(session: TimedSession, rng: random.Random) -> None:
+    await session.call("run_application_wizard", {"answers": APP_ANSWERS})
+
+
+SCENARIOS: dict[str, Callable[[TimedSession, random.Random], Awaitable[None]]] = {
+    "tree": scenario_tree,
+    "edits": scenario_edits,
+    "docs": scenario_docs,
+    "event_wizard": scenario_event_wizard,
+    "app_wizard": scenario_app_wizard,
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(
+                f"Unknown scenario '{name}', choose from {list(SCENARIOS)}"
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def run_user(
+    url: str,
+    weights: dict[str, float],
+    deadline: float,
+    recorder: Recorder,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    names = list(weights)
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as client:
+            await client.initialize()
+            session = TimedSession(client, recorder)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(names, weights=[weights[n] for n in names])[0]
+                await SCENARIOS[scenario](session, rng)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"MCP server did not listen on port {port} within {timeout}s")
+
+
+def start_mcp_server(port: int, mock_url: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        MCP_TRANSPORT="http",
+        MCP_HOST="127.0.0.1",
+        MCP_PORT=str(port),
+        LOG_LEVEL="WARNING",
+        BASE_URL=mock_url,
+        REQUEST_VERIFICATION_TOKEN=env.get("REQUEST_VERIFICATION_TOKEN", "loadtest"),
+        EXPOSE_DIB_DOCS_VIA_TOOLS="true",
+    )
+    return subprocess.Popen(
+        [sys.executable, "server/main.py"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(
+    recorder: Recorder,
+    elapsed: float,
+    mock_stats: dict[str, Any],
+    config: dict[str, Any],
+) -> dict[str, Any]:
+    by_tool: dict[str, list[ToolSample]] = {}
+    for sample in recorder.samples:
+        by_tool.setdefault(sample.tool, []).append(sample)
+
+    tools: dict[str, Any] = {}
+    for tool, samples in sorted(by_tool.items()):
+        latencies = sorted(s.seconds * 1000 for s in samples)
+        tools[tool] = {
+            "count": len(samples),
+            "errors": sum(1 for s in samples if not s.ok),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "mean_response_bytes": round(
+                sum(s.response_bytes for s in samples) / len(samples)
+            ),
+        }
+
+    calls = len(recorder.samples)
+    outbound = mock_stats.get("requests", 0)
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": config,
+        "elapsed_seconds": round(elapsed, 2),
+        "tool_calls": calls,
+        "errors": sum(1 for s in recorder.samples if not s.ok),
+        "throughput_per_second": round(calls / elapsed, 2) if elapsed else 0.0,
+        "tools": tools,
+        "outbound": {
+            "requests": outbound,
+            "amplification": round(outbound / calls, 2) if calls else 0.0,
+            "by_endpoint": mock_stats.get("by_endpoint", {}),
+        },
+    }
+
+
+def compare_with_baseline(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float,
+) -> list[str]:
+    """Return one message per regression beyond `tolerance` (a fraction)."""
+    regressions: list[str] = []
+
+    old_tp = baseline.get("throughput_per_second") or 0
+    new_tp = report["throughput_per_second"]
+    if old_tp and new_tp < old_tp * (1 - tolerance):
+        regressions.append(f"throughput {old_tp}/s -> {new_tp}/s")
+
+    for tool, stats in report["tools"].items():
+        old = baseline.get("tools", {}).get(tool)
+        if not old:
+            continue
+        old_p95, new_p95 = old["p95_ms"], stats["p95_ms"]
+        if new_p95 > old_p95 * (1 + tolerance) and new_p95 - old_p95 > min_delta_ms:
+            regressions.append(f"{tool} p95 {old_p95}ms -> {new_p95}ms")
+
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(
+        f"\n{report['tool_calls']} tool calls in {report['elapsed_seconds']}s "
+        f"({report['throughput_per_second']}/s), {report['errors']} errors, "
+        f"{report['outbound']['requests']} outbound requests "
+        f"(x{report['outbound']['amplification']} per tool call)\n"
+    )
+    header = (
+        f"{'tool':<34}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'resp B':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for tool, s in report["tools"].items():
+        print(
+            f"{tool:<34}{s['count']:>7}{s['errors']:>5}"
+            f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+            f"{s.get('mean_response_bytes', 0):>9}"
+        )
+
+
+def _mock_control(mock_url: str, path: str, method: str = "GET") -> dict[str, Any]:
+    request = urllib.request.Request(
+        f"{mock_url}/__mock__/{path}",
+        method=method,
+        data=b"{}" if method == "POST" else None,
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    weights = parse_mix(args.mix)
+
+    mock_config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        expire_rate=args.expire_rate,
+    )
+    mock_server = create_server(port=0, config=mock_config)
+    threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+    mock_url = f"http://127.0.0.1:{mock_server.server_address[1]}"
+
+    port = _free_port()
+    process = start_mcp_server(port, mock_url)
+    url = f"http://127.0.0.1:{port}/mcp"
+
+    try:
+        _wait_for_port(port, timeout=30)
+
+        # Warm-up (imports, login, caches) is not part of the measurement
+        warmup = Recorder()
+        await run_user(url, weights, time.monotonic() + args.warmup, warmup, seed=-1)
+        _mock_control(mock_url, "reset", "POST")
+
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                run_user(url, weights, deadline, recorder, seed=args.seed + user)
+                for user in range(args.users)
+            )
+        )
+        elapsed = time.monotonic() - started
+        mock_stats = _mock_control(mock_url, "stats")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        mock_server.shutdown()
+
+    config = {
+        "users": args.users,
+        "duration": args.duration,
+        "mix": weights,
+        "mock": mock_stats.get("config", {}),
+    }
+    report = build_report(recorder, elapsed, mock_stats, config)
+    print_report(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(
+            report, baseline, args.tolerance, args.min_delta_ms
+        )
+        if regressions:
+            print(
+                f"\nRegressions against {args.baseline} (commit {baseline.get('commit')}):"
+            )
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print(
+            f"\nNo regressions against {args.baseline} (commit {baseline.get('commit')})."
+        )
+
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test the MCP server against a mock Dropinbase."
+    )
+    parser.add_argument(
+        "--users", type=int, default=4, help="Concurrent agent sessions."
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20.0, help="Measured seconds."
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=3.0, help="Unmeasured warm-up seconds."
+    )
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"Scenario weights, default '{DEFAULT_MIX}'."
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--latency-ms", type=float, default=10.0, help="Mock Dropinbase latency."
+    )
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--expire-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Compare against this earlier JSON report.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed regression, as a fraction.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore p95 changes smaller than this.",
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,735 @@
+"""
+Microbenchmarks of the hot in-process paths of the MCP server.
+
+Unlike load_test.py these run without a server or Dropinbase: each case builds
+a large synthetic input (10k-field validation configs, 500-step wizards,
+50k-record option lists, ...) and times one function on it, so algorithmic
+regressions show up long before they are noticeable end to end.
+
+Timing works like pytest-benchmark: every case is calibrated to run enough
+iterations per round to last at least `--min-time`, then `--rounds` rounds
+are measured. Reported per case (times per call): min, median, mean, stddev
+and operations per second.
+
+Usage (from the repository root):
+
+    python benchmarks/microbench.py --output micro.json
+    python benchmarks/microbench.py --baseline micro.json
+    python benchmarks/microbench.py --filter steps --rounds 10
+
+With `--baseline` the run is compared against an earlier report and the
+script exits with status 1 when a case's median regressed by more than
+`--tolerance`.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "server"))
+
+import requests  # noqa: E402
+
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+
+import endpoints  # noqa: E402
+from json_codec import JSON_BACKEND, response_json  # noqa: E402
+from response_shaping import (
+    ResponseProfile,
+    shape_response,
+    to_compact_json,
+)  # noqa: E402
+from resources.dib_docs.docs_resource_factory import register_dib_docs  # noqa: E402
+from resources.dib_docs.resource_registry import DOCS_BY_NAME  # noqa: E402
+from result_store import result_store  # noqa: E402
+from settings import Settings, get_settings, reload_settings  # noqa: E402
+from tools.designer.validate import Validation  # noqa: E402
+from tools.wizards.base.option_provider_base import (  # noqa: E402
+    extract_options_from_records,
+    register_option_provider,
+    resolve_dynamic_args,
+    resolve_options,
+)
+from tools.wizards.base.state_model import WizardState  # noqa: E402
+from tools.wizards.base.steps_manager import StepManager  # noqa: E402
+from tools.wizards.base.validation_base import validate_step_answers  # noqa: E402
+
+VALIDATION_FIELDS = 10_000
+WIZARD_STEPS = 500
+OPTION_RECORDS = 50_000
+DYNAMIC_ARGS = 1_000
+DOC_TOPICS = 20
+DOC_RESOURCES_PER_TOPIC = 100
+SETTINGS_LOOKUPS = 1_000
+ENDPOINT_TARGETS = 1_000
+TREE_FANOUT = 8  # 8 + 64 + 512 + 4096 nodes
+
+BENCH_PROVIDER = "microbench_records"
+
+# Providers registered by cases, the registry rejects registering twice
+CASES_STATE: set[str] = set()
+
+# Validator functions of tools.designer.validate.Validation with a valid sample value
+VALIDATORS: dict[str, str] = {
+    "_int": "-12",
+    "_pos_int": "12",
+    "_float": "1.5",
+    "_pos_float": "2.5",
+    "_str": "caption",
+    "_bool": "1",
+}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    rounds: int
+    iterations: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    stddev_s: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "iterations": self.iterations,
+            "min_ms": round(self.min_s * 1000, 4),
+            "median_ms": round(self.median_s * 1000, 4),
+            "mean_ms": round(self.mean_s * 1000, 4),
+            "stddev_ms": round(self.stddev_s * 1000, 4),
+            "ops_per_second": round(1 / self.median_s, 2) if self.median_s else None,
+        }
+
+
+# name -> factory building the synthetic input and returning the timed callable
+CASES: dict[str, Callable[[Path], Callable[[], Any]]] = {}
+
+
+def case(name: str):
+    def decorator(factory: Callable[[Path], Callable[[], Any]]):
+        CASES[name] = factory
+        return factory
+
+    return decorator
+
+
+def measure(
+    name: str, fn: Callable[[], Any], *, rounds: int, min_time: float
+) -> BenchResult:
+    """
+    Time `fn`: calibrate the iterations per round so a round takes at least
+    `min_time` seconds, then record `rounds` rounds.
+    """
+    fn()  # warm up (imports, caches, lazily built state)
+
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 10 if elapsed < min_time / 10 else 2
+
+    per_call: list[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - started) / iterations)
+
+    return BenchResult(
+        name=name,
+        rounds=rounds,
+        iterations=iterations,
+        min_s=min(per_call),
+        median_s=statistics.median(per_call),
+        mean_s=statistics.fmean(per_call),
+        stddev_s=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+    )
+
+
+# --- Validation (tools/designer/validate.py) ---
+
+
+def _write_validation_config(tmp: Path) -> Path:
+    names = list(VALIDATORS)
+    config = [
+        {
+            "fields": [f"field_{i}"],
+            "function": names[i % len(names)],
+            "nullable": i % 3 == 0,
+        }
+        for i in range(VALIDATION_FIELDS)
+    ]
+    path = tmp / "validation_config.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+def _validation_values() -> list[tuple[str, str]]:
+    names = list(VALIDATORS)
+    return [
+        (f"field_{i}", VALIDATORS[names[i % len(names)]])
+        for i in range(VALIDATION_FIELDS)
+    ]
+
+
+@case("validation.load_config_10k_fields")
+def bench_validation_load_config(tmp: Path) -> Callable[[], Any]:
+    validation = Validation(_write_validation_config(tmp))
+    return validation.load_config
+
+
+@case("validation.validate_10k_fields")
+def bench_validation_validate(tmp: Path) -> Callable[[], Any]:
+    validation = Validation(_write_validation_config(tmp))
+    values = _validation_values()
+
+    def run() -> None:
+        for field, value in values:
+            validation.validate(field, value)
+
+    return run
+
+
+@case("validation.validate_many_10k_fields")
+def bench_validation_validate_many(tmp: Path) -> Callable[[], Any]:
+    validation = Validation(_write_validation_config(tmp))
+    values = _validation_values()
+    return lambda: validation.validate_many(values)
+
+
+@case("validation.validate_step_answers_10k_fields")
+def bench_validate_step_answers(tmp: Path) -> Callable[[], Any]:
+    options = [{"value": str(i), "label": f"Option {i}"} for i in range(50)]
+    required_inputs: list[dict[str, Any]] = []
+    answers: dict[str, Any] = {}
+    for i in range(VALIDATION_FIELDS):
+        name = f"field_{i}"
+        kind = ("string", "boolean", "enum")[i % 3]
+        field: dict[str, Any] = {"name": name, "type": kind}
+        if kind == "enum":
+            field["options"] = options
+            answers[name] = str(i % 50)
+        else:
+            answers[name] = True if kind == "boolean" else "value"
+        required_inputs.append(field)
+
+    step_cfg = {"id": "bench_step", "required_inputs": required_inputs}
+    return lambda: validate_step_answers(step_cfg, answers)
+
+
+# --- StepManager (tools/wizards/base/steps_manager.py) ---
+
+
+def _synthetic_wizard() -> tuple[StepManager, dict[str, Any]]:
+    """
+    A wizard of WIZARD_STEPS steps where every other step is only included
+    when the step before it was answered with "yes".
+    """
+    steps: list[dict[str, Any]] = []
+    answers: dict[str, Any] = {}
+    for i in range(WIZARD_STEPS):
+        step: dict[str, Any] = {
+            "id": f"step_{i}",
+            "required_inputs": [{"name": "choice", "type": "string"}],
+        }
+        if i % 2 == 1:
+            step["include_if"] = {f"step_{i - 1}.choice": "yes"}
+        steps.append(step)
+        answers[f"step_{i}"] = {"choice": "yes" if i % 4 == 0 else "no"}
+    return StepManager({"steps": steps}), answers
+
+
+@case("steps.next_after_500_steps")
+def bench_steps_next_after(tmp: Path) -> Callable[[], Any]:
+    manager, answers = _synthetic_wizard()
+    step_ids = [f"step_{i}" for i in range(WIZARD_STEPS)]
+
+    def run() -> None:
+        for step_id in step_ids:
+            manager.next_after(step_id, previous_answers=answers)
+
+    return run
+
+
+@case("steps.is_included_500_steps")
+def bench_steps_is_included(tmp: Path) -> Callable[[], Any]:
+    manager, answers = _synthetic_wizard()
+    steps = manager._steps
+
+    def run() -> None:
+        for step in steps:
+            StepManager._is_included(step, answers)
+
+    return run
+
+
+@case("steps.included_path_500_steps")
+def bench_steps_included_path(tmp: Path) -> Callable[[], Any]:
+    manager, answers = _synthetic_wizard()
+    return lambda: manager.included_path(answers)
+
+
+# --- Option providers (tools/wizards/base/option_provider_base.py) ---
+
+
+def _synthetic_records() -> list[dict[str, Any]]:
+    return [
+        {"id": i, "id_display_value": f"Record {i}", "name": f"record_{i}"}
+        for i in range(OPTION_RECORDS)
+    ]
+
+
+@case("options.extract_options_from_records_50k")
+def bench_extract_options(tmp: Path) -> Callable[[], Any]:
+    records = _synthetic_records()
+    return lambda: extract_options_from_records(records)
+
+
+@case("options.resolve_options_static_50k")
+def bench_resolve_options_static(tmp: Path) -> Callable[[], Any]:
+    source_cfg = {
+        "type": "static",
+        "values": [f"value_{i}" for i in range(OPTION_RECORDS)],
+    }
+    return lambda: resolve_options(source_cfg, context={})
+
+
+@case("options.resolve_options_provider_50k")
+def bench_resolve_options_provider(tmp: Path) -> Callable[[], Any]:
+    records = _synthetic_records()
+
+    if BENCH_PROVIDER not in CASES_STATE:
+        # Uncached so every call runs the provider instead of hitting OPTION_CACHE
+        @register_option_provider(BENCH_PROVIDER, cache=False)
+        def microbench_records(*, context: dict | None = None, **kwargs: Any) -> list:
+            return extract_options_from_records(records)
+
+        CASES_STATE.add(BENCH_PROVIDER)
+
+    source_cfg = {
+        "type": "function",
+        "name": BENCH_PROVIDER,
+        "args": {"node_id": {"$from": "meta.node_id"}},
+    }
+    context = {"wizard_state": {"meta": {"node_id": 1}}}
+    return lambda: resolve_options(source_cfg, context=context)
+
+
+@case("options.resolve_dynamic_args_1k_args")
+def bench_resolve_dynamic_args(tmp: Path) -> Callable[[], Any]:
+    answers = {
+        f"step_{i}": {"field": {"nested": {"value": i}}} for i in range(DYNAMIC_ARGS)
+    }
+    ctx = {"wizard_state": {"answers": answers, "meta": {"node_id": 1}}}
+    args: dict[str, Any] = {}
+    for i in range(DYNAMIC_ARGS):
+        if i % 2:
+            args[f"arg_{i}"] = {"$from": f"answers.step_{i}.field.nested.value"}
+        else:
+            args[f"arg_{i}"] = i
+    return lambda: resolve_dynamic_args(args, ctx)
+
+
+# --- WizardState (tools/wizards/base/state_model.py) ---
+
+
+def _bench_state_file(tmp: Path) -> Enum:
+    # WizardState only needs `.value` (the path) and `.name` of a StateFile
+    return Enum("BenchStateFile", {"MICROBENCH": tmp / "state" / "wizard_state.json"})[
+        "MICROBENCH"
+    ]
+
+
+def _synthetic_state() -> WizardState:
+    return WizardState(
+        current_step_id=f"step_{WIZARD_STEPS - 1}",
+        completed_step_ids=[f"step_{i}" for i in range(WIZARD_STEPS - 1)],
+        answers={
+            f"step_{i}": {f"field_{j}": f"value {i}.{j}" for j in range(20)}
+            for i in range(WIZARD_STEPS)
+        },
+        meta={"node_id": 1, "event_type": "item"},
+    )
+
+
+@case("state.save_500_steps")
+def bench_state_save(tmp: Path) -> Callable[[], Any]:
+    state_file = _bench_state_file(tmp)
+    state = _synthetic_state()
+    return lambda: state.save(state_file)
+
+
+@case("state.load_500_steps")
+def bench_state_load(tmp: Path) -> Callable[[], Any]:
+    state_file = _bench_state_file(tmp)
+    _synthetic_state().save(state_file)
+    return lambda: WizardState.load(state_file)
+
+
+# --- Docs resources (resources/dib_docs/docs_resource_factory.py) ---
+
+
+def _write_docs_configs(tmp: Path) -> Path:
+    resources_root = tmp / "resources"
+    configs_root = resources_root / "dib_docs" / "configs"
+    topics_root = configs_root / "topics"
+    topics_root.mkdir(parents=True, exist_ok=True)
+
+    enabled: dict[str, bool] = {}
+    for t in range(DOC_TOPICS):
+        topic_id = f"topic_{t}"
+        enabled[topic_id] = True
+        resources = [
+            {
+                "enabled": True,
+                "uri": f"dib://docs/{topic_id}/{r}",
+                "name": f"{topic_id}_doc_{r}",
+                "title": f"Topic {t} document {r}",
+                "description": f"Synthetic document {r} of topic {t}.",
+                "endpoint": f"/docs/{topic_id}/{r}",
+                "payload": {"id": r},
+            }
+            for r in range(DOC_RESOURCES_PER_TOPIC)
+        ]
+        (topics_root / f"docs_{topic_id}_config.json").write_text(
+            json.dumps({"resources": resources}), encoding="utf-8"
+        )
+
+    (configs_root / "docs_master_config.json").write_text(
+        json.dumps({"enabled": enabled}), encoding="utf-8"
+    )
+    return resources_root
+
+
+@case("docs.register_dib_docs_2k_resources")
+def bench_register_dib_docs(tmp: Path) -> Callable[[], Any]:
+    resources_root = _write_docs_configs(tmp)
+
+    def run() -> None:
+        register_dib_docs(FastMCP(name="microbench"), resources_root)
+        DOCS_BY_NAME.clear()
+
+    return run
+
+
+# --- Settings (server/settings.py) ---
+
+
+def _quiet_settings_logs() -> None:
+    # Keep the reload and .env messages (part of the cost) but off the console
+    for name in ("settings", "env_variables"):
+        settings_logger = logging.getLogger(name)
+        settings_logger.addHandler(logging.NullHandler())
+        settings_logger.propagate = False
+
+
+@case("settings.get_settings_1k_calls")
+def bench_get_settings(tmp: Path) -> Callable[[], Any]:
+    def run() -> None:
+        for _ in range(SETTINGS_LOOKUPS):
+            get_settings().base_url
+
+    return run
+
+
+@case("settings.from_env")
+def bench_settings_from_env(tmp: Path) -> Callable[[], Any]:
+    _quiet_settings_logs()
+    return Settings.from_env
+
+
+@case("settings.reload")
+def bench_settings_reload(tmp: Path) -> Callable[[], Any]:
+    # Re-reads .env, parses every setting and runs the reload listeners
+    _quiet_settings_logs()
+    return reload_settings
+
+
+# --- Endpoint registry (server/endpoints.py) ---
+
+
+@case("endpoints.target_1k_calls")
+def bench_endpoint_targets(tmp: Path) -> Callable[[], Any]:
+    # Mix of static endpoints (prebuilt target) and templated ones
+    calls: list[tuple[endpoints.Endpoint, dict[str, Any]]] = [
+        (endpoints.DESIGNER_TREE, {}),
+        (endpoints.DESIGNER_GROUPS, {"page": 2, "limit": 20}),
+        (endpoints.DESIGNER_RECORDS, {"node_type": "item", "node_id": 42}),
+        (endpoints.APP_UPDATE_TABLE, {"table_id": 7}),
+        (
+            endpoints.QUEUE_GET,
+            {"container_name": "wizBuildApp", "queueItemId": None, "queueUid": "1"},
+        ),
+    ]
+    calls = (calls * (ENDPOINT_TARGETS // len(calls) + 1))[:ENDPOINT_TARGETS]
+
+    def run() -> None:
+        for endpoint, params in calls:
+            endpoint.target(**params)
+
+    return run
+
+
+# --- Response shaping (server/response_shaping.py) ---
+
+
+def _synthetic_tree(node_id: str, depth: int) -> dict[str, Any]:
+    leaf = depth == 4
+    return {
+        "id": node_id,
+        "text": f"node {node_id}",
+        "leaf": leaf,
+        "iconCls": "fa fa-cube",
+        "cls": "",
+        "checked": None,
+        "pef_container_id": 1,
+        "children": (
+            []
+            if leaf
+            else [
+                _synthetic_tree(f"{node_id}.{i}", depth + 1) for i in range(TREE_FANOUT)
+            ]
+        ),
+    }
+
+
+@case("response.shape_tree_4k_nodes")
+def bench_shape_tree(tmp: Path) -> Callable[[], Any]:
+    data = {"data": {"records": [_synthetic_tree("c", 1)]}}
+    profile = ResponseProfile(max_bytes=10**9)
+    return lambda: shape_response(data, profile)
+
+
+@case("response.shape_tree_4k_nodes_over_budget")
+def bench_shape_tree_over_budget(tmp: Path) -> Callable[[], Any]:
+    # Trimmed level by level until only the ids are left
+    data = {"data": {"records": [_synthetic_tree("c", 1)]}}
+    profile = ResponseProfile(max_bytes=16_000)
+    return lambda: shape_response(data, profile)
+
+
+def _fake_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response._content = content
+    return response
+
+
+def _large_tree_body() -> bytes:
+    # 56 root containers of 4680 nodes each, about 5 MB
+    records = [_synthetic_tree(f"r{i}", 1) for i in range(56)]
+    return json.dumps({"success": True, "records": records}).encode()
+
+
+def _large_docs_body() -> bytes:
+    # 400 doc records with escaped HTML bodies, about 2.5 MB
+    section = (
+        '<h2 class="dib-docs">Grid columns</h2><p>Set the "width" of a column '
+        "in pixels &amp; its <code>fx_wrap</code> mode.</p>\n"
+    )
+    records = [{"id": i, "title": f"Doc {i}", "html": section * 50} for i in range(400)]
+    return json.dumps({"success": True, "records": records}).encode()
+
+
+@case("json.parse_tree_5mb")
+def bench_parse_tree(tmp: Path) -> Callable[[], Any]:
+    body = _large_tree_body()
+    return lambda: response_json(_fake_response(body))
+
+
+@case("json.parse_docs_2mb")
+def bench_parse_docs(tmp: Path) -> Callable[[], Any]:
+    body = _large_docs_body()
+    return lambda: response_json(_fake_response(body))
+
+
+@case("json.parse_tree_5mb_20_reads")
+def bench_parse_tree_shared(tmp: Path) -> Callable[[], Any]:
+    # A coalesced response read by 20 callers is parsed once
+    body = _large_tree_body()
+
+    def run() -> Any:
+        response = _fake_response(body)
+        for _ in range(20):
+            response_json(response)
+
+    return run
+
+
+@case("json.dumps_tree_5mb")
+def bench_dumps_tree(tmp: Path) -> Callable[[], Any]:
+    data = json.loads(_large_tree_body())
+    return lambda: to_compact_json(data)
+
+
+@case("json.dumps_docs_2mb")
+def bench_dumps_docs(tmp: Path) -> Callable[[], Any]:
+    data = json.loads(_large_docs_body())
+    return lambda: to_compact_json(data)
+
+
+@case("response.paginate_tree_4k_nodes")
+def bench_paginate_tree(tmp: Path) -> Callable[[], Any]:
+    # Kept whole and stored as pages, the first one returned
+    data = {"data": {"records": [_synthetic_tree("c", 1)]}}
+    profile = ResponseProfile(max_bytes=16_000, paginate=True)
+
+    def run() -> Any:
+        shape_response(data, profile)
+        result_store.clear()
+
+    return run
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(
+    results: list[BenchResult], args: argparse.Namespace
+) -> dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "rounds": args.rounds,
+            "min_time": args.min_time,
+            "json_backend": JSON_BACKEND,
+        },
+        "benchmarks": {result.name: result.as_dict() for result in results},
+    }
+
+
+def compare_with_baseline(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float,
+) -> list[str]:
+    """
+    Return a message per case whose median got more than `tolerance` (relative)
+    and `min_delta_ms` (absolute) slower than in `baseline`.
+    """
+    regressions: list[str] = []
+    for name, result in report["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+        current, previous = result["median_ms"], base["median_ms"]
+        if current > previous * (1 + tolerance) and current - previous > min_delta_ms:
+            regressions.append(
+                f"{name}: median {previous:.3f}ms -> {current:.3f}ms "
+                f"(+{(current / previous - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(
+        f"\n{'benchmark':<46} {'min ms':>10} {'median ms':>10} {'stddev':>9} {'ops/s':>10}"
+    )
+    for name, result in report["benchmarks"].items():
+        print(
+            f"{name:<46} {result['min_ms']:>10.3f} {result['median_ms']:>10.3f} "
+            f"{result['stddev_ms']:>9.3f} {result['ops_per_second'] or 0:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--filter", default="", help="Only run cases whose name contains this text"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="Measured rounds per case"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Minimum seconds per round (sets the iterations)",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Write the JSON report to this file"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="Compare against an earlier JSON report"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative median slowdown (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this (ms)",
+    )
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if args.filter in name]
+    if not selected:
+        parser.error(f"No benchmark matches '{args.filter}'")
+
+    results: list[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="dib_microbench_") as tmp_dir:
+        for name in selected:
+            case_dir = Path(tmp_dir) / name
+            case_dir.mkdir()
+            fn = CASES[name](case_dir)
+            result = measure(name, fn, rounds=args.rounds, min_time=args.min_time)
+            print(f"{name}: median {result.median_s * 1000:.3f}ms", file=sys.stderr)
+            results.append(result)
+
+    report = build_report(results, args)
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(
+            report, baseline, args.tolerance, args.min_delta_ms
+        )
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+"""
+Local stand-in for a Dropinbase instance, for benchmarks and load tests.
+
+Responses are taken from the saved examples in `postman_collections/` (newer
+collections win). Endpoints without a saved example, and the ones whose
+answer depends on the request (login, node lookups, queues, ...), are served
+by small synthetic handlers.
+
+Like Dropinbase, every endpoint except the login page requires a PHPSESSID
+issued by the mock's login; other requests get a 419 (session expired).
+
+Usage:
+
+    python benchmarks/mock_dropinbase.py --port 8099 --latency-ms 20 --jitter-ms 10
+
+and point the MCP server at it:
+
+    BASE_URL=http://127.0.0.1:8099
+
+Latency and failures can be injected at start-up (see --help) or changed at
+runtime with `POST /__mock__/config` (same keys as the CLI options, e.g.
+{"latency_ms": 50, "expire_rate": 0.05}). `GET /__mock__/stats` returns the
+number of requests per endpoint and `POST /__mock__/reset` clears them.
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import secrets
+import socket
+import threading
+import time
+
+from dataclasses import asdict, dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger("mock_dropinbase")
+
+COLLECTIONS_DIR = Path(__file__).resolve().parent.parent / "postman_collections"
+
+# Query parameters that identify a saved example, the others (paging, ids,
+# timestamps) vary per call and are ignored when matching
+MATCH_PARAMS = ("containerName", "containerItemId", "itemAlias", "table")
+
+LOGIN_PAGE_PATH = "/login"
+LOGIN_ENDPOINT_PATH = "/dropins/dibAuthenticate/Site/login"
+
+# Polls of /peff/Queue/get before a queue reports that it stopped
+QUEUE_POLLS_UNTIL_DONE = 3
+
+
+@dataclass
+class MockConfig:
+    """
+    Fault and latency injection settings.
+
+    Attributes:
+    - latency_ms (float): Fixed delay added to every response.
+    - jitter_ms (float): Extra uniformly random delay, 0..jitter_ms.
+    - error_rate (float): Probability (0..1) of answering with a 500.
+    - expire_rate (float): Probability (0..1) of expiring the session,
+      answered with a 419 like Dropinbase does.
+    - expire_every (int): Expire the session on every n-th request (0 = off).
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    expire_rate: float = 0.0
+    expire_every: int = 0
+
+    def update(self, values: dict[str, Any]) -> None:
+        for f in fields(self):
+            if f.name in values:
+                setattr(self, f.name, type(getattr(self, f.name))(values[f.name]))
+
+
+# Synthetic endpoint handler: (query, JSON body) -> (status, JSON response)
+Handler = Callable[[dict[str, str], Any], tuple[int, Any]]
+
+
+@dataclass
+class SavedResponse:
+    method: str
+    path: str
+    params: dict[str, str]
+    status: int
+    body: str
+    name: str
+
+
+def _iter_requests(items: list[dict[str, Any]]):
+    for item in items:
+        if "item" in item:
+            yield from _iter_requests(item["item"])
+        elif "request" in item:
+            yield item
+
+
+def load_saved_responses(
+    collections_dir: Path = COLLECTIONS_DIR,
+) -> list[SavedResponse]:
+    """
+    Read the first saved example of every request in the Postman collections.
+
+    Collection files are read in name (i.e. date) order, so an example from a
+    newer collection replaces the one for the same endpoint from an older one.
+    """
+    by_key: dict[tuple, SavedResponse] = {}
+    for collection_file in sorted(collections_dir.glob("*.postman_collection.json")):
+        with collection_file.open("r", encoding="utf-8") as f:
+            collection = json.load(f)
+
+        for item in _iter_requests(collection.get("item", [])):
+            examples = item.get("response") or []
+            if not examples:
+                continue
+
+            request = item["request"]
+            url = (
+                request["url"]["raw"]
+                if isinstance(request["url"], dict)
+                else request["url"]
+            )
+            split = urlsplit(url)
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            params = {k: query[k] for k in MATCH_PARAMS if k in query}
+
+            example = examples[0]
+            saved = SavedResponse(
+                method=request.get("method", "POST").upper(),
+                path=split.path.rstrip("/") or "/",
+                params=params,
+                status=int(example.get("code") or 200),
+                body=example.get("body") or "",
+                name=item.get("name", ""),
+            )
+            by_key[(saved.method, saved.path, tuple(sorted(params.items())))] = saved
+
+    return list(by_key.values())
+
+
+class MockDropinbase:
+    """Routing, sessions and statistics shared by all request threads."""
+
+    def __init__(self, config: MockConfig, saved: list[SavedResponse]) -> None:
+        self.config = config
+        self.saved = saved
+        self.form_tokens: set[str] = set()
+        self.sessions: set[str] = set()
+        self.queues: dict[str, int] = {}
+        self.stats: dict[str, int] = {}
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+        # Answers that depend on the request, always synthetic
+        self.dynamic: list[tuple[re.Pattern, Handler]] = [
+            (
+                re.compile(r"^/dropins/dibAdmin/DDesignerAddOn/designerGetRecords$"),
+                self._designer_get_records,
+            ),
+            (re.compile(r"^/peff/Sync/executeTasks$"), self._execute_tasks),
+            (re.compile(r"^/peff/Queue/get/\w+$"), self._queue_get),
+        ]
+        # Used when the collections have no saved example for the endpoint
+        self.fallback: list[tuple[re.Pattern, Handler]] = [
+            (
+                re.compile(r"^/dropins/dibAdmin/DDesignerAddOn/createEvent$"),
+                self._success("Event created."),
+            ),
+            (
+                re.compile(r"^/dropins/dibAdmin/DDesignerAddOn/designerUpdates/\w+$"),
+                self._success("Updated."),
+            ),
+            (re.compile(r"^/dropins/dibAdmin/DDesignerItemStore/read$"), self._tree),
+            (
+                re.compile(r"^/dropins/dibAdmin/DDesignerComponentStore/read$"),
+                self._tree,
+            ),
+            (
+                re.compile(r"^/dropins/dibAdmin/DDesignerItemStore/drop$"),
+                self._success("Dropped."),
+            ),
+            (re.compile(r"^/dropins/dibAdmin/DibTasks/\w+"), self._success("Done.")),
+            (re.compile(r"^/dropins/dibDocs/Template/"), self._docs),
+            (re.compile(r"^/peff/Sync/setBaseDescription$"), self._base_description),
+            (
+                re.compile(r"^/peff/Sync/updateAllAppSettings$"),
+                self._success("Settings saved."),
+            ),
+            (re.compile(r"^/peff/Crud/update/\w+$"), self._success("Record updated.")),
+            (re.compile(r"^/peff/Crud/(componentlist|read/\w+)$"), self._records),
+        ]
+
+    # Bookkeeping
+
+    def count(self, key: str) -> int:
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+            self.request_count += 1
+            return self.request_count
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats.clear()
+            self.request_count = 0
+
+    # Sessions
+
+    def new_form_token(self) -> str:
+        token = secrets.token_urlsafe(16)
+        with self.lock:
+            self.form_tokens.add(token)
+        return token
+
+    def login(self, form_token: str) -> str | None:
+        with self.lock:
+            if form_token not in self.form_tokens:
+                return None
+            self.form_tokens.discard(form_token)
+            session_id = secrets.token_hex(13)
+            self.sessions.add(session_id)
+            return session_id
+
+    def has_session(self, session_id: str | None) -> bool:
+        with self.lock:
+            return session_id in self.sessions
+
+    def expire(self, session_id: str | None) -> None:
+        with self.lock:
+            self.sessions.discard(session_id)
+
+    # Routing
+
+    def find_saved(
+        self, method: str, path: str, query: dict[str, str]
+    ) -> SavedResponse | None:
+        best: SavedResponse | None = None
+        for saved in self.saved:
+            if saved.method != method or saved.path != path:
+                continue
+            if any(query.get(k) != v for k, v in saved.params.items()):
+                continue
+            if best is None or len(saved.params) > len(best.params):
+                best = saved
+        return best
+
+    @staticmethod
+    def _match(routes: list[tuple[re.Pattern, Handler]], path: str) -> Handler | None:
+        for pattern, handler in routes:
+            if pattern.match(path):
+                return handler
+        return None
+
+    def respond(
+        self, method: str, path: str, query: dict[str, str], body: Any
+    ) -> tuple[int, str]:
+        """Status and raw body for an authenticated request."""
+        handler = self._match(self.dynamic, path)
+        if handler is None:
+            saved = self.find_saved(method, path, query)
+            if saved is not None:
+                return saved.status, saved.body
+            handler = self._match(self.fallback, path)
+        if handler is None:
+            return 404, json.dumps(
+                {"success": False, "message": f"No mock for {path}."}
+            )
+
+        status, data = handler(query, body)
+        return status, json.dumps(data)
+
+    # Synthetic handlers, called with (query, body) and returning (status, JSON body)
+
+    @staticmethod
+    def _success(message: str) -> Handler:
+        def handler(query: dict[str, str], body: Any) -> tuple[int, Any]:
+            return 200, {
+                "success": True,
+                "message": message,
+                "actions": [],
+                "records": [],
+            }
+
+        return handler
+
+    @staticmethod
+    def _designer_get_records(query: dict[str, str], body: Any) -> tuple[int, Any]:
+        table = query.get("table", "pef_item")
+        node_id = query.get("id", "")
+
+        # Non-numeric and non-positive ids do not exist
+        if not node_id.isdigit() or int(node_id) <= 0:
+            return 200, {"success": True, "records": {"data": {table: []}}}
+
+        # The common columns, so designer updates of them pass schema validation
+        record: dict[str, Any] = {
+            "id": int(node_id),
+            "name": f"{table}_{node_id}",
+            "caption": f"Node {node_id}",
+            "width": 120,
+            "height": None,
+            "hidden": 0,
+            "read_only": 0,
+            "fx_wrap": "",
+            "order_no": int(node_id) % 7,
+        }
+        if table == "pef_item":
+            record["pef_container_id"] = int(node_id) // 10 + 1
+            record["item_alias"] = f"item{node_id}"
+        return 200, {"success": True, "records": {"data": {table: record}}}
+
+    @staticmethod
+    def _tree_node(node_id: str, text: str, depth: int) -> dict[str, Any]:
+        # Ext JS tree node as the Designer sends it, most attributes unset
+        leaf = depth >= 3
+        return {
+            "id": node_id,
+            "text": text,
+            "leaf": leaf,
+            "expanded": depth < 2,
+            "has_children": not leaf,
+            "iconCls": "fa fa-cube" if leaf else "fa fa-folder",
+            "cls": "",
+            "qtip": "",
+            "checked": None,
+            "allowDrag": True,
+            "allowDrop": not leaf,
+            "item_alias": text,
+            "container_id": None if leaf else node_id,
+            "pef_container_id": 1,
+            "children": (
+                []
+                if leaf
+                else [
+                    MockDropinbase._tree_node(f"{node_id}{j}", f"{text}_{j}", depth + 1)
+                    for j in range(1, 4)
+                ]
+            ),
+        }
+
+    @staticmethod
+    def _tree(query: dict[str, str], body: Any) -> tuple[int, Any]:
+        return 200, {
+            "success": True,
+            "actions": [],
+            "message": None,
+            "showType": None,
+            "messageDelay": None,
+            "clickOutsideToClose": False,
+            "restoreFocus": True,
+            "asyncInterval": None,
+            "asyncRetry": None,
+            "queueUid": None,
+            "records": [
+                MockDropinbase._tree_node(f"c{i}", f"container{i}", 1)
+                for i in range(1, 4)
+            ],
+            "total": 3,
+            "filtertotal": 3,
+            "secureId": None,
+        }
+
+    @staticmethod
+    def _docs(query: dict[str, str], body: Any) -> tuple[int, Any]:
+        topic = query.get("id", "example")
+        return 200, {
+            "success": True,
+            "records": f"<h1>{topic}</h1><p>Mock documentation.</p>",
+        }
+
+    @staticmethod
+    def _base_description(query: dict[str, str], body: Any) -> tuple[int, Any]:
+        return 200, {
+            "success": True,
+            "actions": [
+                {"params": {"helpTmpl": "<p>Mock base container template.</p>"}}
+            ],
+        }
+
+    def _execute_tasks(self, query: dict[str, str], body: Any) -> tuple[int, Any]:
+        queue_uid = query.get("queueUid") or str(int(time.time() * 1000))
+        with self.lock:
+            self.queues[queue_uid] = 0
+        return 200, {
+            "success": True,
+            "queueUid": queue_uid,
+            "asyncInterval": 200,
+            "actions": [],
+        }
+
+    def _queue_get(self, query: dict[str, str], body: Any) -> tuple[int, Any]:
+        queue_uid = query.get("queueUid", "")
+        with self.lock:
+            polls = self.queues.get(queue_uid, QUEUE_POLLS_UNTIL_DONE - 1) + 1
+            self.queues[queue_uid] = polls
+
+        if polls >= QUEUE_POLLS_UNTIL_DONE:
+            return 200, {
+                "success": True,
+                "actions": [
+                    {"params": {"action": "stop", "message": "Build complete."}}
+                ],
+            }
+        return 200, {
+            "success": True,
+            "actions": [{"params": {"message": f"Step {polls} done."}}],
+        }
+
+    @staticmethod
+    def _records(query: dict[str, str], body: Any) -> tuple[int, Any]:
+        records = [
+            {"id": i, "id_display_value": f"Option {i}", "name": f"option_{i}"}
+            for i in range(1, 6)
+        ]
+        return 200, {"success": True, "records": records, "total": len(records)}
+
+
+def make_handler(mock: MockDropinbase) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # Headers and body are written separately, without this Nagle's
+            # algorithm adds ~40ms to every keep-alive response
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+        def _send(
+            self,
+            status: int,
+            body: str | bytes,
+            content_type: str = "application/json",
+            headers: dict[str, str] | None = None,
+        ) -> None:
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status: int, data: Any) -> None:
+            self._send(status, json.dumps(data))
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _session_id(self) -> str | None:
+            for part in (self.headers.get("Cookie") or "").split(";"):
+                name, _, value = part.strip().partition("=")
+                if name == "PHPSESSID":
+                    return value
+            return None
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+        def _handle(self, method: str) -> None:
+            split = urlsplit(self.path)
+            path = split.path.rstrip("/") or "/"
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            raw_body = self._read_body()
+
+            if path.startswith("/__mock__/"):
+                return self._control(method, path, raw_body)
+
+            request_number = mock.count(f"{method} {path}")
+            config = mock.config
+
+            delay_ms = config.latency_ms + random.uniform(0, config.jitter_ms)
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000)
+
+            if path == LOGIN_PAGE_PATH:
+                token = mock.new_form_token()
+                html = f'<form><input type="hidden" name="form_token" value="{token}"></form>'
+                return self._send(200, html, "text/html; charset=utf-8")
+
+            if path == LOGIN_ENDPOINT_PATH:
+                form = {k: v[0] for k, v in parse_qs(raw_body.decode("utf-8")).items()}
+                session_id = mock.login(form.get("form_token", ""))
+                if session_id is None:
+                    return self._send_json(
+                        403, {"success": False, "message": "Invalid form token."}
+                    )
+                return self._send(
+                    200,
+                    "<html>Logged in</html>",
+                    "text/html; charset=utf-8",
+                    {"Set-Cookie": f"PHPSESSID={session_id}; Path=/; HttpOnly"},
+                )
+
+            session_id = self._session_id()
+            expire = (
+                config.expire_every and request_number % config.expire_every == 0
+            ) or (random.random() < config.expire_rate)
+            if expire:
+                mock.expire(session_id)
+            if not mock.has_session(session_id):
+                return self._send_json(
+                    419, {"success": False, "message": "Session expired."}
+                )
+
+            if random.random() < config.error_rate:
+                return self._send_json(
+                    500, {"success": False, "message": "Injected server error."}
+                )
+
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                body = None
+
+            status, response_body = mock.respond(method, path, query, body)
+            return self._send(status, response_body)
+
+        def _control(self, method: str, path: str, raw_body: bytes) -> None:
+            if path == "/__mock__/stats":
+                with mock.lock:
+                    return self._send_json(
+                        200,
+                        {
+                            "requests": mock.request_count,
+                            "by_endpoint": dict(mock.stats),
+                            "config": asdict(mock.config),
+                        },
+                    )
+            if path == "/__mock__/config" and method == "POST":
+                mock.config.update(json.loads(raw_body or b"{}"))
+                return self._send_json(200, asdict(mock.config))
+            if path == "/__mock__/reset" and method == "POST":
+                mock.reset()
+                return self._send_json(200, {"success": True})
+            return self._send_json(404, {"success": False})
+
+    return Handler
+
+
+def create_server(
+    host: str = "127.0.0.1", port: int = 8099, config: MockConfig | None = None
+) -> ThreadingHTTPServer:
+    """Create (but do not start) a mock server; port 0 picks a free port."""
+    mock = MockDropinbase(config or MockConfig(), load_saved_responses())
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    server.mock = mock  # type: ignore[attr-defined]
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock Dropinbase server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Fixed delay per response."
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0.0, help="Extra random delay per response."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Probability of a 500 response."
+    )
+    parser.add_argument(
+        "--expire-rate",
+        type=float,
+        default=0.0,
+        help="Probability of expiring the session (419).",
+    )
+    parser.add_argument(
+        "--expire-every",
+        type=int,
+        default=0,
+        help="Expire the session on every n-th request.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        expire_rate=args.expire_rate,
+        expire_every=args.expire_every,
+    )
+    server = create_server(args.host, args.port, config)
+    logger.info(
+        "Mock Dropinbase on http://%s:%s with %d saved responses",
+        args.host,
+        server.server_address[1],
+        len(server.mock.saved),  # type: ignore[attr-defined]
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
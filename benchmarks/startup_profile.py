@@ -0,0 +1,200 @@
+"""
+Cold start profile of the MCP server over stdio.
+
+Measures, per registration mode (eager imports vs. LAZY_TOOLS):
+- time from spawning `server/main.py` to the `initialize` response
+- time to the first `tools/list` response
+- time of the first call of a tool (which loads its module in lazy mode)
+
+and reports the import time per module (`python -X importtime`), largest
+first, with the repository's own modules listed separately.
+
+Usage (from the repository root):
+
+    python benchmarks/startup_profile.py
+    python benchmarks/startup_profile.py --mode lazy --runs 5 --target-ms 1200
+
+The script exits with status 1 when the median time to the first
+`tools/list` response of a measured mode exceeds `--target-ms`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from typing import Any
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SERVER_ROOT = REPO_ROOT / "server"
+
+MODES = {"eager": "false", "lazy": "true"}
+
+# A tool that does not call Dropinbase, to time the first call on its own
+FIRST_CALL_TOOL = "get_request_metrics"
+
+
+def _server_env(mode: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        LAZY_TOOLS=MODES[mode],
+        LOG_LEVEL="WARNING",
+        MCP_TRANSPORT="stdio",
+        EXPOSE_DIB_DOCS_VIA_TOOLS=env.get("EXPOSE_DIB_DOCS_VIA_TOOLS", "true"),
+    )
+    return env
+
+
+async def _time_startup(mode: str) -> dict[str, float]:
+    server = StdioServerParameters(
+        command=sys.executable,
+        args=["server/main.py"],
+        env=_server_env(mode),
+        cwd=REPO_ROOT,
+    )
+    with open(os.devnull, "w") as errlog:
+        started = time.perf_counter()
+        async with stdio_client(server, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter()
+                await session.list_tools()
+                listed = time.perf_counter()
+                call_started = time.perf_counter()
+                await session.call_tool(FIRST_CALL_TOOL, {})
+                called = time.perf_counter()
+
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "first_tools_list_ms": (listed - started) * 1000,
+        "first_call_ms": (called - call_started) * 1000,
+    }
+
+
+def profile_imports(mode: str) -> list[dict[str, Any]]:
+    """
+    Import `main` in a fresh interpreter with `-X importtime` and return the
+    import time per module, largest cumulative time first.
+    """
+    code = f"import sys; sys.path.insert(0, {str(SERVER_ROOT)!r}); import main"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        env=_server_env(mode),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{proc.stderr[-2000:]}")
+
+    modules: list[dict[str, Any]] = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        modules.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+
+
+def _is_repo_module(name: str) -> bool:
+    top = name.split(".", 1)[0]
+    return (SERVER_ROOT / top).is_dir() or (SERVER_ROOT / f"{top}.py").is_file()
+
+
+def profile_mode(mode: str, runs: int) -> dict[str, Any]:
+    samples = [asyncio.run(_time_startup(mode)) for _ in range(runs)]
+    imports = profile_imports(mode)
+    main_import = next((m for m in imports if m["module"] == "main"), None)
+    return {
+        "runs": runs,
+        "median": {
+            key: round(statistics.median(s[key] for s in samples), 1)
+            for key in samples[0]
+        },
+        "samples": samples,
+        "import_main_ms": main_import["cumulative_ms"] if main_import else None,
+        "imports": imports,
+    }
+
+
+def print_profile(mode: str, profile: dict[str, Any], top: int) -> None:
+    median = profile["median"]
+    print(f"\n== {mode} ({profile['runs']} runs, medians) ==")
+    print(f"initialize:          {median['initialize_ms']:>8.1f} ms")
+    print(f"first tools/list:    {median['first_tools_list_ms']:>8.1f} ms")
+    print(f"first tool call:     {median['first_call_ms']:>8.1f} ms")
+    if profile["import_main_ms"] is not None:
+        print(f"import main:         {profile['import_main_ms']:>8.1f} ms")
+
+    print(f"\n{'slowest imports':<72} {'cumul ms':>9} {'self ms':>8}")
+    for module in profile["imports"][:top]:
+        print(
+            f"{module['module']:<72} {module['cumulative_ms']:>9.1f} {module['self_ms']:>8.1f}"
+        )
+
+    print(f"\n{'repository modules':<72} {'cumul ms':>9} {'self ms':>8}")
+    repo_modules = [m for m in profile["imports"] if _is_repo_module(m["module"])]
+    for module in repo_modules[:top]:
+        print(
+            f"{module['module']:<72} {module['cumulative_ms']:>9.1f} {module['self_ms']:>8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+    parser.add_argument("--runs", type=int, default=3, help="Server launches per mode")
+    parser.add_argument("--top", type=int, default=15, help="Modules listed per table")
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=1500.0,
+        help="Maximum median time to the first tools/list response",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Write the JSON report to this file"
+    )
+    args = parser.parse_args()
+
+    modes = list(MODES) if args.mode == "both" else [args.mode]
+    report = {mode: profile_mode(mode, args.runs) for mode in modes}
+    for mode, profile in report.items():
+        print_profile(mode, profile, args.top)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+    over_target = [
+        mode
+        for mode, profile in report.items()
+        if profile["median"]["first_tools_list_ms"] > args.target_ms
+    ]
+    print()
+    for mode in modes:
+        status = "over" if mode in over_target else "within"
+        print(
+            f"{mode}: first tools/list {report[mode]['median']['first_tools_list_ms']:.1f} ms, "
+            f"{status} the {args.target_ms:.0f} ms target"
+        )
+    if over_target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
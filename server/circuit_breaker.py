@@ -0,0 +1,180 @@
+import logging
+import random
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+# Transient statuses worth retrying, anything else is returned as is
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised instead of sending a request while the breaker of its endpoint is
+    open. A ConnectionError, so callers handling transport errors handle it too.
+    """
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often a request is attempted and how long to wait in between.
+
+    The delay doubles per attempt from `backoff_seconds`, up to
+    `max_backoff_seconds`, and is jittered by ±50% so concurrent callers do
+    not retry in lockstep. A numeric Retry-After header (429, 503) is honoured
+    up to `max_backoff_seconds`.
+    """
+
+    max_attempts: int = 1
+    backoff_seconds: float = 0.0
+    max_backoff_seconds: float = 5.0
+    retry_status_codes: frozenset[int] = RETRY_STATUS_CODES
+
+    def delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after is not None:
+            try:
+                return min(max(float(retry_after), 0.0), self.max_backoff_seconds)
+            except ValueError:
+                pass  # An HTTP date, fall back to the backoff
+
+        delay = min(self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds)
+        return delay * random.uniform(0.5, 1.5)
+
+
+NO_RETRY = RetryPolicy()
+
+
+def default_retry_policy() -> RetryPolicy:
+    """The retry policy for idempotent endpoints, from the current settings."""
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.dib_retry_max_attempts,
+        backoff_seconds=settings.dib_retry_backoff_seconds,
+        max_backoff_seconds=settings.dib_retry_max_backoff_seconds,
+    )
+
+
+class CircuitBreaker:
+    """
+    Fails requests to an endpoint fast while Dropinbase keeps failing them.
+
+    After `failure_threshold` consecutive failures (transport errors and 5xx
+    responses) the breaker opens and `before_call` raises CircuitOpenError.
+    Once `reset_seconds` have passed a single trial request is let through
+    (half-open): its success closes the breaker, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self._reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError when the request may not be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            remaining = self._reset_seconds - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+        raise CircuitOpenError(
+            f"Dropinbase endpoint '{self.name}' is failing, requests are paused "
+            f"for {max(remaining, 0):.0f} more seconds."
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+        if was_open:
+            logger.info("Circuit breaker for %s closed", self.name)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if not trial_failed and (
+                self._opened_at is not None or self._failures < self._failure_threshold
+            ):
+                return
+            self._opened_at = time.monotonic()
+            failures = self._failures
+
+        logger.warning(
+            "Circuit breaker for %s opened after %d consecutive failures",
+            self.name,
+            failures,
+        )
+
+    def record_response(self, status_code: int) -> None:
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            failures = self._failures
+        return {"state": self.state, "consecutive_failures": failures}
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """The breaker of endpoint `name`, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is not None:
+        return breaker
+
+    settings = get_settings()
+    with _breakers_lock:
+        return _breakers.setdefault(
+            name,
+            CircuitBreaker(
+                name,
+                failure_threshold=settings.dib_breaker_failure_threshold,
+                reset_seconds=settings.dib_breaker_reset_seconds,
+            ),
+        )
+
+
+def circuit_breaker_states() -> dict[str, dict[str, Any]]:
+    """State and consecutive failures of every breaker, by endpoint name."""
+    with _breakers_lock:
+        breakers = sorted(_breakers.items())
+    return {name: breaker.snapshot() for name, breaker in breakers}
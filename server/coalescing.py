@@ -0,0 +1,62 @@
+import json
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, TypeVar
+
+from rate_limit import PriorityHandle, current_priority, current_priority_handle
+
+R = TypeVar("R")
+
+
+def canonical_body(payload: Any) -> str:
+    """The JSON body of a request in a canonical form, to compare requests by."""
+    if payload is None:
+        return ""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class RequestCoalescer:
+    """
+    Lets identical requests that are in flight at the same time share one call.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    with the same key before it finishes wait for it and get the same result,
+    or the same exception. Nothing is kept once the call finished, so a later
+    request always goes out again. An interactive caller waiting on a
+    background leader boosts the leader's request to interactive priority.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, tuple[Future, PriorityHandle | None]] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: Hashable, fn: Callable[[], R]) -> tuple[R, bool]:
+        """Return the result of `fn` and whether it was shared with an earlier caller."""
+        with self._lock:
+            entry = self._in_flight.get(key)
+            leader = entry is None
+            if leader:
+                entry = self._in_flight[key] = (Future(), current_priority_handle())
+        future, leader_priority = entry
+
+        if not leader:
+            if leader_priority is not None and current_priority() == "interactive":
+                leader_priority.boost()
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
@@ -0,0 +1,160 @@
+import contextvars
+import math
+import time
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class TaskOutcome(Generic[R]):
+    """
+    Result of a single task run through `run_bounded`.
+
+    Attributes:
+    - ok (bool): Whether the task finished without raising.
+    - value (R | None): The task's return value when ok.
+    - error (BaseException | None): The raised exception when not ok.
+    - timed_out (bool): True if the task did not finish before the deadline.
+    """
+
+    ok: bool
+    value: R | None = None
+    error: BaseException | None = None
+    timed_out: bool = False
+
+
+def run_bounded(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_workers: int,
+    timeout: float | None = None,
+    thread_name_prefix: str = "dib-worker",
+    on_done: Callable[[int, int, TaskOutcome[R]], None] | None = None,
+) -> list[TaskOutcome[R]]:
+    """
+    Run `fn` over `items` in a bounded thread pool and return one outcome per
+    item, in the same order as `items`.
+
+    - At most `max_workers` calls run at the same time.
+    - `timeout` is the time (in seconds) every task may run, counted from
+      the moment it starts on a worker, so tasks queued behind busy workers
+      do not use up their budget waiting. Tasks still running after it are
+      reported as timed out; their threads are left to finish in the
+      background. The whole call is bounded too: tasks that could not start
+      within ceil(len(items) / max_workers) * `timeout` (e.g. because every
+      worker is stuck on a hung call) are reported as timed out as well.
+    - `on_done(completed, total, outcome)` is called from the calling thread as
+      each task finishes, e.g. to report progress.
+
+    Exceptions raised by `fn` never propagate; they are captured per item.
+    """
+    items = list(items)
+    total = len(items)
+    outcomes: list[TaskOutcome[R] | None] = [None] * total
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers, total))
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=thread_name_prefix
+    )
+    # Time for every task to run with its full budget, the bound on the call
+    overall_deadline = (
+        time.monotonic() + math.ceil(total / workers) * timeout
+        if timeout is not None
+        else None
+    )
+    # When each task started running, by item index
+    started: dict[int, float] = {}
+
+    def run(idx: int, item: T) -> R:
+        started[idx] = time.monotonic()
+        return fn(item)
+
+    completed = 0
+
+    def record(idx: int, outcome: TaskOutcome[R]) -> None:
+        nonlocal completed
+        outcomes[idx] = outcome
+        completed += 1
+        if on_done:
+            on_done(completed, total, outcome)
+
+    try:
+        # Each task runs in a copy of the caller's context so context variables
+        # (e.g. request-scoped data) are visible inside the worker threads
+        futures: dict[Future, int] = {
+            executor.submit(contextvars.copy_context().run, run, idx, item): idx
+            for idx, item in enumerate(items)
+        }
+
+        pending = set(futures)
+        while pending:
+            remaining = None
+            if timeout is not None:
+                now = time.monotonic()
+                deadlines = {
+                    fut: started[futures[fut]] + timeout
+                    for fut in pending
+                    if futures[fut] in started
+                }
+                expired = {
+                    fut for fut, deadline in deadlines.items() if deadline <= now
+                }
+                if now >= overall_deadline:
+                    # Tasks that never got a worker are not waited for again
+                    expired |= {fut for fut in pending if fut.cancel()}
+                for fut in expired:
+                    record(futures[fut], _timed_out(timeout))
+                pending -= expired
+                if not pending:
+                    break
+                # Until the next task deadline, or the overall deadline while
+                # tasks may still be waiting for a worker
+                wake_ups = [d for fut, d in deadlines.items() if fut in pending]
+                if now < overall_deadline:
+                    wake_ups.append(overall_deadline)
+                remaining = min(wake_ups, default=now + timeout) - now
+
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for fut in done:
+                error = fut.exception()
+                record(
+                    futures[fut],
+                    (
+                        TaskOutcome(ok=True, value=fut.result())
+                        if error is None
+                        else TaskOutcome(ok=False, error=error)
+                    ),
+                )
+    finally:
+        # Never block on stragglers, they were already reported as timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return outcomes  # type: ignore[return-value]
+
+
+def _timed_out(timeout: float) -> TaskOutcome[Any]:
+    return TaskOutcome(
+        ok=False,
+        error=TimeoutError(f"Task did not finish within {timeout} seconds"),
+        timed_out=True,
+    )
+
+
+def outcome_error_message(outcome: TaskOutcome[Any]) -> str:
+    """Return a short, human readable description of a failed outcome."""
+    if outcome.ok:
+        return ""
+    error = outcome.error
+    if error is None:
+        return "Unknown error"
+    return str(error) or type(error).__name__
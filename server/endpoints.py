@@ -0,0 +1,341 @@
+import string
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import requests
+
+from circuit_breaker import NO_RETRY, RetryPolicy, default_retry_policy
+from coalescing import RequestCoalescer, canonical_body
+from json_codec import response_json
+from metrics import REQUEST_METRICS
+from rate_limit import TrafficClass
+from session_auth import dib_session_client
+from settings import get_settings
+from tracing import span
+
+JSON_HEADERS: Mapping[str, str] = MappingProxyType({"Content-Type": "application/json"})
+
+# Identical reads in flight at the same time share one request
+IN_FLIGHT_READS = RequestCoalescer()
+
+
+def _template_fields(template: str) -> frozenset[str]:
+    return frozenset(
+        name for _, name, _, _ in string.Formatter().parse(template) if name
+    )
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    A Dropinbase endpoint, declared once with its path, query and headers.
+
+    `path` and string values of `query` may contain `{placeholders}`, filled
+    from the params given to `target()`. A param named like a query key
+    overrides that value, and query values that end up None are left out.
+    Everything that does not depend on params is built once, here.
+
+    `idempotent` marks endpoints that are safe to repeat; only their requests
+    are retried after a transient failure. `traffic` is the concurrency class
+    the requests count against (see rate_limit.py), "read" for idempotent
+    endpoints and "write" otherwise unless given.
+    """
+
+    name: str
+    path: str
+    query: Mapping[str, Any] = field(default_factory=dict)
+    method: str = "POST"
+    base_headers: Mapping[str, str] = JSON_HEADERS
+    idempotent: bool = False
+    traffic: TrafficClass | None = None
+
+    def __post_init__(self) -> None:
+        if self.traffic is None:
+            object.__setattr__(self, "traffic", "read" if self.idempotent else "write")
+
+        query = MappingProxyType(dict(self.query))
+        object.__setattr__(self, "query", query)
+
+        templated = {
+            key: _template_fields(value)
+            for key, value in query.items()
+            if isinstance(value, str) and _template_fields(value)
+        }
+        fields = _template_fields(self.path).union(*templated.values())
+        object.__setattr__(self, "_templated", frozenset(templated))
+        object.__setattr__(self, "_fields", fields)
+        object.__setattr__(self, "_params", fields | frozenset(query))
+        object.__setattr__(
+            self, "_default_target", None if fields else self._build_target({})
+        )
+
+    def _build_target(self, params: dict[str, Any]) -> str:
+        path = self.path.format(**params) if self._fields else self.path
+        parts: list[str] = []
+        for key, value in self.query.items():
+            if key in params:
+                value = params[key]
+            elif key in self._templated:
+                value = value.format(**params)
+            if value is not None:
+                parts.append(f"{key}={value}")
+        return f"{path}?{'&'.join(parts)}" if parts else path
+
+    def target(self, **params: Any) -> str:
+        """The path and query string for `params`, relative to BASE_URL."""
+        if not params and self._default_target is not None:
+            return self._default_target
+
+        unknown = params.keys() - self._params
+        if unknown:
+            raise TypeError(
+                f"Unknown parameter(s) for endpoint '{self.name}': {', '.join(sorted(unknown))}"
+            )
+        missing = self._fields - params.keys()
+        if missing:
+            raise TypeError(
+                f"Missing parameter(s) for endpoint '{self.name}': {', '.join(sorted(missing))}"
+            )
+        return self._build_target(params)
+
+    def headers(self, token: str | None) -> dict[str, str]:
+        return {**self.base_headers, "RequestVerificationToken": token}
+
+
+def call_endpoint(
+    endpoint: Endpoint,
+    *,
+    payload: Any | None = None,
+    token: str | None = None,
+    retry: RetryPolicy | None = None,
+    **params: Any,
+) -> requests.Response:
+    """
+    Send a request to `endpoint`, the single place where tools, option
+    providers and wizards call Dropinbase.
+
+    `payload` is sent as the JSON body, `token` overrides the configured
+    REQUEST_VERIFICATION_TOKEN and `params` fill the endpoint's templates.
+    Every endpoint has its own circuit breaker. Idempotent endpoints are
+    retried per DIB_RETRY_* unless `retry` overrides the policy.
+
+    With DIB_COALESCE_READS, a read (idempotent, not a write) identical to one
+    already in flight (same method, URL, canonical body and token) waits for
+    that request and gets the same Response instead of sending its own. The
+    shared Response is parsed once, see `json_codec.response_json`.
+    """
+    settings = get_settings()
+    url = f"{settings.base_url}{endpoint.target(**params)}"
+    token = token or settings.request_verification_token
+    headers = endpoint.headers(token)
+    if retry is None:
+        retry = default_retry_policy() if endpoint.idempotent else NO_RETRY
+
+    def send() -> requests.Response:
+        return dib_session_client.request(
+            endpoint.method,
+            url,
+            headers=headers,
+            breaker=endpoint.name,
+            retry=retry,
+            traffic=endpoint.traffic,
+            json=payload,
+        )
+
+    def send_shared() -> requests.Response:
+        response = send()
+        try:
+            response_json(response)
+        except ValueError:
+            pass  # Not JSON, callers that expect JSON get the error themselves
+        return response
+
+    with span("dib.endpoint", endpoint=endpoint.name) as s:
+        if not (
+            settings.dib_coalesce_reads
+            and endpoint.idempotent
+            and endpoint.traffic != "write"
+        ):
+            return send()
+
+        key = (endpoint.method, url, canonical_body(payload), token)
+        response, shared = IN_FLIGHT_READS.call(key, send_shared)
+        if shared:
+            REQUEST_METRICS.record_coalesced(endpoint.method, url)
+            if s is not None:
+                s.set(coalesced=True)
+        return response
+
+
+def _component_list(
+    name: str,
+    container_name: str,
+    container_item_id: int,
+    item_alias: str,
+    active_filter: str = "null",
+) -> Endpoint:
+    """A `componentlist` endpoint, which lists the options of a dropdown item."""
+    return Endpoint(
+        name=name,
+        path="/peff/Crud/componentlist",
+        query={
+            "containerName": container_name,
+            "containerItemId": container_item_id,
+            "itemAlias": item_alias,
+            "page": 1,
+            "limit": 40,
+            "activeFilter": active_filter,
+        },
+        idempotent=True,
+    )
+
+
+# ---------------------------------------------- #
+# Designer
+# ---------------------------------------------- #
+
+DESIGNER_GROUPS = _component_list("designer.groups", "dibDesigner", 3901, "groupId")
+DESIGNER_CONTAINERS = _component_list(
+    "designer.containers", "dibDesigner", 3900, "containerId"
+)
+DESIGNER_TREE = Endpoint(
+    name="designer.tree",
+    path="/dropins/dibAdmin/DDesignerItemStore/read",
+    query={"containerName": "dibDesignerHtml", "node": "root"},
+    idempotent=True,
+)
+DESIGNER_RECORDS = Endpoint(
+    name="designer.records",
+    path="/dropins/dibAdmin/DDesignerAddOn/designerGetRecords",
+    query={
+        "containerName": "dibDesignerHtml",
+        "table": "pef_{node_type}",
+        "id": "{node_id}",
+    },
+    idempotent=True,
+)
+DESIGNER_UPDATE = Endpoint(
+    name="designer.update",
+    path="/dropins/dibAdmin/DDesignerAddOn/designerUpdates/dibDesignerHtml",
+)
+DESIGNER_DROP = Endpoint(
+    name="designer.drop",
+    path="/dropins/dibAdmin/DDesignerItemStore/drop",
+    query={"containerName": "dibDesignerHtml"},
+)
+DESIGNER_COMPONENTS = Endpoint(
+    name="designer.components",
+    path="/dropins/dibAdmin/DDesignerComponentStore/read",
+    query={"containerName": "dibDesignerHtml", "node": "root"},
+    idempotent=True,
+)
+DESIGNER_DELETE_ITEM = Endpoint(
+    name="designer.delete_item",
+    path="/dropins/dibAdmin/DibTasks/dibDesignerDeleteItem",
+    query={"containerName": "dibDesignerHtml", "itemEventId": "ie178-dib"},
+)
+DESIGNER_DELETE_ITEMS = Endpoint(
+    name="designer.delete_items",
+    path="/dropins/dibAdmin/DibTasks/dibDesignerDeleteItemMany",
+    query={"containerName": "dibDesignerHtml", "itemEventId": "ie21-dib"},
+)
+DESIGNER_DELETE_EVENT = Endpoint(
+    name="designer.delete_event",
+    path="/dropins/dibAdmin/DibTasks/dibDesignerDeleteTableRecord/{event_id}/pef_container_event",
+    query={"containerName": "dibDesignerHtml", "itemEventId": "ie162-dib"},
+)
+
+# ---------------------------------------------- #
+# Event wizard
+# ---------------------------------------------- #
+
+EVENT_TRIGGERS_PHP = _component_list(
+    "event_wizard.triggers_php", "dibDesignerAddEventPhp", 3517, "containerTrigger"
+)
+EVENT_TRIGGERS_JS = _component_list(
+    "event_wizard.triggers_js", "dibDesignerAddEventJs", 8334, "containerTrigger"
+)
+EVENT_DROPINS_PHP = _component_list(
+    "event_wizard.dropins_php", "dibDesignerAddEventPhp", 56, "dropin"
+)
+EVENT_DROPINS_JS = _component_list(
+    "event_wizard.dropins_js", "dibDesignerAddEventJs", 3497, "dropin"
+)
+EVENT_CLASSES_PHP = _component_list(
+    "event_wizard.classes_php", "dibDesignerAddEventPhp", 60, "class"
+)
+EVENT_ACTIONS_JS = _component_list(
+    "event_wizard.actions_js", "dibDesignerAddEventJs", 3500, "class"
+)
+EVENT_CREATE_PHP = Endpoint(
+    name="event_wizard.create_php",
+    path="/dropins/dibAdmin/DDesignerAddOn/createEvent",
+    query={"containerName": "dibDesignerAddEventPhp"},
+)
+EVENT_CREATE_JS = Endpoint(
+    name="event_wizard.create_js",
+    path="/dropins/dibAdmin/DDesignerAddOn/createEvent",
+    query={"type": "js", "containerName": "dibDesignerAddEventJs"},
+)
+
+# ---------------------------------------------- #
+# Application wizard
+# ---------------------------------------------- #
+
+APP_DATABASES = _component_list("app_wizard.databases", "wizBuildApp", 339, "id")
+APP_TEMPLATES = _component_list("app_wizard.templates", "wizBuildApp", 3039, "tmplId")
+APP_TEMPLATE_DESCRIPTION = Endpoint(
+    name="app_wizard.template_description",
+    path="/peff/Sync/setBaseDescription",
+    query={"containerName": "wizBuildApp"},
+    idempotent=True,
+)
+APP_FORM_DESIGNS = _component_list(
+    "app_wizard.form_designs", "wizBuildAppSettings", 367, "pef_form_design_id"
+)
+APP_GRID_DESIGNS = _component_list(
+    "app_wizard.grid_designs",
+    "wizBuildAppSettings",
+    366,
+    "pef_grid_design_id",
+    active_filter="wizBuildAppSettings_pef_grid_design_id",
+)
+APP_TABLES = Endpoint(
+    name="app_wizard.tables",
+    path="/peff/Crud/read/wizBuildAppGrid",
+    idempotent=True,
+)
+APP_UPDATE_TABLE = Endpoint(
+    name="app_wizard.update_table",
+    path="/peff/Crud/update/wizBuildAppGrid",
+    query={"primaryKeyData": "%7B%22id%22:{table_id}%7D"},
+    idempotent=True,
+    traffic="write",
+)
+APP_SETTINGS = Endpoint(
+    name="app_wizard.settings",
+    path="/peff/Sync/updateAllAppSettings",
+    query={"containerName": "wizBuildAppSettings"},
+)
+APP_BUILD = Endpoint(
+    name="app_wizard.build",
+    path="/peff/Sync/executeTasks",
+    query={"containerName": "wizBuildApp", "queueUid": None},
+)
+
+# ---------------------------------------------- #
+# Queues and docs
+# ---------------------------------------------- #
+
+QUEUE_GET = Endpoint(
+    name="queue.get",
+    path="/peff/Queue/get/{container_name}",
+    query={"queueItemId": None, "queueUid": None},
+    idempotent=True,
+)
+# The docs endpoints (path and query) come from the docs topic configs
+DOCS_CONTENT = Endpoint(
+    name="docs.content", path="{docs_path}", idempotent=True, traffic="docs"
+)
@@ -7,14 +7,17 @@ from typing import Any
 logger = logging.getLogger(__name__)
 
 
-def _load_env_file() -> None:
-    """Load .env and warn if it does not exist."""
+def _load_env_file(override: bool = False) -> None:
+    """
+    Load .env and warn if it does not exist. With `override`, values from .env
+    replace variables already set in the process environment.
+    """
     env_path = find_dotenv(".env", usecwd=True)
     if not env_path:
         logger.warning(".env file not found. Using process environment and defaults")
         return
 
-    load_dotenv(env_path)
+    load_dotenv(env_path, override=override)
 
     LOGGING_LEVEL = os.getenv("LOGGING_LEVEL")
     if LOGGING_LEVEL:
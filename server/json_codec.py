@@ -0,0 +1,81 @@
+import json
+import logging
+
+from typing import Any
+
+import requests
+
+from settings import get_settings
+
+try:
+    import orjson
+except ImportError:  # Optional, the standard library codec is used without it
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+
+def _backend(requested: str) -> str:
+    if requested == "json" or (requested == "auto" and orjson is None):
+        return "json"
+    if orjson is None:
+        logger.warning("JSON_BACKEND=orjson but orjson is not installed, using json")
+        return "json"
+    return "orjson"
+
+
+JSON_BACKEND: str = _backend(get_settings().json_backend)
+
+# Attribute under which the parsed body is kept on a requests.Response
+_PARSED_ATTR = "_dib_parsed_json"
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document. Raises ValueError when it is not valid JSON."""
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    """Serialize `value` as compact JSON text (non-ASCII kept, unknown types as str)."""
+    if JSON_BACKEND == "orjson":
+        try:
+            return orjson.dumps(
+                value, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which the standard codec handles
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def response_json(response: requests.Response) -> Any:
+    """
+    The parsed JSON body of `response`, parsed once however often it is asked
+    for (coalesced reads share one Response). Treat the result as read-only.
+
+    Raises ValueError, like `Response.json()`, when the body is not JSON.
+    """
+    parsed = getattr(response, _PARSED_ATTR, None)
+    if parsed is None:
+        try:
+            parsed = (True, _parse_body(response))
+        except ValueError as e:
+            parsed = (False, e)
+        setattr(response, _PARSED_ATTR, parsed)
+
+    ok, value = parsed
+    if not ok:
+        raise value
+    return value
+
+
+def _parse_body(response: requests.Response) -> Any:
+    if JSON_BACKEND == "orjson":
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            pass  # Not UTF-8 (or not JSON), decode as requests would
+    return json.loads(response.text)
@@ -0,0 +1,238 @@
+import argparse
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import sys
+
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from mcp.types import Tool as MCPTool
+
+from settings import get_settings
+from mcp_instance import TracedFastMCP, mcp
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+LAZY_TOOLS: bool = get_settings().lazy_tools
+TOOL_MANIFEST_FILE = Path(get_settings().tool_manifest_file)
+SERVER_ROOT = Path(__file__).resolve().parent
+
+# Modules registering tools, grouped by what has to be imported together for
+# the tools of a group to work (the wizards need their option providers)
+TOOL_MODULE_GROUPS: dict[str, tuple[str, ...]] = {
+    "designer": ("tools.designer.tools_designer",),
+    "auth": ("tools.tools_auth",),
+    "metrics": ("tools.tools_metrics",),
+    "docs": ("tools.tools_docs_resource",),
+    "results": ("tools.tools_results",),
+    "application_wizard": (
+        "tools.wizards.application_wizard.tools_application_wizard",
+        "tools.wizards.application_wizard.steps.option_providers_registration_app_wiz",
+    ),
+    "event_wizard": (
+        "tools.wizards.event_wizard.tools_event_wizard",
+        "tools.wizards.event_wizard.steps.option_providers_registration_event_wiz",
+    ),
+}
+
+
+def enabled_tool_groups() -> list[str]:
+    groups = list(TOOL_MODULE_GROUPS)
+    if not get_settings().expose_dib_docs_via_tools:
+        groups.remove("docs")
+    return groups
+
+
+def _eager_tool_groups() -> set[str]:
+    # The /metrics route is registered when tools_metrics is imported and has
+    # to exist before the HTTP app is built
+    if get_settings().metrics_http_enabled:
+        return {"metrics"}
+    return set()
+
+
+def _module_path(module_name: str) -> Path | None:
+    """The source file of a module of this server, None for any other module."""
+    base = SERVER_ROOT.joinpath(*module_name.split("."))
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.is_file():
+            return path
+    return None
+
+
+def _imported_names(path: Path, module_name: str) -> Iterator[str]:
+    """Names a module imports; for `from x import y` both x and x.y."""
+    package = (
+        module_name if path.name == "__init__.py" else module_name.rpartition(".")[0]
+    )
+    for node in ast.walk(ast.parse(path.read_bytes(), str(path))):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                base = importlib.util.resolve_name("." * node.level + base, package)
+            yield base
+            yield from (f"{base}.{alias.name}" for alias in node.names)
+
+
+def group_sources(group: str) -> list[str]:
+    """
+    The source files (relative to SERVER_ROOT) of the group's modules and of
+    every server module they import, directly or indirectly.
+    """
+    sources: dict[str, Path] = {}
+    pending = list(TOOL_MODULE_GROUPS[group])
+    for module_name in pending:
+        if _module_path(module_name) is None:
+            raise ModuleNotFoundError(module_name)
+
+    while pending:
+        module_name = pending.pop()
+        path = _module_path(module_name)
+        if path is None or module_name in sources:
+            continue
+        sources[module_name] = path
+        # Importing a.b.c runs the packages a and a.b as well
+        parts = module_name.split(".")
+        pending.extend(".".join(parts[:i]) for i in range(1, len(parts)))
+        pending.extend(_imported_names(path, module_name))
+
+    return sorted(
+        {path.relative_to(SERVER_ROOT).as_posix() for path in sources.values()}
+    )
+
+
+def _sources_fingerprint(sources: list[str]) -> str:
+    """Hash of the given source files, to detect a stale manifest."""
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.encode())
+        digest.update((SERVER_ROOT / source).read_bytes())
+    return digest.hexdigest()
+
+
+def _entry_is_current(entry: dict[str, Any]) -> bool:
+    """Whether none of the sources a manifest entry was built from changed."""
+    try:
+        fingerprint = _sources_fingerprint(entry.get("sources", []))
+    except OSError:
+        return False
+    return entry.get("fingerprint") == fingerprint
+
+
+def import_tool_group(mcp: TracedFastMCP, group: str) -> list[str]:
+    """
+    Import the modules of a tool group (registering their tools) and return
+    the names of the tools the group registered.
+    """
+    before = {tool.name for tool in mcp._tool_manager.list_tools()}
+    for module_name in TOOL_MODULE_GROUPS[group]:
+        importlib.import_module(module_name)
+    after = [tool.name for tool in mcp._tool_manager.list_tools()]
+    return [name for name in after if name not in before]
+
+
+def _tool_declaration(tool: Any) -> dict[str, Any]:
+    return MCPTool(
+        name=tool.name,
+        title=tool.title,
+        description=tool.description,
+        inputSchema=tool.parameters,
+        outputSchema=tool.output_schema,
+        annotations=tool.annotations,
+        icons=tool.icons,
+        _meta=tool.meta,
+    ).model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def build_manifest(mcp: TracedFastMCP) -> dict[str, Any]:
+    """Import every tool group and record the schemas of the tools it registers."""
+    groups: dict[str, Any] = {}
+    for group in TOOL_MODULE_GROUPS:
+        names = set(import_tool_group(mcp, group))
+        sources = group_sources(group)
+        groups[group] = {
+            "sources": sources,
+            "fingerprint": _sources_fingerprint(sources),
+            "tools": [
+                _tool_declaration(tool)
+                for tool in mcp._tool_manager.list_tools()
+                if tool.name in names
+            ],
+        }
+    return {"groups": groups}
+
+
+def load_manifest(path: Path = TOOL_MANIFEST_FILE) -> dict[str, Any] | None:
+    if not path.exists():
+        logger.warning("Tool manifest %s not found", path)
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read tool manifest %s: %s", path, e)
+        return None
+
+
+def register_tools(mcp: TracedFastMCP, lazy: bool = LAZY_TOOLS) -> None:
+    """
+    Register the tools of all enabled groups.
+
+    Eagerly this imports every tool module. Lazily, each group whose manifest
+    entry matches its sources (its modules and the server modules they import)
+    is only declared from the manifest and imported on the first call of one
+    of its tools; other groups are imported as usual.
+    """
+    groups = enabled_tool_groups()
+    manifest = load_manifest() if lazy else None
+    eager = _eager_tool_groups()
+
+    for group in groups:
+        entry = (manifest or {}).get("groups", {}).get(group)
+        if lazy and group not in eager:
+            if entry is not None and _entry_is_current(entry):
+                mcp.defer_tools(
+                    [MCPTool.model_validate(tool) for tool in entry["tools"]],
+                    load=lambda group=group: import_tool_group(mcp, group),
+                )
+                continue
+            logger.warning(
+                "Tool manifest is missing or stale for '%s', importing it now. "
+                "Regenerate it with `python server/lazy_tools.py`",
+                group,
+            )
+        import_tool_group(mcp, group)
+
+
+def register_resources(
+    mcp: TracedFastMCP, register: Callable[[], None], lazy: bool = LAZY_TOOLS
+) -> None:
+    """
+    Call `register`, which registers resources, now or (lazily) on the first
+    request that lists or reads resources.
+    """
+    if lazy:
+        mcp.defer_resources(register)
+    else:
+        register()
+
+
+if __name__ == "__main__":
+    # Regenerate the tool manifest (run from the repository root)
+    parser = argparse.ArgumentParser(
+        description="Write the tool manifest used by LAZY_TOOLS"
+    )
+    parser.add_argument("--output", type=Path, default=TOOL_MANIFEST_FILE)
+    args = parser.parse_args()
+
+    manifest = build_manifest(mcp)
+    args.output.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    tool_count = sum(len(group["tools"]) for group in manifest["groups"].values())
+    print(f"Wrote {tool_count} tools to {args.output}", file=sys.stderr)
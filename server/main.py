@@ -1,44 +1,38 @@
-import os
 import logging
 
 from pathlib import Path
 
-from env_variables import get_env, _to_bool
+from settings import get_settings, install_reload_handler
 from mcp_instance import mcp
 
 
 # Very important to import all tool/resource/prompt files so they get registered
 
-# Tools
-from tools.designer import tools_designer
-from tools import (
-    tools_auth,
-)
+from lazy_tools import register_resources, register_tools
 
-if get_env("EXPOSE_DIB_DOCS_VIA_TOOLS", False, _to_bool):
-    from tools import tools_docs_resource
+# Resources, registered now or (with LAZY_TOOLS) when resources are first used
+RESOURCES_ROOT = Path("server/resources")
 
-# Wizards
-from tools.wizards.application_wizard import tools_application_wizard
-from tools.wizards.application_wizard.steps import option_providers_registration_app_wiz
 
-from tools.wizards.event_wizard import tools_event_wizard
-from tools.wizards.event_wizard.steps import option_providers_registration_event_wiz
+def _register_dib_docs() -> None:
+    from resources.dib_docs.docs_resource_factory import register_dib_docs
 
-# Resources
-from resources.dib_docs.docs_resource_factory import register_dib_docs
+    register_dib_docs(
+        mcp,
+        resources_root=RESOURCES_ROOT,
+    )
 
-RESOURCES_ROOT = Path("server/resources")
-register_dib_docs(
-    mcp,
-    resources_root=RESOURCES_ROOT,
-)
+
+register_resources(mcp, _register_dib_docs)
+
+# Tools, imported now or (with LAZY_TOOLS) on their first call
+register_tools(mcp)
 
 # Prompts
 from prompts import system_prompt
 
 logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
 
 
 def debug_main() -> None:
@@ -59,12 +53,15 @@ def debug_main() -> None:
 
 
 if __name__ == "__main__":
-    if get_env("DEBUG_MODE", False, _to_bool):
+    if get_settings().debug_mode:
         debug_main()
     else:
-        transport = os.getenv("MCP_TRANSPORT", "stdio")
+        settings = get_settings()
+        install_reload_handler()
 
-        if transport == "http":
+        if settings.mcp_transport == "http":
+            mcp.settings.host = settings.mcp_host or mcp.settings.host
+            mcp.settings.port = settings.mcp_port or mcp.settings.port
             mcp.run(transport="streamable-http")
         else:
             mcp.run(transport="stdio")
@@ -1,3 +1,100 @@
+import threading
+
+from typing import Any, Callable, Iterable
+
 from mcp.server.fastmcp import FastMCP
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource as MCPResource
+from mcp.types import ResourceTemplate as MCPResourceTemplate
+from mcp.types import Tool as MCPTool
+from pydantic import AnyUrl
+
+from tracing import span
+
+
+class TracedFastMCP(FastMCP):
+    """
+    FastMCP that runs every tool call inside a tracing span.
+
+    Tools can also be deferred: declared from their schema only, with the
+    module implementing them imported on the first call (see lazy_tools.py).
+    Resources can be deferred as a whole, they are then registered on the
+    first request that lists or reads resources.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._deferred_tools: dict[str, MCPTool] = {}
+        self._deferred_loaders: dict[str, Callable[[], None]] = {}
+        self._deferred_lock = threading.Lock()
+        self._resource_loaders: list[Callable[[], None]] = []
+        self._resource_lock = threading.Lock()
+
+    def defer_tools(self, tools: list[MCPTool], load: Callable[[], None]) -> None:
+        """
+        Declare `tools` without registering them. `load` must register the
+        real tools and is called once, on the first call of any of them.
+        """
+        for tool in tools:
+            self._deferred_tools[tool.name] = tool
+            self._deferred_loaders[tool.name] = load
+
+    def _load_deferred(self, name: str) -> None:
+        with self._deferred_lock:
+            load = self._deferred_loaders.get(name)
+            if load is None:  # Loaded meanwhile
+                return
+            load()
+            for tool_name, tool_load in list(self._deferred_loaders.items()):
+                if tool_load is load:
+                    del self._deferred_loaders[tool_name]
+                    del self._deferred_tools[tool_name]
+
+    def defer_resources(self, load: Callable[[], None]) -> None:
+        """Call `load`, which registers resources, only once they are first needed."""
+        with self._resource_lock:
+            self._resource_loaders.append(load)
+
+    def load_deferred_resources(self) -> None:
+        """Register the deferred resources now, if that did not happen yet."""
+        with self._resource_lock:
+            while self._resource_loaders:
+                load = self._resource_loaders.pop(0)
+                with span("resources.load"):
+                    load()
+
+    async def list_resources(self) -> list[MCPResource]:
+        self.load_deferred_resources()
+        return await super().list_resources()
+
+    async def list_resource_templates(self) -> list[MCPResourceTemplate]:
+        self.load_deferred_resources()
+        return await super().list_resource_templates()
+
+    async def read_resource(self, uri: AnyUrl | str) -> Iterable[ReadResourceContents]:
+        self.load_deferred_resources()
+        return await super().read_resource(uri)
+
+    async def list_tools(self) -> list[MCPTool]:
+        tools = await super().list_tools()
+        registered = {tool.name for tool in tools}
+        return tools + [
+            tool
+            for name, tool in self._deferred_tools.items()
+            if name not in registered
+        ]
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Any:
+        try:
+            request_id = self._mcp_server.request_context.request_id
+        except LookupError:  # Called outside of a request
+            request_id = None
+
+        with span(f"tool.{name}", tool=name, request_id=request_id):
+            if name in self._deferred_loaders:
+                with span("tool.load", tool=name):
+                    self._load_deferred(name)
+            return await super().call_tool(name, arguments)
+
 
-mcp = FastMCP(name="DIB MCP Server")
+mcp = TracedFastMCP(name="DIB MCP Server")
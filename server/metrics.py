@@ -0,0 +1,373 @@
+import re
+import threading
+import time
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+# Upper bounds (seconds) of the latency histogram buckets, +Inf is implicit
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_NUMERIC_SEGMENT_RE = re.compile(r"^\d+$")
+_UUID_SEGMENT_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}$")
+
+
+def path_template(url: str) -> str:
+    """
+    Reduce a Dropinbase URL to a low-cardinality path template.
+
+    - The scheme, host and query string are dropped.
+    - Numeric and UUID segments become `{id}`.
+    - `/peff/<Controller>/<action>/<containerName>` keeps the controller and
+      action; the container name becomes `{container}`.
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+
+    templated: list[str] = []
+    for idx, segment in enumerate(segments):
+        if _NUMERIC_SEGMENT_RE.match(segment) or _UUID_SEGMENT_RE.match(segment):
+            templated.append("{id}")
+        elif segments[0] == "peff" and idx >= 3:
+            templated.append("{container}")
+        else:
+            templated.append(segment)
+
+    return "/" + "/".join(templated)
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram in the style of Prometheus."""
+
+    bounds: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, cumulative count) pairs, ending with +Inf."""
+        pairs: list[tuple[str, int]] = []
+        running = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            running += bucket_count
+            pairs.append((f"{bound:g}", running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Approximate quantile, the upper bound of the bucket that contains it.
+        None when empty or when the quantile lies beyond the largest bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, (_, cumulative) in zip(self.bounds, self.cumulative()):
+            if cumulative >= rank:
+                return bound
+        return None
+
+
+@dataclass
+class EndpointStats:
+    latency: Histogram = field(default_factory=Histogram)
+    status_codes: dict[str, int] = field(default_factory=dict)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    backoff_retries: int = 0
+    # Requests answered by an identical request already in flight
+    coalesced: int = 0
+
+
+@dataclass
+class LimiterStats:
+    acquired: int = 0
+    # Requests that had to wait for a slot or token
+    waited: int = 0
+    wait_seconds: float = 0.0
+    timeouts: int = 0
+
+
+# Waits shorter than this are not counted as saturation
+LIMITER_WAIT_THRESHOLD_SECONDS = 0.001
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process metrics for outbound Dropinbase requests.
+
+    Requests are grouped by (method, path template). Transport errors are
+    counted under their exception name instead of a status code.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], EndpointStats] = {}
+        self._limiter: dict[tuple[str, str], LimiterStats] = {}
+        self._logins = 0
+        self._relogins = 0
+        self._started_at = time.time()
+
+    def _stats(self, method: str, url: str) -> EndpointStats:
+        key = (method.upper(), path_template(url))
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats()
+        return stats
+
+    def record_request(
+        self,
+        method: str,
+        url: str,
+        status: int | str,
+        duration_seconds: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._stats(method, url)
+            stats.latency.observe(duration_seconds)
+            stats.status_codes[str(status)] = stats.status_codes.get(str(status), 0) + 1
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+
+    def record_retry(self, method: str, url: str) -> None:
+        with self._lock:
+            self._stats(method, url).retries += 1
+
+    def record_backoff_retry(self, method: str, url: str) -> None:
+        with self._lock:
+            self._stats(method, url).backoff_retries += 1
+
+    def record_coalesced(self, method: str, url: str) -> None:
+        with self._lock:
+            self._stats(method, url).coalesced += 1
+
+    def _limiter_stats(self, traffic: str, priority: str) -> LimiterStats:
+        stats = self._limiter.get((traffic, priority))
+        if stats is None:
+            stats = self._limiter[(traffic, priority)] = LimiterStats()
+        return stats
+
+    def record_limiter_wait(self, traffic: str, priority: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._limiter_stats(traffic, priority)
+            stats.acquired += 1
+            if seconds >= LIMITER_WAIT_THRESHOLD_SECONDS:
+                stats.waited += 1
+                stats.wait_seconds += seconds
+
+    def record_limiter_timeout(self, traffic: str, priority: str) -> None:
+        with self._lock:
+            self._limiter_stats(traffic, priority).timeouts += 1
+
+    def record_login(self) -> None:
+        with self._lock:
+            self._logins += 1
+
+    def record_relogin(self) -> None:
+        with self._lock:
+            self._relogins += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._limiter.clear()
+            self._logins = 0
+            self._relogins = 0
+            self._started_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON friendly summary of all metrics since start (or the last reset)."""
+        with self._lock:
+            endpoints = []
+            for (method, template), stats in sorted(self._endpoints.items()):
+                latency = stats.latency
+                endpoints.append(
+                    {
+                        "method": method,
+                        "path": template,
+                        "count": latency.count,
+                        "status_codes": dict(stats.status_codes),
+                        "retries": stats.retries,
+                        "backoff_retries": stats.backoff_retries,
+                        "coalesced": stats.coalesced,
+                        "bytes_sent": stats.bytes_sent,
+                        "bytes_received": stats.bytes_received,
+                        "latency_seconds": {
+                            "avg": (
+                                round(latency.total / latency.count, 4)
+                                if latency.count
+                                else None
+                            ),
+                            "p50": latency.quantile(0.5),
+                            "p95": latency.quantile(0.95),
+                            "p99": latency.quantile(0.99),
+                            "buckets": dict(latency.cumulative()),
+                        },
+                    }
+                )
+
+            return {
+                "since": self._started_at,
+                "logins": self._logins,
+                "relogins": self._relogins,
+                "endpoints": endpoints,
+                "limiter": [
+                    {
+                        "traffic": traffic,
+                        "priority": priority,
+                        "acquired": stats.acquired,
+                        "waited": stats.waited,
+                        "wait_seconds": round(stats.wait_seconds, 4),
+                        "timeouts": stats.timeouts,
+                    }
+                    for (traffic, priority), stats in sorted(self._limiter.items())
+                ],
+            }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def labels(**values: str) -> str:
+            inner = ",".join(
+                f'{name}="{_escape_label(value)}"' for name, value in values.items()
+            )
+            return "{" + inner + "}"
+
+        with self._lock:
+            items = sorted(self._endpoints.items())
+
+            lines.append(
+                "# HELP dib_request_duration_seconds Latency of Dropinbase requests."
+            )
+            lines.append("# TYPE dib_request_duration_seconds histogram")
+            for (method, template), stats in items:
+                for le, cumulative in stats.latency.cumulative():
+                    lines.append(
+                        f"dib_request_duration_seconds_bucket"
+                        f"{labels(method=method, path=template, le=le)} {cumulative}"
+                    )
+                base = labels(method=method, path=template)
+                lines.append(
+                    f"dib_request_duration_seconds_sum{base} {stats.latency.total}"
+                )
+                lines.append(
+                    f"dib_request_duration_seconds_count{base} {stats.latency.count}"
+                )
+
+            lines.append(
+                "# HELP dib_requests_total Dropinbase requests by status code."
+            )
+            lines.append("# TYPE dib_requests_total counter")
+            for (method, template), stats in items:
+                for status, count in sorted(stats.status_codes.items()):
+                    lines.append(
+                        f"dib_requests_total"
+                        f"{labels(method=method, path=template, status=status)} {count}"
+                    )
+
+            for name, attr, help_text in (
+                (
+                    "dib_request_bytes_sent_total",
+                    "bytes_sent",
+                    "Request body bytes sent.",
+                ),
+                (
+                    "dib_request_bytes_received_total",
+                    "bytes_received",
+                    "Response body bytes received.",
+                ),
+                (
+                    "dib_request_retries_total",
+                    "retries",
+                    "Requests retried after an expired session.",
+                ),
+                (
+                    "dib_request_backoff_retries_total",
+                    "backoff_retries",
+                    "Requests retried after a transient failure.",
+                ),
+                (
+                    "dib_request_coalesced_total",
+                    "coalesced",
+                    "Requests served by an identical request in flight.",
+                ),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, template), stats in items:
+                    lines.append(
+                        f"{name}{labels(method=method, path=template)} {getattr(stats, attr)}"
+                    )
+
+            limiter = sorted(self._limiter.items())
+            for name, attr, help_text in (
+                (
+                    "dib_limiter_waits_total",
+                    "waited",
+                    "Requests delayed by the client-side rate limiter.",
+                ),
+                (
+                    "dib_limiter_wait_seconds_total",
+                    "wait_seconds",
+                    "Time requests spent waiting for the rate limiter.",
+                ),
+                (
+                    "dib_limiter_timeouts_total",
+                    "timeouts",
+                    "Requests failed after waiting for the rate limiter too long.",
+                ),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (traffic, priority), stats in limiter:
+                    lines.append(
+                        f"{name}{labels(traffic=traffic, priority=priority)} {getattr(stats, attr)}"
+                    )
+
+            lines.append(
+                "# HELP dib_logins_total Logins performed, including re-logins."
+            )
+            lines.append("# TYPE dib_logins_total counter")
+            lines.append(f"dib_logins_total {self._logins}")
+            lines.append(
+                "# HELP dib_relogins_total Re-logins after an expired session."
+            )
+            lines.append("# TYPE dib_relogins_total counter")
+            lines.append(f"dib_relogins_total {self._relogins}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Create a global instance
+REQUEST_METRICS = MetricsRegistry()
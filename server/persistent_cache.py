@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from pathlib import Path
+from typing import Any
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+
+class JsonFileCache:
+    """
+    Small key/value cache persisted to a JSON file, shared across server runs.
+
+    File format:
+
+      {
+        "<key>": {"value": <any JSON value>, "stored_at": <unix timestamp>},
+        ...
+      }
+
+    Entries older than `ttl_seconds` are treated as missing. The file is loaded
+    lazily on first access and rewritten atomically on every `set_many`.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable cache file %s: %s", self.path, e)
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._load().get(key)
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - float(entry.get("stored_at", 0)) > self.ttl_seconds:
+            return None
+        return entry.get("value")
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        if not values:
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            for key, value in values.items():
+                entries[key] = {"value": value, "stored_at": now}
+
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with tmp_path.open("w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                # The in-memory entries still serve this process
+                logger.warning("Could not persist cache file %s: %s", self.path, e)
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
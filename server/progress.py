@@ -0,0 +1,56 @@
+import functools
+import logging
+
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+
+from mcp.server.fastmcp import Context
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+T = TypeVar("T")
+
+
+class ProgressReporter:
+    """
+    Forwards progress from blocking code to the MCP client as progress
+    notifications.
+
+    Must be used from a worker thread started by `run_sync_with_progress`
+    (the notification is sent on the event loop). Without a context, or when
+    the client did not ask for progress, reporting is a no-op.
+    """
+
+    def __init__(self, ctx: Context | None = None) -> None:
+        self._ctx = ctx
+
+    def report(
+        self, progress: float, total: float | None = None, message: str | None = None
+    ) -> None:
+        if self._ctx is None:
+            return
+        try:
+            anyio.from_thread.run(self._ctx.report_progress, progress, total, message)
+        except Exception as e:
+            # Progress is best effort and must never fail the actual work
+            logger.debug("Could not report progress: %s", e)
+
+
+NO_PROGRESS = ProgressReporter()
+
+
+async def run_sync_with_progress(
+    ctx: Context | None, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+) -> T:
+    """
+    Run blocking `fn(*args, progress=ProgressReporter(ctx), **kwargs)` in a
+    worker thread, so the event loop stays free to deliver its progress.
+    """
+    call = functools.partial(fn, *args, progress=ProgressReporter(ctx), **kwargs)
+    return await anyio.to_thread.run_sync(call)
@@ -0,0 +1,320 @@
+import contextvars
+import logging
+import math
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Any, Iterator, Literal, Mapping
+
+from metrics import REQUEST_METRICS
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+TrafficClass = Literal["read", "write", "docs"]
+Priority = Literal["interactive", "background"]
+
+
+class OutboundLimitTimeout(TimeoutError):
+    """Raised when a request could not get a slot or token within the max wait."""
+
+
+class PriorityHandle:
+    """
+    The priority of the requests sent within a `background_priority()` block.
+
+    Background until `boost` is called, e.g. when an interactive caller starts
+    waiting for the result of that background work. Requests still waiting for
+    a slot or token then compete as interactive ones.
+    """
+
+    def __init__(self) -> None:
+        self._boosted = False
+        self._waiting_on: list[threading.Condition] = []
+        self._lock = threading.Lock()
+
+    @property
+    def priority(self) -> Priority:
+        return "interactive" if self._boosted else "background"
+
+    def boost(self) -> None:
+        with self._lock:
+            if self._boosted:
+                return
+            self._boosted = True
+            waiting_on = list(self._waiting_on)
+        for cond in waiting_on:
+            with cond:
+                cond.notify_all()
+
+    def _watch(self, cond: threading.Condition) -> None:
+        with self._lock:
+            self._waiting_on.append(cond)
+
+    def _unwatch(self, cond: threading.Condition) -> None:
+        with self._lock:
+            self._waiting_on.remove(cond)
+
+
+# Requests are interactive unless sent from within `background_priority()`
+_priority: contextvars.ContextVar[PriorityHandle | None] = contextvars.ContextVar(
+    "dib_request_priority", default=None
+)
+
+
+def current_priority() -> Priority:
+    handle = _priority.get()
+    return handle.priority if handle is not None else "interactive"
+
+
+def current_priority_handle() -> PriorityHandle | None:
+    """The handle of the enclosing `background_priority()` block, if any."""
+    return _priority.get()
+
+
+@contextmanager
+def background_priority() -> Iterator[PriorityHandle]:
+    """
+    Mark the requests sent within the block as background traffic (prefetch,
+    warm-up). Nested blocks share the outer block's handle.
+    """
+    handle = _priority.get()
+    if handle is not None:
+        yield handle
+        return
+
+    handle = PriorityHandle()
+    token = _priority.set(handle)
+    try:
+        yield handle
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    """
+    A caller waiting on `cond` with the priority of `handle` (interactive when
+    None), which may be boosted while it waits.
+    """
+
+    def __init__(
+        self, handle: PriorityHandle | None, cond: threading.Condition
+    ) -> None:
+        self.handle = handle
+        self.cond = cond
+        self.background = handle is not None and handle.priority == "background"
+
+    def __enter__(self) -> "_Waiter":
+        if self.handle is not None:
+            self.handle._watch(self.cond)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.handle is not None:
+            self.handle._unwatch(self.cond)
+
+    def boosted(self) -> bool:
+        """Whether the caller turned interactive since the last check."""
+        if self.background and self.handle.priority == "interactive":
+            self.background = False
+            return True
+        return False
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, bursts of up to `burst`.
+    A background caller only takes a token when no interactive caller waits.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def acquire(self, handle: PriorityHandle | None, deadline: float) -> bool:
+        with self._cond, _Waiter(handle, self._cond) as waiter:
+            if not waiter.background:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    if waiter.boosted():
+                        self._interactive_waiting += 1
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1 and not (
+                        waiter.background and self._interactive_waiting
+                    ):
+                        self._tokens -= 1
+                        return True
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    missing = 1 - self._tokens
+                    next_token = (missing if missing > 0 else 1) / self._rate
+                    self._cond.wait(min(next_token, remaining))
+            finally:
+                if not waiter.background:
+                    self._interactive_waiting -= 1
+
+
+class PrioritySemaphore:
+    """
+    At most `limit` requests in flight, of which at most `background_limit`
+    background ones. Waiting interactive callers are served first.
+    """
+
+    def __init__(self, limit: int, background_limit: int) -> None:
+        self.limit = limit
+        self.background_limit = background_limit
+        self._in_use = 0
+        self._background_in_use = 0
+        self._interactive_waiting = 0
+        self._background_waiting = 0
+        self._cond = threading.Condition()
+
+    def _blocked(self, background: bool) -> bool:
+        if self._in_use >= self.limit:
+            return True
+        return background and (
+            self._interactive_waiting > 0
+            or self._background_in_use >= self.background_limit
+        )
+
+    def acquire(
+        self, handle: PriorityHandle | None, deadline: float
+    ) -> Priority | None:
+        """
+        Take a slot, returning the priority it was granted at (pass it back to
+        `release`), or None when none was free before `deadline`.
+        """
+        with self._cond, _Waiter(handle, self._cond) as waiter:
+            if waiter.background:
+                self._background_waiting += 1
+            else:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    if waiter.boosted():
+                        self._background_waiting -= 1
+                        self._interactive_waiting += 1
+                    if not self._blocked(waiter.background):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+                self._in_use += 1
+                if waiter.background:
+                    self._background_in_use += 1
+                    return "background"
+                return "interactive"
+            finally:
+                if waiter.background:
+                    self._background_waiting -= 1
+                else:
+                    self._interactive_waiting -= 1
+
+    def release(self, granted: Priority) -> None:
+        with self._cond:
+            self._in_use -= 1
+            if granted == "background":
+                self._background_in_use -= 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_use,
+                "background_in_flight": self._background_in_use,
+                "interactive_waiting": self._interactive_waiting,
+                "background_waiting": self._background_waiting,
+            }
+
+
+class OutboundLimiter:
+    """
+    Client-side limits on the requests sent to Dropinbase: a token bucket
+    shared by all requests and a concurrency cap per traffic class.
+
+    Background requests may use at most `background_share` of the slots of a
+    class and always queue behind interactive ones, until their handle is
+    boosted. A request that cannot go out within `max_wait_seconds` fails
+    with OutboundLimitTimeout.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        limits: Mapping[TrafficClass, int],
+        background_share: float,
+        max_wait_seconds: float,
+    ) -> None:
+        self._bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self._semaphores = {
+            traffic: PrioritySemaphore(
+                limit, max(1, math.floor(limit * background_share))
+            )
+            for traffic, limit in limits.items()
+        }
+        self._max_wait_seconds = max_wait_seconds
+
+    @contextmanager
+    def slot(self, traffic: TrafficClass) -> Iterator[None]:
+        """Hold a slot of `traffic` (after taking a token) for the duration of a request."""
+        handle = current_priority_handle()
+        semaphore = self._semaphores[traffic]
+        started = time.monotonic()
+        deadline = started + self._max_wait_seconds
+
+        granted = semaphore.acquire(handle, deadline)
+        if granted is None:
+            REQUEST_METRICS.record_limiter_timeout(traffic, current_priority())
+            raise OutboundLimitTimeout(
+                f"No free '{traffic}' slot for a request to Dropinbase within "
+                f"{self._max_wait_seconds:.0f} seconds."
+            )
+        try:
+            if self._bucket is not None and not self._bucket.acquire(handle, deadline):
+                REQUEST_METRICS.record_limiter_timeout(traffic, current_priority())
+                raise OutboundLimitTimeout(
+                    f"Request rate limit toward Dropinbase still exceeded after "
+                    f"{self._max_wait_seconds:.0f} seconds."
+                )
+            REQUEST_METRICS.record_limiter_wait(
+                traffic, current_priority(), time.monotonic() - started
+            )
+            yield
+        finally:
+            semaphore.release(granted)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {traffic: sem.snapshot() for traffic, sem in self._semaphores.items()}
+
+
+OUTBOUND_LIMITER = OutboundLimiter(
+    rate=get_settings().dib_rate_limit_per_second,
+    burst=get_settings().dib_rate_limit_burst,
+    limits={
+        "read": get_settings().dib_max_concurrent_reads,
+        "write": get_settings().dib_max_concurrent_writes,
+        "docs": get_settings().dib_max_concurrent_docs,
+    },
+    background_share=get_settings().dib_background_share,
+    max_wait_seconds=get_settings().dib_limit_max_wait_seconds,
+)
@@ -4,14 +4,15 @@ import logging
 from pathlib import Path
 from typing import Any
 
-from env_variables import get_env
-from session_auth import dib_session_client
+from endpoints import DOCS_CONTENT, call_endpoint
+from json_codec import response_json
+from settings import get_settings
 
 from .resource_registry import DocResourceMeta, DOCS_BY_NAME
 
 
 logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
 
 
 def _load_json(path: Path) -> dict:
@@ -46,20 +47,14 @@ def fetch_endpoint_content(endpoint: str, payload: Any | None = None) -> str:
 
     `endpoint` is a path like '/dropins/dibDocs/Template/content/dibDocs/dib/?area=...'.
     """
-    url = f"{get_env("BASE_URL", "https://localhost")}{endpoint}"
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    resp = dib_session_client.request("POST", url=url, headers=headers, json=payload)
+    resp = call_endpoint(DOCS_CONTENT, payload=payload, docs_path=endpoint)
     resp.raise_for_status()
 
     # Isolate response records containing content
     TARGET_FIELD = "records"
-    if TARGET_FIELD in resp.json():
-        records = resp.json()[TARGET_FIELD]
+    data = response_json(resp)
+    if TARGET_FIELD in data:
+        records = data[TARGET_FIELD]
 
         return records
 
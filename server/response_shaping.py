@@ -0,0 +1,237 @@
+import logging
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+from json_codec import dumps
+from result_store import paginate
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+RESPONSE_SHAPING_ENABLED: bool = get_settings().response_shaping_enabled
+
+# Keys of the Dropinbase response envelope that only matter to its own client.
+# The messages carried by `actions` are kept (see `strip_envelope`).
+ENVELOPE_KEYS = frozenset(
+    {
+        "actions",
+        "showType",
+        "messageDelay",
+        "clickOutsideToClose",
+        "restoreFocus",
+        "asyncInterval",
+        "asyncRetry",
+        "queueUid",
+        "secureId",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ResponseProfile:
+    """
+    How the response of a tool is shaped before it is returned to the client.
+
+    - `max_bytes`: budget for the serialized response. Over budget, nested
+      objects are reduced to their ids, deepest first, until it fits.
+    - `paginate`: over budget, keep every detail and return the response in
+      pages of `max_bytes` instead (see `result_store.paginate`).
+    - `max_depth`: objects nested deeper than this are reduced to their ids
+      (None keeps every level unless the budget requires otherwise).
+    - `prune_empty`: leave out null, "", [] and {} values.
+    - `aliases`: shorter names for verbose keys.
+    """
+
+    max_bytes: int = 16_000
+    max_depth: int | None = None
+    prune_empty: bool = True
+    paginate: bool = False
+    aliases: Mapping[str, str] = field(default_factory=dict)
+
+
+@lru_cache(maxsize=1024)
+def is_id_key(key: str) -> bool:
+    """Keys the agent needs to refer to records, kept whatever the shaping."""
+    return key == "id" or key.endswith(("_id", "Id", "_ids", "Ids"))
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def _holds_objects(value: Any) -> bool:
+    if isinstance(value, dict):
+        return True
+    return isinstance(value, list) and any(isinstance(v, dict) for v in value)
+
+
+@dataclass(frozen=True)
+class _Options:
+    fields: frozenset[str] | None
+    max_depth: int | None
+    prune_empty: bool
+    aliases: Mapping[str, str]
+
+
+def _ids_only(value: Any, options: _Options) -> Any:
+    """Reduce `value` to the ids it contains, at any depth."""
+    if isinstance(value, list):
+        items = [_ids_only(item, options) for item in value if _holds_objects(item)]
+        return [item for item in items if item]
+
+    out: dict[str, Any] = {}
+    for key, item in value.items():
+        if is_id_key(key):
+            if not _is_empty(item):
+                out[options.aliases.get(key, key)] = item
+        elif _holds_objects(item):
+            reduced = _ids_only(item, options)
+            if reduced:
+                out[options.aliases.get(key, key)] = reduced
+    return out
+
+
+def _shape(value: Any, depth: int, options: _Options) -> Any:
+    if isinstance(value, list):
+        items = [_shape(item, depth, options) for item in value]
+        if options.prune_empty:
+            items = [item for item in items if not _is_empty(item)]
+        return items
+
+    if not isinstance(value, dict):
+        return value
+
+    if options.max_depth is not None and depth > options.max_depth:
+        return _ids_only(value, options)
+
+    out: dict[str, Any] = {}
+    for key, item in value.items():
+        if (
+            options.fields is not None
+            and key not in options.fields
+            and not is_id_key(key)
+            and not _holds_objects(item)
+        ):
+            continue
+        shaped = _shape(item, depth + 1, options)
+        if options.prune_empty and _is_empty(shaped):
+            continue
+        out[options.aliases.get(key, key)] = shaped
+    return out
+
+
+def _depth(value: Any) -> int:
+    """Nesting depth of the objects in `value` (lists do not count)."""
+    if isinstance(value, dict):
+        return 1 + max((_depth(v) for v in value.values()), default=0)
+    if isinstance(value, list):
+        return max((_depth(v) for v in value), default=0)
+    return 0
+
+
+def to_compact_json(value: Any) -> str:
+    return dumps(value)
+
+
+def action_messages(actions: Any) -> list[str]:
+    """The user-facing messages of Dropinbase response actions (their params)."""
+    messages: list[str] = []
+    for action in actions if isinstance(actions, list) else []:
+        params = action.get("params") if isinstance(action, dict) else None
+        if isinstance(params, dict):
+            for key in ("message", "msg", "text"):
+                if params.get(key):
+                    messages.append(str(params[key]))
+    return messages
+
+
+def strip_envelope(data: Any) -> Any:
+    """
+    Drop the Dropinbase envelope keys from a response body. Its actions are
+    reduced to the messages they would show, under `action_messages`.
+    """
+    if not isinstance(data, dict):
+        return data
+    stripped = {key: value for key, value in data.items() if key not in ENVELOPE_KEYS}
+    messages = action_messages(data.get("actions"))
+    if messages:
+        stripped["action_messages"] = messages
+    return stripped
+
+
+def shape_response(
+    data: Any,
+    profile: ResponseProfile,
+    *,
+    fields: Iterable[str] | None = None,
+    max_depth: int | None = None,
+    source: str = "response",
+) -> Any:
+    """
+    Shape a tool response per `profile` and return it as compact JSON text.
+
+    `fields` keeps only the named keys of every object (ids, and keys holding
+    nested objects, are always kept) and `max_depth` overrides the profile's
+    depth. When the budget forces a lower depth, a `_shaping` entry tells the
+    agent what was trimmed and how to ask for more. Profiles that paginate
+    return the first page and its cursor instead, `source` naming the result.
+
+    With RESPONSE_SHAPING_ENABLED=false, `data` is returned unchanged.
+    """
+    if not RESPONSE_SHAPING_ENABLED:
+        return data
+
+    options = _Options(
+        fields=frozenset(fields) if fields is not None else None,
+        max_depth=max_depth if max_depth is not None else profile.max_depth,
+        prune_empty=profile.prune_empty,
+        aliases=profile.aliases,
+    )
+    shaped = _shape(data, 1, options)
+    text = to_compact_json(shaped)
+    if len(text) <= profile.max_bytes:
+        return text
+    if profile.paginate:
+        return paginate(text, source, profile.max_bytes)
+
+    untrimmed_bytes = len(text)
+    # Never show more than asked for, however deep the ids reach
+    start = _depth(shaped) - 1
+    if options.max_depth is not None:
+        start = min(start, options.max_depth - 1)
+    if start < 1:
+        return text
+
+    for depth in range(start, 0, -1):
+        options = _Options(
+            fields=options.fields,
+            max_depth=depth,
+            prune_empty=options.prune_empty,
+            aliases=options.aliases,
+        )
+        shaped = _shape(data, 1, options)
+        text = to_compact_json(shaped)
+        if len(text) <= profile.max_bytes:
+            break
+
+    logger.debug(
+        "Response of %d bytes trimmed to %d bytes (max_depth %s)",
+        untrimmed_bytes,
+        len(text),
+        options.max_depth,
+    )
+    if not isinstance(shaped, dict):
+        return text
+
+    shaped["_shaping"] = {
+        "untrimmed_bytes": untrimmed_bytes,
+        "max_depth": options.max_depth,
+        "hint": (
+            "Objects nested deeper than max_depth were reduced to their ids. "
+            "Pass `fields` or a narrower query for more detail."
+        ),
+    }
+    return to_compact_json(shaped)
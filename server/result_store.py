@@ -0,0 +1,154 @@
+import json
+import logging
+import secrets
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+# A page preferably ends right after one of these, so JSON and HTML pages break
+# between values and tags rather than inside them
+_PAGE_BREAKS = (",", "}", "]", ">", "\n")
+
+PAGINATION_HINT = (
+    "The result was split into pages. Call `fetch_more` with `next_cursor` for "
+    "the next page and join the pages in order to get the full text."
+)
+
+
+def split_pages(text: str, page_bytes: int) -> list[str]:
+    """
+    Split `text` into pages of at most `page_bytes` characters, cutting after
+    a value or tag boundary in the last quarter of a page when there is one.
+    """
+    pages: list[str] = []
+    start = 0
+    while len(text) - start > page_bytes:
+        end = start + page_bytes
+        floor = end - page_bytes // 4
+        cut = max(text.rfind(mark, floor, end) for mark in _PAGE_BREAKS)
+        if cut >= floor:
+            end = cut + 1
+        pages.append(text[start:end])
+        start = end
+    pages.append(text[start:])
+    return pages
+
+
+@dataclass(frozen=True)
+class _StoredResult:
+    source: str
+    pages: tuple[str, ...]
+    total_bytes: int
+    expires_at: float
+
+
+class ResultStore:
+    """
+    Oversized tool results, held in memory for a short time and read page by
+    page with `fetch_more`, so later pages never call Dropinbase again.
+
+    A cursor is `{result_id}.{page_index}`. Results expire `ttl_seconds` after
+    they were stored; beyond `max_entries` the oldest result is dropped.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._results: OrderedDict[str, _StoredResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, item in self._results.items() if item.expires_at <= now]
+        for key in expired:
+            del self._results[key]
+
+    def put(self, source: str, pages: list[str]) -> str:
+        """Store the pages of a result and return its id."""
+        now = time.monotonic()
+        result_id = secrets.token_urlsafe(9)
+        stored = _StoredResult(
+            source=source,
+            pages=tuple(pages),
+            total_bytes=sum(len(page) for page in pages),
+            expires_at=now + self._ttl_seconds,
+        )
+        with self._lock:
+            self._purge_expired(now)
+            self._results[result_id] = stored
+            while len(self._results) > self._max_entries:
+                dropped, _ = self._results.popitem(last=False)
+                logger.debug("Result store full, dropped result %s", dropped)
+        return result_id
+
+    def page(self, cursor: str) -> list[str] | None:
+        """
+        The page a cursor points to followed by its page info (JSON), None when
+        the cursor is malformed, out of range or its result expired.
+        """
+        result_id, _, index_text = cursor.rpartition(".")
+        try:
+            index = int(index_text)
+        except ValueError:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            stored = self._results.get(result_id)
+            if stored is None or stored.expires_at <= now:
+                self._results.pop(result_id, None)
+                return None
+
+        if not 0 <= index < len(stored.pages):
+            return None
+        return [stored.pages[index], _page_info(result_id, index, stored)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+def _page_info(result_id: str, index: int, stored: _StoredResult) -> str:
+    last = index + 1 == len(stored.pages)
+    info: dict[str, Any] = {
+        "source": stored.source,
+        "page": index + 1,
+        "pages": len(stored.pages),
+        "total_bytes": stored.total_bytes,
+        "next_cursor": None if last else f"{result_id}.{index + 1}",
+    }
+    if not last:
+        info["hint"] = PAGINATION_HINT
+    return json.dumps({"_page": info}, separators=(",", ":"))
+
+
+result_store = ResultStore(
+    ttl_seconds=get_settings().result_store_ttl_seconds,
+    max_entries=get_settings().result_store_max_entries,
+)
+
+
+def paginate(text: str, source: str, page_bytes: int | None = None) -> str | list[str]:
+    """
+    Return `text` unchanged when it fits in `page_bytes` (RESULT_PAGE_BYTES by
+    default). Otherwise store it and return its first page followed by the page
+    info, with the cursor of the next page, as separate text contents.
+    """
+    if page_bytes is None:
+        page_bytes = get_settings().result_page_bytes
+    if len(text) <= page_bytes:
+        return text
+
+    pages = split_pages(text, page_bytes)
+    result_id = result_store.put(source, pages)
+    logger.debug(
+        "Result of %s (%d bytes) stored as %d pages", source, len(text), len(pages)
+    )
+    return result_store.page(f"{result_id}.0")
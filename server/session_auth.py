@@ -1,14 +1,18 @@
 import re
+import threading
+import time
 import requests
 
-from env_variables import get_env
+from circuit_breaker import NO_RETRY, RetryPolicy, circuit_breaker
+from rate_limit import OUTBOUND_LIMITER, TrafficClass
+from settings import Settings, get_settings, on_settings_reload
+from metrics import REQUEST_METRICS, path_template
+from tracing import span
 
 
 class DibClientAuth:
     """Handles login and session reuse against Dropinbase."""
 
-    TIMEOUT_SECONDS = int(10)
-
     def __init__(
         self,
         username: str,
@@ -31,6 +35,16 @@ class DibClientAuth:
         # disable SSL verification to avoid issues with self-signed certificates.
         self.session.verify = False
 
+        # Option providers and other tools issue requests from several threads at
+        # once, ensure only one of them performs a (re-)login at a time
+        self._login_lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        """(connect, read) timeouts of every request, in seconds."""
+        settings = get_settings()
+        return (settings.dib_connect_timeout_seconds, settings.dib_read_timeout_seconds)
+
     @property
     def has_session(self) -> bool:
         return self.session.cookies.get("PHPSESSID") is not None
@@ -41,7 +55,7 @@ class DibClientAuth:
 
     def _fetch_form_token(self) -> str:
         """Fetch the form_token from the login page HTML."""
-        response = self.session.get(self.login_page_url, timeout=self.TIMEOUT_SECONDS)
+        response = self.session.get(self.login_page_url, timeout=self.timeout)
         response.raise_for_status()
 
         login_page_html = response.text
@@ -53,61 +67,186 @@ class DibClientAuth:
 
     def login(self) -> None:
         """Perform login to obtain a valid session."""
-        form_token = self._fetch_form_token()
-
-        payload = {
-            "username": self.username,
-            "password": self.password,
-            "email1": "",
-            "form_token": form_token,
-        }
-
-        resp = self.session.post(
-            self.login_endpoint_url, data=payload, timeout=self.TIMEOUT_SECONDS
-        )
-        resp.raise_for_status()
+        with span("auth.login"):
+            form_token = self._fetch_form_token()
+
+            payload = {
+                "username": self.username,
+                "password": self.password,
+                "email1": "",
+                "form_token": form_token,
+            }
+
+            resp = self.session.post(
+                self.login_endpoint_url, data=payload, timeout=self.timeout
+            )
+            resp.raise_for_status()
 
         if not self.has_session:
             raise RuntimeError("Login succeeded but PHPSESSID cookie was not set")
 
+        REQUEST_METRICS.record_login()
+
     def ensure_logged_in(self) -> None:
         """Ensure that there is a valid logged-in session."""
-        if not self.has_session:
+        if self.has_session:
+            return
+
+        with self._login_lock:
+            # Another thread may have logged in while waiting for the lock
+            if not self.has_session:
+                self.login()
+
+    def _relogin(self, expired_session_id: str | None) -> None:
+        """
+        Replace an expired session with a fresh login, unless another thread
+        already did so while this one was waiting for the lock.
+        """
+        with self._login_lock:
+            if self.session.cookies.get("PHPSESSID") != expired_session_id:
+                return
+            self.session.cookies.clear()
             self.login()
+            REQUEST_METRICS.record_relogin()
+
+    def _send(self, method: str, url: str, *, headers: dict | None = None, **kwargs):
+        """Send a single request and record its latency, status and size."""
+        started = time.perf_counter()
+        with span("http.request", method=method, path=path_template(url)) as s:
+            try:
+                resp = self.session.request(
+                    method, url, headers=headers, timeout=self.timeout, **kwargs
+                )
+            except requests.RequestException as e:
+                REQUEST_METRICS.record_request(
+                    method, url, type(e).__name__, time.perf_counter() - started
+                )
+                raise
+
+            if s is not None:
+                s.set(status_code=resp.status_code)
+
+        body = resp.request.body if resp.request is not None else None
+        REQUEST_METRICS.record_request(
+            method,
+            url,
+            resp.status_code,
+            time.perf_counter() - started,
+            bytes_sent=len(body) if body else 0,
+            bytes_received=len(resp.content or b""),
+        )
+        return resp
 
-    def request(self, method: str, url: str, *, headers: dict | None = None, **kwargs):
+    def _send_authenticated(
+        self, method: str, url: str, *, headers: dict | None = None, **kwargs
+    ):
         """
         Make an authenticated request. If one of the RETRY codes are received (e.g. 419),
         assume the session expired, clear cookies, log in again, retry once.
         """
         self.ensure_logged_in()
+        session_id = self.session.cookies.get("PHPSESSID")
 
-        resp = self.session.request(
-            method, url, headers=headers, timeout=self.TIMEOUT_SECONDS, **kwargs
-        )
+        resp = self._send(method, url, headers=headers, **kwargs)
 
         AUTH_AND_RETRY_CODES = [419, 401]
         if resp.status_code in AUTH_AND_RETRY_CODES:
             # Likely expired session, clear cookies and retry once with a fresh login
-            self.session.cookies.clear()
-            self.login()
-            resp = self.session.request(
-                method, url, headers=headers, timeout=self.TIMEOUT_SECONDS, **kwargs
-            )
+            self._relogin(session_id)
+            REQUEST_METRICS.record_retry(method, url)
+            resp = self._send(method, url, headers=headers, **kwargs)
 
         return resp
 
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None = None,
+        breaker: str | None = None,
+        retry: RetryPolicy = NO_RETRY,
+        traffic: TrafficClass = "write",
+        **kwargs,
+    ):
+        """
+        Make an authenticated request through the circuit breaker named `breaker`
+        (the path template of `url` by default), which fails fast with
+        CircuitOpenError while the endpoint keeps failing.
+
+        Transport errors and the transient statuses of `retry` are retried up to
+        `retry.max_attempts` with jittered backoff; only pass a retry policy for
+        requests that are safe to repeat.
+
+        Every attempt waits for a slot of its `traffic` class and a token of the
+        outbound rate limit first (see rate_limit.py).
+        """
+        circuit = circuit_breaker(breaker or path_template(url))
+
+        attempt = 0
+        while True:
+            attempt += 1
+            with OUTBOUND_LIMITER.slot(traffic):
+                circuit.before_call()
+                try:
+                    resp = self._send_authenticated(
+                        method, url, headers=headers, **kwargs
+                    )
+                except requests.RequestException:
+                    circuit.record_failure()
+                    if attempt >= retry.max_attempts:
+                        raise
+                    delay = retry.delay(attempt)
+                except Exception:
+                    circuit.record_failure()
+                    raise
+                else:
+                    circuit.record_response(resp.status_code)
+                    if (
+                        resp.status_code not in retry.retry_status_codes
+                        or attempt >= retry.max_attempts
+                    ):
+                        return resp
+                    delay = retry.delay(attempt, resp)
+
+            REQUEST_METRICS.record_backoff_retry(method, url)
+            time.sleep(delay)
+
 
 # Create a global instance
 dib_session_client = DibClientAuth(
-    username=get_env("DIB_USERNAME", "admin"),
-    password=get_env("DIB_PASSWORD", "test"),
-    login_page_url=get_env(
-        "DIB_LOGIN_PAGE_URL",
-        f"{get_env('BASE_URL', 'https://localhost')}/login",
-    ),
-    login_endpoint_url=get_env(
-        "DIB_LOGIN_ENDPOINT_URL",
-        f"{get_env('BASE_URL', 'https://localhost')}/dropins/dibAuthenticate/Site/login",
-    ),
+    username=get_settings().dib_username,
+    password=get_settings().dib_password,
+    login_page_url=get_settings().dib_login_page_url,
+    login_endpoint_url=get_settings().dib_login_endpoint_url,
 )
+
+
+def _apply_settings(settings: Settings) -> None:
+    """Switch to changed credentials or login URLs after a settings reload."""
+    login = (
+        settings.dib_username,
+        settings.dib_password,
+        settings.dib_login_page_url,
+        settings.dib_login_endpoint_url,
+    )
+    current = (
+        dib_session_client.username,
+        dib_session_client.password,
+        dib_session_client.login_page_url,
+        dib_session_client.login_endpoint_url,
+    )
+    if login == current:
+        return
+
+    (
+        dib_session_client.username,
+        dib_session_client.password,
+        dib_session_client.login_page_url,
+        dib_session_client.login_endpoint_url,
+    ) = login
+    # The next request gets a 419 and logs in with the new settings
+    dib_session_client.session.cookies.clear()
+
+
+on_settings_reload(_apply_settings)
@@ -0,0 +1,325 @@
+import logging
+import os
+import signal
+import threading
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable
+
+from env_variables import _load_env_file, _to_bool
+
+logger = logging.getLogger(__name__)
+
+
+def _log_level(raw: str) -> str:
+    level = raw.strip().upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unknown log level {raw!r}")
+    return level
+
+
+def _json_backend(raw: str) -> str:
+    backend = raw.strip().lower()
+    if backend not in ("auto", "json", "orjson"):
+        raise ValueError(f"Unknown JSON backend {raw!r}")
+    return backend
+
+
+def _env(
+    name: str,
+    default: Any,
+    cast: Callable[[str], Any] = str,
+    *,
+    min_value: float | None = None,
+    secret: bool = False,
+) -> Any:
+    """Declare a setting read from environment variable `name`."""
+    return field(
+        default=default,
+        metadata={"env": name, "cast": cast, "min_value": min_value, "secret": secret},
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    All configuration of the server, parsed and validated once from the
+    environment (and .env).
+
+    Read it with `get_settings()` where the value is used, so a reload (see
+    `install_reload_handler`) is picked up. Values copied into module
+    constants at import, such as pool sizes and log levels, keep the value
+    from startup.
+    """
+
+    # Dropinbase
+    base_url: str = _env("BASE_URL", "https://localhost")
+    request_verification_token: str | None = _env(
+        "REQUEST_VERIFICATION_TOKEN", None, secret=True
+    )
+    dib_username: str = _env("DIB_USERNAME", "admin")
+    dib_password: str = _env("DIB_PASSWORD", "test", secret=True)
+    # Derived from base_url when not set
+    dib_login_page_url: str | None = _env("DIB_LOGIN_PAGE_URL", None)
+    dib_login_endpoint_url: str | None = _env("DIB_LOGIN_ENDPOINT_URL", None)
+    dib_connect_timeout_seconds: float = _env(
+        "DIB_CONNECT_TIMEOUT_SECONDS", 3.05, float, min_value=0.1
+    )
+    dib_read_timeout_seconds: float = _env(
+        "DIB_READ_TIMEOUT_SECONDS", 10.0, float, min_value=0.1
+    )
+    dib_retry_max_attempts: int = _env("DIB_RETRY_MAX_ATTEMPTS", 3, int, min_value=1)
+    dib_retry_backoff_seconds: float = _env(
+        "DIB_RETRY_BACKOFF_SECONDS", 0.25, float, min_value=0
+    )
+    dib_retry_max_backoff_seconds: float = _env(
+        "DIB_RETRY_MAX_BACKOFF_SECONDS", 4.0, float, min_value=0
+    )
+    dib_breaker_failure_threshold: int = _env(
+        "DIB_BREAKER_FAILURE_THRESHOLD", 5, int, min_value=1
+    )
+    dib_breaker_reset_seconds: float = _env(
+        "DIB_BREAKER_RESET_SECONDS", 30.0, float, min_value=0
+    )
+    dib_rate_limit_per_second: float = _env(
+        "DIB_RATE_LIMIT_PER_SECOND", 50.0, float, min_value=0
+    )
+    dib_rate_limit_burst: int = _env("DIB_RATE_LIMIT_BURST", 20, int, min_value=1)
+    dib_max_concurrent_reads: int = _env(
+        "DIB_MAX_CONCURRENT_READS", 8, int, min_value=1
+    )
+    dib_max_concurrent_writes: int = _env(
+        "DIB_MAX_CONCURRENT_WRITES", 4, int, min_value=1
+    )
+    dib_max_concurrent_docs: int = _env("DIB_MAX_CONCURRENT_DOCS", 2, int, min_value=1)
+    dib_background_share: float = _env("DIB_BACKGROUND_SHARE", 0.5, float, min_value=0)
+    dib_limit_max_wait_seconds: float = _env(
+        "DIB_LIMIT_MAX_WAIT_SECONDS", 30.0, float, min_value=0
+    )
+    dib_coalesce_reads: bool = _env("DIB_COALESCE_READS", True, _to_bool)
+
+    # Server
+    log_level: str = _env("LOG_LEVEL", "INFO", _log_level)
+    debug_mode: bool = _env("DEBUG_MODE", False, _to_bool)
+    mcp_transport: str = _env("MCP_TRANSPORT", "stdio")
+    mcp_host: str | None = _env("MCP_HOST", None)
+    mcp_port: int | None = _env("MCP_PORT", None, int, min_value=1)
+    expose_dib_docs_via_tools: bool = _env("EXPOSE_DIB_DOCS_VIA_TOOLS", False, _to_bool)
+    lazy_tools: bool = _env("LAZY_TOOLS", False, _to_bool)
+    tool_manifest_file: str = _env(
+        "TOOL_MANIFEST_FILE", "server/tools/tool_manifest.json"
+    )
+    settings_reload_on_sighup: bool = _env("SETTINGS_RELOAD_ON_SIGHUP", False, _to_bool)
+    response_shaping_enabled: bool = _env("RESPONSE_SHAPING_ENABLED", True, _to_bool)
+    json_backend: str = _env("JSON_BACKEND", "auto", _json_backend)
+    result_page_bytes: int = _env("RESULT_PAGE_BYTES", 16000, int, min_value=1000)
+    result_store_ttl_seconds: float = _env(
+        "RESULT_STORE_TTL_SECONDS", 600.0, float, min_value=0
+    )
+    result_store_max_entries: int = _env(
+        "RESULT_STORE_MAX_ENTRIES", 64, int, min_value=1
+    )
+
+    # Observability
+    metrics_http_enabled: bool = _env("METRICS_HTTP_ENABLED", False, _to_bool)
+    tracing_enabled: bool = _env("TRACING_ENABLED", False, _to_bool)
+    trace_file: str = _env("TRACE_FILE", "server/traces/trace.jsonl")
+
+    # Designer
+    designer_schema_validation: bool = _env(
+        "DESIGNER_SCHEMA_VALIDATION", True, _to_bool
+    )
+    designer_schema_ttl_seconds: float = _env(
+        "DESIGNER_SCHEMA_TTL_SECONDS", 604800.0, float, min_value=0
+    )
+    designer_schema_file: str = _env(
+        "DESIGNER_SCHEMA_FILE", "server/tools/designer/state/field_schema.json"
+    )
+
+    # Wizard options
+    options_max_workers: int = _env("OPTIONS_MAX_WORKERS", 4, int, min_value=1)
+    options_provider_timeout_seconds: float = _env(
+        "OPTIONS_PROVIDER_TIMEOUT_SECONDS", 30.0, float, min_value=0
+    )
+    options_cache_ttl_seconds: float = _env(
+        "OPTIONS_CACHE_TTL_SECONDS", 120.0, float, min_value=0
+    )
+    wizard_prefetch_enabled: bool = _env("WIZARD_PREFETCH_ENABLED", True, _to_bool)
+    wizard_prefetch_max_workers: int = _env(
+        "WIZARD_PREFETCH_MAX_WORKERS", 2, int, min_value=1
+    )
+    template_description_cache_ttl_seconds: float = _env(
+        "TEMPLATE_DESCRIPTION_CACHE_TTL_SECONDS", 86400.0, float, min_value=0
+    )
+    template_description_max_workers: int = _env(
+        "TEMPLATE_DESCRIPTION_MAX_WORKERS", 4, int, min_value=1
+    )
+
+    # Application wizard
+    table_settings_max_workers: int = _env(
+        "TABLE_SETTINGS_MAX_WORKERS", 8, int, min_value=1
+    )
+    table_settings_max_attempts: int = _env(
+        "TABLE_SETTINGS_MAX_ATTEMPTS", 3, int, min_value=1
+    )
+    table_settings_backoff_seconds: float = _env(
+        "TABLE_SETTINGS_BACKOFF_SECONDS", 0.5, float, min_value=0
+    )
+
+    # Queue tracking
+    queue_poll_min_seconds: float = _env(
+        "QUEUE_POLL_MIN_SECONDS", 0.5, float, min_value=0
+    )
+    queue_poll_max_seconds: float = _env(
+        "QUEUE_POLL_MAX_SECONDS", 5.0, float, min_value=0
+    )
+    queue_timeout_seconds: float = _env(
+        "QUEUE_TIMEOUT_SECONDS", 600.0, float, min_value=0
+    )
+    queue_idle_polls: int = _env("QUEUE_IDLE_POLLS", 10, int, min_value=1)
+    queue_max_failed_polls: int = _env("QUEUE_MAX_FAILED_POLLS", 3, int, min_value=1)
+
+    # Event wizard
+    node_resolution_max_workers: int = _env(
+        "NODE_RESOLUTION_MAX_WORKERS", 4, int, min_value=1
+    )
+    event_bulk_max_workers: int = _env("EVENT_BULK_MAX_WORKERS", 4, int, min_value=1)
+
+    def __post_init__(self) -> None:
+        if self.dib_login_page_url is None:
+            object.__setattr__(self, "dib_login_page_url", f"{self.base_url}/login")
+        if self.dib_login_endpoint_url is None:
+            object.__setattr__(
+                self,
+                "dib_login_endpoint_url",
+                f"{self.base_url}/dropins/dibAuthenticate/Site/login",
+            )
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Parse every setting from the environment. Invalid values fall back to
+        their default with a single warning, settings left unset are reported
+        in one debug line.
+        """
+        values: dict[str, Any] = {}
+        unset: list[str] = []
+
+        for f in fields(cls):
+            name = f.metadata["env"]
+            raw = os.getenv(name)
+            if raw is None or raw == "":
+                unset.append(name)
+                continue
+
+            try:
+                value = f.metadata["cast"](raw)
+            except (TypeError, ValueError):
+                logger.warning(
+                    "%s has invalid value %r. Falling back to default %r",
+                    name,
+                    "***" if f.metadata["secret"] else raw,
+                    f.default,
+                )
+                continue
+
+            min_value = f.metadata["min_value"]
+            if min_value is not None and value < min_value:
+                logger.warning(
+                    "%s must be at least %s, got %r. Falling back to default %r",
+                    name,
+                    min_value,
+                    value,
+                    f.default,
+                )
+                continue
+
+            values[f.name] = value
+
+        settings = cls(**values)
+        if unset:
+            logger.debug("Using defaults for unset settings: %s", ", ".join(unset))
+        if settings.request_verification_token is None:
+            logger.error("REQUEST_VERIFICATION_TOKEN not set and no default provided")
+        return settings
+
+    def changes_from(self, other: "Settings") -> list[str]:
+        """Names of the environment variables whose value differs from `other`."""
+        return [
+            f.metadata["env"]
+            for f in fields(self)
+            if getattr(self, f.name) != getattr(other, f.name)
+        ]
+
+
+_settings = Settings.from_env()
+_reload_listeners: list[Callable[[Settings], None]] = []
+_reload_lock = threading.Lock()
+# Set by the SIGHUP handler, the reload itself runs on the reload thread
+_reload_requested = threading.Event()
+
+logger.setLevel(_settings.log_level)
+
+
+def get_settings() -> Settings:
+    """The current settings. Cheap enough to call on every request."""
+    return _settings
+
+
+def on_settings_reload(listener: Callable[[Settings], None]) -> None:
+    """Call `listener` with the new settings after every reload."""
+    _reload_listeners.append(listener)
+
+
+def reload_settings() -> Settings:
+    """
+    Re-read .env and the environment and swap in the new settings. Variables
+    already set in the process environment are overwritten by .env.
+    """
+    global _settings
+
+    with _reload_lock:
+        _load_env_file(override=True)
+        previous, _settings = _settings, Settings.from_env()
+
+    changed = _settings.changes_from(previous)
+    logger.info(
+        "Settings reloaded, changed: %s", ", ".join(changed) if changed else "nothing"
+    )
+    for listener in _reload_listeners:
+        try:
+            listener(_settings)
+        except Exception:
+            logger.exception("Settings reload listener %r failed", listener)
+    return _settings
+
+
+def _reload_on_request() -> None:
+    while True:
+        _reload_requested.wait()
+        _reload_requested.clear()
+        try:
+            reload_settings()
+        except Exception:
+            logger.exception("Settings reload failed")
+
+
+def install_reload_handler() -> bool:
+    """
+    Reload the settings on SIGHUP when SETTINGS_RELOAD_ON_SIGHUP is enabled.
+    Must be called from the main thread. Returns whether a handler was installed
+    (there is no SIGHUP on Windows).
+
+    The signal handler only flags the request; the reload runs on a separate
+    thread, so it never interrupts code holding a lock it needs itself.
+    """
+    sighup = getattr(signal, "SIGHUP", None)
+    if not _settings.settings_reload_on_sighup or sighup is None:
+        return False
+
+    threading.Thread(
+        target=_reload_on_request, name="dib-settings-reload", daemon=True
+    ).start()
+    signal.signal(sighup, lambda signum, frame: _reload_requested.set())
+    logger.info("Settings reload on SIGHUP enabled")
+    return True
@@ -0,0 +1,131 @@
+import logging
+import threading
+
+from pathlib import Path
+from typing import Any, Literal
+
+from endpoints import DESIGNER_RECORDS, call_endpoint
+from json_codec import response_json
+from persistent_cache import JsonFileCache
+from settings import get_settings
+
+from tools.designer.validate import ValidationError
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+NodeType = Literal["item", "container"]
+
+
+def record_from_node_info(node_info: Any, node_type: NodeType) -> dict[str, Any] | None:
+    """
+    Extract the pef_{node_type} record from a designerGetRecords response.
+
+    Record path: data -> records -> data -> pef_{node_type}
+    """
+    try:
+        record = (
+            node_info.get("data").get("records").get("data").get(f"pef_{node_type}")
+        )
+    except AttributeError:
+        return None
+
+    if not record or not isinstance(record, dict):
+        return None
+    return record
+
+
+def _table_key(node_type: NodeType) -> str:
+    # Per Dropinbase instance, their tables can differ
+    return f"{get_settings().base_url} pef_{node_type}"
+
+
+class DesignerFieldSchema:
+    """
+    Field names of the Designer tables (pef_item, pef_container), learned from
+    the records Dropinbase returns and persisted across server runs.
+
+    A record lists the columns of its table, so every record seen (see
+    `observe`) adds to the known fields; `validate` then rejects updates of
+    fields that do not exist before anything is sent to Dropinbase. Values
+    are not type checked, the records do not reliably tell column types.
+    """
+
+    def __init__(self, cache: JsonFileCache) -> None:
+        self._cache = cache
+        self._tables: dict[str, frozenset[str]] = {}
+        self._lock = threading.Lock()
+
+    def fields(self, node_type: NodeType) -> frozenset[str] | None:
+        """The known fields of pef_{node_type}, None when no record was seen yet."""
+        table = _table_key(node_type)
+        with self._lock:
+            fields = self._tables.get(table)
+        if fields is None:
+            cached = self._cache.get(table)
+            if cached is not None:
+                with self._lock:
+                    fields = self._tables.setdefault(table, frozenset(cached))
+        return fields
+
+    def observe(self, node_type: NodeType, record: dict[str, Any]) -> None:
+        """Add the fields of a record to pef_{node_type}, persisting any change."""
+        table = _table_key(node_type)
+        current = self.fields(node_type) or frozenset()
+
+        with self._lock:
+            known = self._tables.get(table, current)
+            updated = known | record.keys()
+            if table in self._tables and updated == known:
+                return
+            self._tables[table] = updated
+
+        self._cache.set(table, sorted(updated))
+
+    def load(
+        self, node_type: NodeType, node_id: str, token: str | None = None
+    ) -> frozenset[str] | None:
+        """
+        The known fields of pef_{node_type}, fetching the record of `node_id`
+        first when no record of the table was seen yet. None when that fails.
+        """
+        fields = self.fields(node_type)
+        if fields is not None:
+            return fields
+
+        try:
+            response = call_endpoint(
+                DESIGNER_RECORDS, token=token, node_type=node_type, node_id=node_id
+            )
+            record = record_from_node_info({"data": response_json(response)}, node_type)
+        except Exception as e:
+            logger.warning("Could not fetch the pef_%s schema: %s", node_type, e)
+            return None
+
+        if record is None:
+            logger.debug(
+                "No pef_%s record %s to learn the schema from", node_type, node_id
+            )
+            return None
+
+        self.observe(node_type, record)
+        return self.fields(node_type)
+
+    def validate(
+        self, node_type: NodeType, field: str, fields: frozenset[str]
+    ) -> ValidationError | None:
+        """Check that `field` is one of the known `fields`."""
+        if field in fields:
+            return None
+        return {
+            "field": field,
+            "message": f"'{field}' is not a field of pef_{node_type}.",
+        }
+
+
+designer_schema = DesignerFieldSchema(
+    JsonFileCache(
+        Path(get_settings().designer_schema_file),
+        ttl_seconds=get_settings().designer_schema_ttl_seconds,
+    )
+)
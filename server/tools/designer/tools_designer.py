@@ -3,14 +3,47 @@ import logging
 from mcp.types import ToolAnnotations
 from typing import Literal, Any
 
-from env_variables import get_env, _to_bool
+from endpoints import (
+    DESIGNER_COMPONENTS,
+    DESIGNER_CONTAINERS,
+    DESIGNER_DELETE_ITEM,
+    DESIGNER_DELETE_ITEMS,
+    DESIGNER_DROP,
+    DESIGNER_GROUPS,
+    DESIGNER_RECORDS,
+    DESIGNER_TREE,
+    DESIGNER_UPDATE,
+    call_endpoint,
+)
+from json_codec import response_json
+from settings import get_settings
 from mcp_instance import mcp
-from session_auth import dib_session_client
+from response_shaping import ResponseProfile, shape_response, strip_envelope
 
-from tools.designer.validate import validator
+from tools.designer.field_schema import designer_schema, record_from_node_info
+from tools.designer.validate import ValidationError, validator
 
 logger = logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
+
+DESIGNER_SCHEMA_VALIDATION: bool = get_settings().designer_schema_validation
+
+# Size budgets and shaping of the read tools' responses (see response_shaping.py)
+COMPONENT_LIST_RESPONSE = ResponseProfile(
+    max_bytes=8_000, aliases={"id_display_value": "label"}
+)
+# Large trees are returned in pages rather than reduced to their ids
+PROJECT_TREE_RESPONSE = ResponseProfile(
+    max_bytes=get_settings().result_page_bytes, paginate=True
+)
+COMPONENTS_RESPONSE = ResponseProfile(max_bytes=16_000)
+# Empty columns are kept, they show the agent which fields can be updated
+NODE_INFO_RESPONSE = ResponseProfile(max_bytes=16_000, prune_empty=False)
+
+SHAPING_DESCRIPTION = (
+    " Pass 'fields' to return only the named fields (ids are always included)"
+    " and 'max_depth' to reduce objects nested deeper than that to their ids."
+)
 
 
 @mcp.tool(
@@ -20,6 +53,7 @@ logger.setLevel(get_env("LOG_LEVEL", "INFO"))
         "Retrieve all available groups in the Dropinbase designer."
         "This tool returns a list of groups available for selection when managing containers within the designer."
         "The selected group id is a necessary input in many other tools."
+        + SHAPING_DESCRIPTION
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -29,34 +63,33 @@ logger.setLevel(get_env("LOG_LEVEL", "INFO"))
     ),
 )
 def get_all_avail_groups(
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
     page: int = 1,
     limit: int = 40,
+    fields: list[str] | None = None,
+    max_depth: int | None = None,
 ):
     """Get all available groups in the designer."""
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesigner&containerItemId=3901&itemAlias=groupId"
-        f"&page={page}&limit={limit}&activeFilter=null"
+    response = call_endpoint(
+        DESIGNER_GROUPS,
+        token=request_verification_token,
+        page=page,
+        limit=limit,
     )
 
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
-
     try:
-        return {"data": response.json()}
+        data = strip_envelope(response_json(response))
     except ValueError:
         return {
             "status_code": response.status_code,
             "response": response.text,
         }
 
+    return shape_response(
+        {"data": data}, COMPONENT_LIST_RESPONSE, fields=fields, max_depth=max_depth
+    )
+
 
 @mcp.tool(
     name="get_all_avail_containers",
@@ -65,6 +98,7 @@ def get_all_avail_groups(
         "Retrieve all available containers in the Dropinbase designer."
         "This tool returns a list of containers available for selection when managing components within the designer."
         "The selected container id is a necessary input in many other tools."
+        + SHAPING_DESCRIPTION
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -74,35 +108,35 @@ def get_all_avail_groups(
     ),
 )
 def get_containers(
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
     page: int = 1,
     limit: int = 40,
     filter: str = "null",
+    fields: list[str] | None = None,
+    max_depth: int | None = None,
 ):
     """Get all available containers in the designer."""
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesigner&containerItemId=3900&itemAlias=containerId"
-        f"&page={page}&limit={limit}&activeFilter={filter}"
+    response = call_endpoint(
+        DESIGNER_CONTAINERS,
+        token=request_verification_token,
+        page=page,
+        limit=limit,
+        activeFilter=filter,
     )
 
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
-
     try:
-        return {"data": response.json()}
+        data = strip_envelope(response_json(response))
     except ValueError:
         return {
             "status_code": response.status_code,
             "response": response.text,
         }
 
+    return shape_response(
+        {"data": data}, COMPONENT_LIST_RESPONSE, fields=fields, max_depth=max_depth
+    )
+
 
 @mcp.tool(
     name="get_project_tree",
@@ -113,6 +147,8 @@ def get_containers(
         "The response does not include detail up to the very last recursive level, identifiable by the 'expanded' field set to false."
         "If this 'expanded' field is false for a node, and 'has_children' is true, it indicates that there are additional nested components not included in the response."
         "To retrieve these additional nested components (if required), subsequent calls to this tool can be made using the 'container_id' of the desired node."
+        "A large tree is returned in pages: the first page is followed by a '_page' object whose 'next_cursor' can be passed to `fetch_more`."
+        + SHAPING_DESCRIPTION
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -124,22 +160,13 @@ def get_containers(
 def get_project_tree(
     container_id: int,
     group_id: int,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
-) -> dict:
+    request_verification_token: str | None = None,
+    fields: list[str] | None = None,
+    max_depth: int | None = None,
+):
     """
     Retrieve the project tree structure from Dropinbase.
     """
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerItemStore/read"
-        "?containerName=dibDesignerHtml&node=root"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload = {
         "clientData": {
             "treeData": {
@@ -150,16 +177,26 @@ def get_project_tree(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_TREE, payload=payload, token=request_verification_token
+    )
 
     try:
-        return {"data": response.json()}
+        data = strip_envelope(response_json(response))
     except ValueError:
         return {
             "status_code": response.status_code,
             "response": response.text,
         }
 
+    return shape_response(
+        {"data": data},
+        PROJECT_TREE_RESPONSE,
+        fields=fields,
+        max_depth=max_depth,
+        source="get_project_tree",
+    )
+
 
 @mcp.tool(
     name="get_node_info_from_id_and_type",
@@ -169,6 +206,7 @@ def get_project_tree(
         "This tool returns all available data for the specified node, which can include properties, settings"
         "and other metadata associated with that node."
         "The node type must be specified as either 'item' or 'container' to accurately fetch the relevant data."
+        + SHAPING_DESCRIPTION
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -180,7 +218,9 @@ def get_project_tree(
 def get_node_info_from_id_and_type(
     node_id: str,
     node_type: Literal["item", "container"] | None = None,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
+    fields: list[str] | None = None,
+    max_depth: int | None = None,
 ):
     # Workaround for agent not reliably adding node_type
     if node_type is None:
@@ -188,27 +228,67 @@ def get_node_info_from_id_and_type(
             "node_type is a required parameter and must be specified as either 'item' or 'container'"
         )
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        f"/dropins/dibAdmin/DDesignerAddOn/designerGetRecords"
-        f"?containerName=dibDesignerHtml&table=pef_{node_type}&id={node_id}"
+    node_info = fetch_node_info(node_id, node_type, request_verification_token)
+    if "data" not in node_info:
+        return node_info
+
+    return shape_response(
+        {"data": strip_envelope(node_info["data"])},
+        NODE_INFO_RESPONSE,
+        fields=fields,
+        max_depth=max_depth,
     )
 
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
 
-    response = dib_session_client.request("POST", url, headers=headers)
+def fetch_node_info(
+    node_id: str,
+    node_type: Literal["item", "container"],
+    request_verification_token: str | None = None,
+) -> dict[str, Any]:
+    """
+    The unshaped designerGetRecords response of a node, as {"data": ...}, or
+    the status code and text when the response is not JSON.
+    """
+    response = call_endpoint(
+        DESIGNER_RECORDS,
+        token=request_verification_token,
+        node_type=node_type,
+        node_id=node_id,
+    )
 
     try:
-        return {"data": response.json()}
+        node_info = {"data": response_json(response)}
     except ValueError:
         return {
             "status_code": response.status_code,
             "response": response.text,
         }
 
+    # Every record fetched refines the schema update_node_info validates against
+    record = record_from_node_info(node_info, node_type)
+    if record is not None:
+        designer_schema.observe(node_type, record)
+
+    return node_info
+
+
+def _validate_against_schema(
+    node_id: str, field_name: str, request_verification_token: str | None
+) -> ValidationError | None:
+    """
+    Check that a pef_item field exists in the schema learned from Dropinbase
+    records, unless validation_function_config.json has a rule for the field.
+    The first check fetches the record of `node_id` when no item was seen yet.
+    """
+    if validator.rule(field_name) is not None:
+        return None
+
+    fields = designer_schema.load("item", node_id, request_verification_token)
+    if fields is None:
+        # Without a schema, Dropinbase validates the update as before
+        return None
+    return designer_schema.validate("item", field_name, fields)
+
 
 @mcp.tool(
     name="update_node_info",
@@ -232,22 +312,25 @@ def update_node_info(
     field_name: str,
     value: str,
     root_container_id: int,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """
     Update a specific field of a node in the designer project tree.
     """
 
-    # TODO: Implement/expand validation of field name and subsequent value type. Currently some validation is
-    # done server-side, so invalid field names or value types are caught. However, the specific valid values of
-    # this value type are not checked. This may lead to silent failures or unexpected behavior.
-    # For example, the width can be set to "test" without error. Whilst, this may not have
-    # been a problem when fields were set via the UI, it could lead to issues when the LLM
-    # is setting fields programmatically. This becomes especially relevant for fields which
-    # no example values are available when the get_node_info_from_id tool is used.
-    # Another example is boolean fields which are checked for integer valeus server side, but the range is
-    # not checked. So setting a boolean field to "2" would be accepted by the server.
+    # Rejected locally, before the update is sent: values failing the rule in
+    # validation_function_config.json and unknown fields (see field_schema.py).
+    # TODO: Expand validation of value types. Only fields with a rule in
+    # validation_function_config.json have their values checked; for all other
+    # fields any value is sent and Dropinbase checks little beyond the column
+    # type. This may lead to silent failures or unexpected behavior, especially
+    # for fields of which no example values are available from get_node_info.
     valid_ok, validation_error = validator.validate(field_name, value)
+    if valid_ok and DESIGNER_SCHEMA_VALIDATION:
+        validation_error = _validate_against_schema(
+            node_id, field_name, request_verification_token
+        )
+        valid_ok = validation_error is None
 
     if not valid_ok:
         return {
@@ -259,16 +342,6 @@ def update_node_info(
             },
         }
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerAddOn/designerUpdates/dibDesignerHtml"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload = {
         "clientData": {
             "table": "item",
@@ -280,10 +353,12 @@ def update_node_info(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_UPDATE, payload=payload, token=request_verification_token
+    )
 
     try:
-        data = response.json()
+        data = response_json(response)
     except ValueError:
         data = response.text
 
@@ -316,22 +391,11 @@ def move_node_in_designer_tree(
     container_id: int,
     group_id: str,
     drop_position: Literal["before", "after"],
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """
     Move a node in the designer project tree.
     """
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerItemStore/drop"
-        "?containerName=dibDesignerHtml"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload = {
         "clientData": {
             "alias_parent": {
@@ -347,10 +411,12 @@ def move_node_in_designer_tree(
         "parentId": parent_id,
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_DROP, payload=payload, token=request_verification_token
+    )
 
     try:
-        data = response.json()
+        data = response_json(response)
     except ValueError:
         data = response.text
 
@@ -370,6 +436,7 @@ def move_node_in_designer_tree(
         "Ideally the base or aprent container ID should be used, not the target container id."
         "The returned components include a property 'leaf', if it is set to 1, the component can be added directly;"
         "if set to 0, the component is actually a group with nested components inside and cannot be added directly."
+        + SHAPING_DESCRIPTION
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -380,36 +447,33 @@ def move_node_in_designer_tree(
 )
 def get_avail_components_to_add(
     container_id: str,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
+    fields: list[str] | None = None,
+    max_depth: int | None = None,
 ):
     """
     Retrieve available components that can be added to a specific container in the designer.
     """
-    url: str = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerComponentStore/read"
-        "?containerName=dibDesignerHtml&node=root"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload: dict[str, Any] = {
         "clientData": {"treeData": {"containerId": container_id, "filterString": ""}}
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_COMPONENTS, payload=payload, token=request_verification_token
+    )
 
     try:
-        return {"data": response.json()}
+        data = strip_envelope(response_json(response))
     except ValueError:
         return {
             "status_code": response.status_code,
             "response": response.text,
         }
 
+    return shape_response(
+        {"data": data}, COMPONENTS_RESPONSE, fields=fields, max_depth=max_depth
+    )
+
 
 @mcp.tool(
     name="add_component_in_designer_tree",
@@ -433,22 +497,11 @@ def add_component_in_designer_tree(
     component_id_to_add: str,
     parent_id: str,
     drop_position: Literal["before", "after"],
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """
     Add a component in the designer project tree.
     """
-    url: str = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerItemStore/drop"
-        "?containerName=dibDesignerHtml"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload: dict[str, Any] = {
         "clientData": {
             "alias_parent": {},
@@ -461,10 +514,12 @@ def add_component_in_designer_tree(
         "parentId": parent_id,
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_DROP, payload=payload, token=request_verification_token
+    )
 
     try:
-        data = response.json()
+        data = response_json(response)
     except ValueError:
         data = response.text
 
@@ -492,23 +547,12 @@ def add_component_in_designer_tree(
 )
 def delete_node_in_designer_tree(
     node_id: str,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """
     Delete a node in the designer project tree.
     """
 
-    url: str = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DibTasks/dibDesignerDeleteItem"
-        "?containerName=dibDesignerHtml&itemEventId=ie178-dib"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload: dict[str, Any] = {
         "clientData": {
             "selected_self": [
@@ -519,10 +563,12 @@ def delete_node_in_designer_tree(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_DELETE_ITEM, payload=payload, token=request_verification_token
+    )
 
     try:
-        data = response.json()
+        data = response_json(response)
     except ValueError:
         data = response.text
 
@@ -551,23 +597,12 @@ def delete_node_in_designer_tree(
 )
 def delete_nested_nodes_in_designer_tree(
     parent_node_id: str,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """
     Delete all nested nodes under and including a parent node in the designer project tree.
     """
 
-    url: str = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DibTasks/dibDesignerDeleteItemMany"
-        "?containerName=dibDesignerHtml&itemEventId=ie21-dib"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
     payload: dict[str, Any] = {
         "clientData": {
             "selected_self": [
@@ -578,10 +613,12 @@ def delete_nested_nodes_in_designer_tree(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(
+        DESIGNER_DELETE_ITEMS, payload=payload, token=request_verification_token
+    )
 
     try:
-        data = response.json()
+        data = response_json(response)
     except ValueError:
         data = response.text
 
@@ -3,14 +3,15 @@ import logging
 from mcp.types import ToolAnnotations
 from typing import Literal, Any
 
-from env_variables import get_env, _to_bool
+from endpoints import DESIGNER_DELETE_EVENT, call_endpoint
+from json_codec import response_json
+from settings import get_settings
 from mcp_instance import mcp
-from session_auth import dib_session_client
 
 from tools.designer.validate import validator
 
 logger = logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
 
 
 # ---------------------------------------------- #
@@ -33,25 +34,16 @@ logger.setLevel(get_env("LOG_LEVEL", "INFO"))
 )
 def delete_event_by_id(
     event_id: str,
-    request_verification_token: str = get_env("REQUEST_VERIFICATION_TOKEN"),
+    request_verification_token: str | None = None,
 ):
     """Delete an event in the designer by its unique ID."""
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        f"/dropins/dibAdmin/DibTasks/dibDesignerDeleteTableRecord/{event_id}/pef_container_event"
-        "?containerName=dibDesignerHtml&itemEventId=ie162-dib"
+    response = call_endpoint(
+        DESIGNER_DELETE_EVENT, token=request_verification_token, event_id=event_id
     )
 
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": request_verification_token,
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
-
     try:
-        return {"data": response.json()}
+        return {"data": response_json(response)}
     except ValueError:
         return {
             "status_code": response.status_code,
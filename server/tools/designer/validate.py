@@ -1,9 +1,45 @@
 import json
+import re
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Mapping
 
 ValidationError = dict[str, str]
+# Validator method, called as check(raw, field=field)
+CheckFn = Callable[..., tuple[bool, str]]
+
+# Allowed values, in the order they are listed in error messages
+WRAP_VALUES: tuple[str, ...] = ("", "wrap", "nowrap", "wrap-reverse")
+ALIGN_CONTENT_VALUES: tuple[str, ...] = (
+    "",
+    "flex-start",
+    "flex-end",
+    "center",
+    "space-between",
+    "space-around",
+    "space-evenly",
+    "stretch",
+    "baseline",
+)
+
+# Sizes as Dropinbase takes them: a plain number (pixels), a number with a
+# CSS unit or "auto". Negative sizes are not valid CSS widths/heights.
+CSS_SIZE_UNITS: tuple[str, ...] = ("px", "%", "em", "rem", "vh", "vw", "pt")
+_CSS_SIZE_RE = re.compile(
+    r"(?:\d+(?:\.\d+)?|\.\d+)(?:" + "|".join(map(re.escape, CSS_SIZE_UNITS)) + r")?",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    """A rule with its validator method resolved, shared by the fields using it."""
+
+    function: str
+    nullable: bool
+    # None when `function` is not a validator method of Validation
+    check: CheckFn | None
 
 
 class Validation:
@@ -33,13 +69,27 @@ class Validation:
     - `fields`: list of field names that share the same rule.
     - `function`: name of a validator method on this class.
     - `nullable`: if true, empty values are allowed and skip further validation.
+
+    Rules are compiled when the config is loaded: each field maps straight to
+    its validator method, so validating does no lookups by name.
     """
 
+    _WRAP_ALLOWED = frozenset(WRAP_VALUES)
+    _ALIGN_CONTENT_ALLOWED = frozenset(ALIGN_CONTENT_VALUES)
+
     def __init__(self, config_path: Path) -> None:
         self.config_path = config_path
-        self._rules: dict[str, dict] = {}
+        self._rules: dict[str, CompiledRule] = {}
         self.load_config()
 
+    def _compile_rule(self, function: str, nullable: bool) -> CompiledRule:
+        check = getattr(self, function, None)
+        return CompiledRule(
+            function=function,
+            nullable=nullable,
+            check=check if callable(check) else None,
+        )
+
     def load_config(self) -> None:
         """
         Load or reload validation rules from the JSON config file.
@@ -51,18 +101,22 @@ class Validation:
         with self.config_path.open("r", encoding="utf-8") as f:
             data = json.load(f)
 
-        by_field: dict[str, dict[str, Any]] = {}
+        by_field: dict[str, CompiledRule] = {}
+        # Configs repeat a handful of (function, nullable) pairs, compile each once
+        compiled: dict[tuple[str, bool], CompiledRule] = {}
 
         for entry in data:
             fields = entry.get("fields") or []
             if not isinstance(fields, list):
                 continue
 
-            rule = {
-                "function": entry.get("function")
-                or "_str",  # default to string validator
-                "nullable": bool(entry.get("nullable", True)),
-            }
+            key = (
+                entry.get("function") or "_str",  # default to string validator
+                bool(entry.get("nullable", True)),
+            )
+            rule = compiled.get(key)
+            if rule is None:
+                rule = compiled[key] = self._compile_rule(*key)
 
             for raw_name in fields:
                 name = str(raw_name).strip()
@@ -73,6 +127,33 @@ class Validation:
 
         self._rules = by_field
 
+    def _check(
+        self, rule: CompiledRule, field: str, value: Any
+    ) -> ValidationError | None:
+        if value is None or value == "":
+            if rule.nullable:
+                return None
+            return {
+                "field": field,
+                "message": f"'{field}' may not be empty.",
+            }
+
+        if rule.check is None:
+            return {
+                "field": field,
+                "message": f"Validator '{rule.function}' is not defined for '{field}'.",
+            }
+
+        raw = value if isinstance(value, str) else str(value)
+        ok, msg = rule.check(raw, field=field)
+        if ok:
+            return None
+        return {"field": field, "message": msg}
+
+    def rule(self, field: str) -> CompiledRule | None:
+        """The configured rule of `field`, None when it is not configured."""
+        return self._rules.get(field)
+
     def validate(self, field: str, value: Any) -> tuple[bool, ValidationError | None]:
         """
         Validate a value for a given field.
@@ -81,34 +162,36 @@ class Validation:
         error_dict has keys: "field" and "message".
         """
         rule = self._rules.get(field)
-        if not rule:
+        if rule is None:
             # No rule configured means no validation
             return True, None
 
-        func_name = rule["function"]
-        nullable = rule["nullable"]
+        error = self._check(rule, field, value)
+        return error is None, error
 
-        if value is None or value == "":
-            if nullable:
-                return True, None
-            return False, {
-                "field": field,
-                "message": f"'{field}' may not be empty.",
-            }
-
-        raw = str(value)
-
-        validator = getattr(self, func_name, None)
-        if not callable(validator):
-            return False, {
-                "field": field,
-                "message": f"Validator '{func_name}' is not defined for '{field}'.",
-            }
+    def validate_many(
+        self, items: Iterable[tuple[str, Any]] | Mapping[str, Any]
+    ) -> dict[int, ValidationError]:
+        """
+        Validate a batch of (field, value) pairs, or a {field: value} mapping,
+        in one pass.
 
-        ok, msg = validator(raw, field=field)
-        if ok:
-            return True, None
-        return False, {"field": field, "message": msg}
+        Returns the errors keyed by the position of the pair in the batch,
+        empty when everything is valid.
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+
+        rules = self._rules
+        errors: dict[int, ValidationError] = {}
+        for index, (field, value) in enumerate(items):
+            rule = rules.get(field)
+            if rule is None:
+                continue
+            error = self._check(rule, field, value)
+            if error is not None:
+                errors[index] = error
+        return errors
 
     def _int(self, raw: str, *, field: str) -> tuple[bool, str]:
         try:
@@ -146,35 +229,29 @@ class Validation:
         # Always valid as a string
         return True, ""
 
+    def _css_size(self, raw: str, *, field: str) -> tuple[bool, str]:
+        value = raw.strip()
+        if value.lower() == "auto" or _CSS_SIZE_RE.fullmatch(value):
+            return True, ""
+        return False, (
+            f"'{field}' must be a size: a number of pixels, a number with one of "
+            f"the units {', '.join(CSS_SIZE_UNITS)}, or 'auto'."
+        )
+
     def _bool(self, raw: str, *, field: str) -> tuple[bool, str]:
-        TRUTHY = {"1"}
-        FALSY = {"0"}
-        lower = raw.strip().lower()
-        if lower in TRUTHY or lower in FALSY:
+        if raw.strip() in ("0", "1"):
             return True, ""
         return False, f"'{field}' must be a boolean value (true/false or 1/0)."
 
     def _wrap(self, raw: str, *, field: str) -> tuple[bool, str]:
-        ALLOWED_VALUES = {"", "wrap", "nowrap", "wrap-reverse"}
-        if raw in ALLOWED_VALUES:
+        if raw in self._WRAP_ALLOWED:
             return True, ""
-        return False, f"'{field}' must be one of: {', '.join(ALLOWED_VALUES)}."
+        return False, f"'{field}' must be one of: {', '.join(WRAP_VALUES)}."
 
     def _align_content(self, raw: str, *, field: str) -> tuple[bool, str]:
-        ALLOWED_VALUES = {
-            "",
-            "flex-start",
-            "flex-end",
-            "center",
-            "space-between",
-            "space-around",
-            "space-evenly",
-            "stretch",
-            "baseline",
-        }
-        if raw in ALLOWED_VALUES:
+        if raw in self._ALIGN_CONTENT_ALLOWED:
             return True, ""
-        return False, f"'{field}' must be one of: {', '.join(ALLOWED_VALUES)}."
+        return False, f"'{field}' must be one of: {', '.join(ALIGN_CONTENT_VALUES)}."
 
 
 config_path = Path(__file__).parent / "validation_function_config.json"
@@ -2,12 +2,12 @@ import logging
 
 from mcp.types import ToolAnnotations
 
-from env_variables import get_env, _to_bool
+from settings import get_settings
 from mcp_instance import mcp
 from session_auth import dib_session_client
 
 logger = logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
 
 
 @mcp.tool(
@@ -66,8 +66,8 @@ def auth_with_env_credentials():
     # Clear any existing session
     dib_session_client.session.cookies.clear()
 
-    dib_session_client.username = get_env("DIB_USERNAME", "admin")
-    dib_session_client.password = get_env("DIB_PASSWORD", "test")
+    dib_session_client.username = get_settings().dib_username
+    dib_session_client.password = get_settings().dib_password
     dib_session_client.login()
 
     return {
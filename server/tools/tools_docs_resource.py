@@ -4,6 +4,12 @@ from resources.dib_docs.resource_registry import DOCS_BY_NAME, DocResourceMeta
 from resources.dib_docs.docs_resource_factory import fetch_endpoint_content
 
 from mcp_instance import mcp
+from response_shaping import to_compact_json
+from result_store import paginate
+
+# The docs registry is filled when the docs resources are registered, which
+# may have been deferred until first use
+mcp.load_deferred_resources()
 
 
 @mcp.tool(
@@ -87,6 +93,7 @@ def list_dib_docs(
         "Also use this when designing a project or adding components in the Designer, "
         "so that your explanation and choices follow the recommended patterns."
         "Remember to first call `list_dib_docs` to find the available documentation names."
+        "A long page is returned in pages: the first page is followed by a '_page' object whose 'next_cursor' can be passed to `fetch_more`."
     ),
     annotations=ToolAnnotations(
         readOnlyHint=True,
@@ -113,5 +120,7 @@ def load_dib_doc(
         }
 
     docs_content = fetch_endpoint_content(meta.endpoint, meta.payload)
+    if not isinstance(docs_content, str):
+        docs_content = to_compact_json(docs_content)
 
-    return docs_content
+    return paginate(docs_content, f"load_dib_doc:{name}")
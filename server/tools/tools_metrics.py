@@ -0,0 +1,57 @@
+import logging
+
+from mcp.types import ToolAnnotations
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from circuit_breaker import circuit_breaker_states
+from settings import get_settings
+from mcp_instance import mcp
+from metrics import REQUEST_METRICS
+from rate_limit import OUTBOUND_LIMITER
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+
+@mcp.tool(
+    name="get_request_metrics",
+    title="Get Dropinbase Request Metrics",
+    description=(
+        "Return metrics for all requests this server made to Dropinbase since it started (or since the last reset): "
+        "per endpoint path the request count, status codes, latency (average, approximate p50/p95/p99 and histogram "
+        "buckets in seconds), bytes sent and received, retries after an expired session and after transient failures, "
+        "plus the number of logins and re-logins and the state of the circuit breaker of every endpoint "
+        "('open' means requests to it currently fail fast) and the client-side rate limiter: per traffic class "
+        "(read, write, docs) and priority (interactive, background) how many requests had to wait and for how long, "
+        "and the slots currently in flight. Use this to find out where time goes when tools are slow. Set `reset` to true to clear the "
+        "metrics after reading them."
+    ),
+    annotations=ToolAnnotations(
+        readOnlyHint=False,
+        destructiveHint=False,
+        idempotentHint=False,
+        openWorldHint=False,
+    ),
+)
+def get_request_metrics(reset: bool = False) -> dict:
+    """
+    Return a snapshot of the outbound request metrics.
+    """
+    snapshot = REQUEST_METRICS.snapshot()
+    snapshot["circuit_breakers"] = circuit_breaker_states()
+    snapshot["limiter_slots"] = OUTBOUND_LIMITER.snapshot()
+    if reset:
+        REQUEST_METRICS.reset()
+    return snapshot
+
+
+# Prometheus text endpoint, only served when running over streamable-http
+if get_settings().metrics_http_enabled:
+
+    @mcp.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            REQUEST_METRICS.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,40 @@
+import logging
+
+from mcp.types import ToolAnnotations
+
+from settings import get_settings
+from mcp_instance import mcp
+from result_store import result_store
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+
+@mcp.tool(
+    name="fetch_more",
+    title="Fetch the next page of a result",
+    description=(
+        "Return the next page of a result that was too large to return at once, such as a large "
+        "project tree or documentation page. Pass the 'next_cursor' from the '_page' object that "
+        "follows the previous page. The page is read from memory, Dropinbase is not called again. "
+        "Join the pages in order to get the full result. Cursors expire after a few minutes; "
+        "call the original tool again when a cursor has expired."
+    ),
+    annotations=ToolAnnotations(
+        readOnlyHint=True,
+        destructiveHint=False,
+        idempotentHint=True,
+        openWorldHint=False,
+    ),
+)
+def fetch_more(cursor: str):
+    """
+    Return the page a cursor points to, followed by its page info.
+    """
+    page = result_store.page(cursor)
+    if page is None:
+        logger.debug("Unknown or expired cursor %s", cursor)
+        return {
+            "error": f"Unknown or expired cursor: {cursor}. Call the original tool again.",
+        }
+    return page
@@ -1,11 +1,20 @@
 from tools.wizards.base.state_model import WizardState, StateFile
-from tools.wizards.application_wizard.steps.option_providers_registration_app_wiz import (
-    get_tables_for_selected_db,
+from tools.wizards.base.option_provider_base import resolve_options
+
+# Registers the get_tables_for_selected_db option provider used below
+from tools.wizards.application_wizard.steps import (
+    option_providers_registration_app_wiz,
 )
 
 
-def load_wizard_payload() -> dict:
-    state = WizardState.load(StateFile.APPLICATION_WIZARD)
+def load_wizard_payload(state: WizardState | None = None) -> dict:
+    """
+    Build the application settings payload from the wizard answers.
+
+    Uses the persisted wizard state unless an in-memory `state` is given.
+    """
+    if state is None:
+        state = WizardState.load(StateFile.APPLICATION_WIZARD)
 
     answers = state.answers
 
@@ -117,14 +126,26 @@ def _to_01(v: object) -> int:
     return 0
 
 
-def load_wizard_db_table_payloads() -> list[dict]:
+def load_wizard_db_table_payloads(state: WizardState | None = None) -> list[dict]:
+    """
+    Build one wizBuildAppGrid update payload per configured table.
 
-    state = WizardState.load(StateFile.APPLICATION_WIZARD)
+    Uses the persisted wizard state unless an in-memory `state` is given.
+    """
+    if state is None:
+        state = WizardState.load(StateFile.APPLICATION_WIZARD)
     answers = state.answers
 
-    # Get the previous (default) table settings
+    # Get the previous (default) table settings, usually already cached from
+    # enriching the configure_tables_for_db step
     db_id = answers.get("choose_db").get("db_name")
-    old_settings = get_tables_for_selected_db(db_id=db_id)
+    old_settings = resolve_options(
+        {
+            "type": "function",
+            "name": "get_tables_for_selected_db",
+            "args": {"db_id": db_id},
+        }
+    )
 
     # Get the new table settings from the answers
     new_settings = answers.get("configure_tables_for_db").get("table_settings", [])
@@ -1,5 +1,8 @@
+import html
+import logging
 import re
 
+from pathlib import Path
 from typing import Any
 
 from tools.wizards.base.option_provider_base import (
@@ -7,8 +10,22 @@ from tools.wizards.base.option_provider_base import (
     extract_records_from_response,
     extract_options_from_response,
 )
-from env_variables import get_env
-from session_auth import dib_session_client
+from concurrency import outcome_error_message, run_bounded
+from endpoints import (
+    APP_DATABASES,
+    APP_FORM_DESIGNS,
+    APP_GRID_DESIGNS,
+    APP_TABLES,
+    APP_TEMPLATE_DESCRIPTION,
+    APP_TEMPLATES,
+    call_endpoint,
+)
+from json_codec import response_json
+from settings import get_settings
+from persistent_cache import JsonFileCache
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
 
 
 @register_option_provider("get_avail_databases")
@@ -17,17 +34,6 @@ def get_avail_databases(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=wizBuildApp&containerItemId=339&itemAlias=id&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
     payload = {
         "clientData": {
             "alias_self": {
@@ -43,101 +49,144 @@ def get_avail_databases(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(APP_DATABASES, payload=payload)
 
     options = extract_options_from_response(response=response, topic="fetch databases")
 
     return options
 
 
-@register_option_provider("get_avail_base_container_templates")
-def get_avail_base_container_templates(
-    *, context: dict[str, Any] | None = None, include_descriptions: bool
-) -> list:
+# Precompiled once, descriptions are stripped for every template listed
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
 
-    def _get_base_templates() -> list:
-        url = (
-            f"{get_env('BASE_URL', 'https://localhost')}"
-            "/peff/Crud/componentlist"
-            "?containerName=wizBuildApp&containerItemId=3039&itemAlias=tmplId&page=1&limit=40&activeFilter=null"
-        )
+# Template descriptions rarely change, persist them across server runs. Keyed
+# by BASE_URL and template id, ids of different instances are unrelated.
+TEMPLATE_DESCRIPTION_CACHE = JsonFileCache(
+    Path("server/tools/wizards/application_wizard/state/template_descriptions.json"),
+    ttl_seconds=get_settings().template_description_cache_ttl_seconds,
+)
+TEMPLATE_DESCRIPTION_MAX_WORKERS: int = get_settings().template_description_max_workers
 
-        headers: dict[str, str] = {
-            "Content-Type": "application/json",
-            "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-        }
 
-        response = dib_session_client.request("POST", url, headers=headers)
+def _strip_html(text: str) -> str:
+    return html.unescape(_HTML_TAG_RE.sub("", text)).strip()
 
-        records = extract_records_from_response(
-            response=response, topic="container templates"
-        )
 
-        return records
+def _get_template_description(template_id: str) -> str:
+    payload = {
+        "clientData": {
+            "alias_self": {
+                "id": None,
+                "tmplId": template_id,
+                "baseName": "",
+                "helpIndex": "tmpl",
+                "baseContainerOption": "createNew",
+                "baseContainerId": None,
+            },
+            "alias_parent": {},
+            "query_params": {},
+        },
+        "itemEventId": "ie89-dib",
+        "itemId": "3039",
+        "containerName": "wizBuildApp",
+        "triggerType": "changed",
+        "itemAlias": "tmplId",
+    }
 
-    def _get_template_description(template_id: str) -> str:
-        url = (
-            f"{get_env('BASE_URL', 'https://localhost')}"
-            "/peff/Sync/setBaseDescription?containerName=wizBuildApp"
-        )
+    response = call_endpoint(APP_TEMPLATE_DESCRIPTION, payload=payload)
 
-        headers: dict[str, str] = {
-            "Content-Type": "application/json",
-            "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-        }
+    try:
+        data = response_json(response)
 
-        payload = {
-            "clientData": {
-                "alias_self": {
-                    "id": None,
-                    "tmplId": template_id,
-                    "baseName": "",
-                    "helpIndex": "tmpl",
-                    "baseContainerOption": "createNew",
-                    "baseContainerId": None,
-                },
-                "alias_parent": {},
-                "query_params": {},
-            },
-            "itemEventId": "ie89-dib",
-            "itemId": "3039",
-            "containerName": "wizBuildApp",
-            "triggerType": "changed",
-            "itemAlias": "tmplId",
-        }
+        # Check for success
+        if not data.get("success"):
+            raise ValueError(
+                "Failed to fetch container templates: Unsuccessful response"
+            )
 
-        response = dib_session_client.request(
-            "POST", url, headers=headers, json=payload
-        )
+        actions = data.get("actions")[0]
+        templateHelp = actions.get("params").get("helpTmpl")
 
-        try:
-            data = response.json()
+        if templateHelp is None:
+            raise ValueError(
+                "Failed to fetch container templates: No helpTmpl field found"
+            )
+
+    except ValueError:
+        raise ValueError("Failed to parse response JSON for container templates")
+
+    return _strip_html(templateHelp)
+
+
+def _template_cache_key(template_id: str) -> str:
+    return f"{get_settings().base_url} {template_id}"
+
+
+def _get_template_descriptions(template_ids: list[str]) -> dict[str, str]:
+    """
+    Return descriptions by template id. Cached descriptions are served from
+    TEMPLATE_DESCRIPTION_CACHE, the rest are fetched concurrently.
+    """
+    descriptions: dict[str, str] = {}
+    missing: list[str] = []
+    for template_id in template_ids:
+        cached = TEMPLATE_DESCRIPTION_CACHE.get(_template_cache_key(template_id))
+        if cached is None:
+            missing.append(template_id)
+        else:
+            descriptions[template_id] = cached
+
+    outcomes = run_bounded(
+        _get_template_description,
+        missing,
+        max_workers=TEMPLATE_DESCRIPTION_MAX_WORKERS,
+        thread_name_prefix="dib-templates",
+    )
 
-            # Check for success
-            if not data.get("success"):
-                raise ValueError(
-                    "Failed to fetch container templates: Unsuccessful response"
-                )
+    fetched: dict[str, str] = {}
+    for template_id, outcome in zip(missing, outcomes):
+        if outcome.ok:
+            fetched[template_id] = outcome.value
+        else:
+            logger.warning(
+                "Could not fetch description for template %s: %s",
+                template_id,
+                outcome_error_message(outcome),
+            )
+            descriptions[template_id] = "Description unavailable."
+
+    TEMPLATE_DESCRIPTION_CACHE.set_many(
+        {_template_cache_key(key): value for key, value in fetched.items()}
+    )
+    descriptions.update(fetched)
 
-            actions = data.get("actions")[0]
-            templateHelp = actions.get("params").get("helpTmpl")
+    return descriptions
 
-            if templateHelp is None:
-                raise ValueError(
-                    "Failed to fetch container templates: No helpTmpl field found"
-                )
 
-        except ValueError:
-            raise ValueError("Failed to parse response JSON for container templates")
+@register_option_provider("get_avail_base_container_templates")
+def get_avail_base_container_templates(
+    *, context: dict[str, Any] | None = None, include_descriptions: bool
+) -> list:
+
+    def _get_base_templates() -> list:
+        response = call_endpoint(APP_TEMPLATES)
 
-        # Strip html tags if any
-        cleanr = re.compile("<.*?>")
-        cleantext = re.sub(cleanr, "", templateHelp)
+        records = extract_records_from_response(
+            response=response, topic="container templates"
+        )
 
-        return cleantext.strip()
+        return records
 
     base_template_records: list = _get_base_templates()
 
+    descriptions: dict[str, str] = (
+        _get_template_descriptions(
+            [str(record.get("id")) for record in base_template_records]
+        )
+        if include_descriptions
+        else {}
+    )
+
     options = []
 
     for record in base_template_records:
@@ -147,8 +196,7 @@ def get_avail_base_container_templates(
         option = {"value": str(db_id), "label": db_name}
 
         if include_descriptions:
-            description = _get_template_description(str(db_id))
-            option["description"] = description
+            option["description"] = descriptions.get(str(db_id), "")
 
         options.append(option)
 
@@ -162,18 +210,7 @@ def get_avail_form_design_definitions(
     add_static_descriptions: bool = False,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=wizBuildAppSettings&containerItemId=367&itemAlias=pef_form_design_id&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
+    response = call_endpoint(APP_FORM_DESIGNS)
 
     records = extract_records_from_response(
         response=response, topic="form design definitions"
@@ -222,18 +259,7 @@ def get_avail_grid_design_definitions(
     add_static_descriptions: bool = False,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=wizBuildAppSettings&containerItemId=366&itemAlias=pef_grid_design_id&page=1&limit=40&activeFilter=wizBuildAppSettings_pef_grid_design_id"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
+    response = call_endpoint(APP_GRID_DESIGNS)
 
     records = extract_records_from_response(
         response=response, topic="grid design definitions"
@@ -279,7 +305,7 @@ def get_avail_grid_design_definitions(
 
 @register_option_provider("get_tables_for_selected_db")
 def get_tables_for_selected_db(
-    *, context: dict[str, Any] | None = None, db_id: int | None = None
+    *, context: dict[str, Any] | None = None, db_id: int | str | None = None
 ) -> list:
 
     if db_id is None:  # Extract from context if not provided
@@ -287,20 +313,12 @@ def get_tables_for_selected_db(
         answers = wizard_state.get("answers", {})
 
         db_answer = answers.get("choose_db", {})
-        db_id_str = db_answer.get("db_name")
-        if not db_id_str:
-            raise ValueError("Database must be selected before configuring tables.")
-
-        db_id = int(db_id_str)
+        db_id = db_answer.get("db_name")
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}" "/peff/Crud/read/wizBuildAppGrid"
-    )
+    if not db_id:
+        raise ValueError("Database must be selected before configuring tables.")
 
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
+    db_id = int(db_id)
 
     payload = {
         "clientData": {
@@ -314,7 +332,7 @@ def get_tables_for_selected_db(
         "activeFilter": "wizBuildAppGrid",
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(APP_TABLES, payload=payload)
 
     records = extract_records_from_response(response=response, topic="tables for DB")
 
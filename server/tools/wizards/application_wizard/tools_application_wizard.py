@@ -1,6 +1,9 @@
+import time
+
 from pathlib import Path
 from typing import Any
 
+from mcp.server.fastmcp import Context
 from mcp.types import ToolAnnotations
 
 from mcp_instance import mcp
@@ -8,14 +11,22 @@ from tools.wizards.base.steps_manager import StepManager
 from tools.wizards.application_wizard.steps.answer_validation_app_wiz import (
     validate_step_answers,
 )
+from tools.wizards.base.validation_base import validate_steps_answers
+from tools.wizards.base.dry_run import CONFIRM_STEP_ID, StageTimer, payload_size_bytes
 from tools.wizards.base.state_model import WizardState, StateFile
+from tools.wizards.base.option_cache import OPTION_CACHE
+from tools.wizards.base.queue_tracker import QueueTracker, extract_queue_ids
 from tools.wizards.application_wizard.state.payload_mapping_app_wiz import (
     load_wizard_payload,
     load_wizard_db_table_payloads,
 )
 
-from env_variables import get_env
-from session_auth import dib_session_client
+from circuit_breaker import RetryPolicy
+from endpoints import APP_BUILD, APP_SETTINGS, APP_UPDATE_TABLE, call_endpoint
+from json_codec import response_json
+from concurrency import TaskOutcome, outcome_error_message, run_bounded
+from settings import get_settings
+from progress import NO_PROGRESS, ProgressReporter, run_sync_with_progress
 
 STEPS_FILE = Path(
     "server/tools/wizards/application_wizard/steps/new_base_wizard_steps.json"
@@ -57,6 +68,7 @@ def start_application_wizard(app_name: str | None = None) -> dict[str, Any]:
     state.save(StateFile.APPLICATION_WIZARD)
 
     enriched_step = steps.enrich(first_step, wizard_state=state.__dict__)
+    steps.prefetch_after(first_step["id"], wizard_state=state.__dict__)
 
     return {
         "status": "ok",
@@ -65,28 +77,17 @@ def start_application_wizard(app_name: str | None = None) -> dict[str, Any]:
     }
 
 
-def _set_application_values():
+def _set_application_values(state: WizardState | None = None):
     """
     Sets the application-level settings via Dropinbase API. Corresponds to the first two tabs of the GUI wizard.
     """
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Sync/updateAllAppSettings"
-        "?containerName=wizBuildAppSettings"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    payload = load_wizard_payload()
+    payload = load_wizard_payload(state)
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(APP_SETTINGS, payload=payload)
 
     try:
-        return {"data": response.json()}
+        return {"data": response_json(response)}
     except ValueError:
         return {
             "status_code": response.status_code,
@@ -94,60 +95,107 @@ def _set_application_values():
         }
 
 
-def _set_table_settings():
+TABLE_SETTINGS_MAX_WORKERS: int = get_settings().table_settings_max_workers
+TABLE_SETTINGS_MAX_ATTEMPTS: int = get_settings().table_settings_max_attempts
+TABLE_SETTINGS_BACKOFF_SECONDS: float = get_settings().table_settings_backoff_seconds
+
+# Table updates are idempotent, transient failures are retried by call_endpoint
+TABLE_SETTINGS_RETRY = RetryPolicy(
+    max_attempts=TABLE_SETTINGS_MAX_ATTEMPTS,
+    backoff_seconds=TABLE_SETTINGS_BACKOFF_SECONDS,
+)
+
+
+def _submit_table_settings(table_payload: dict[str, Any]) -> dict[str, Any]:
     """
-    Sets the table-level settings via Dropinbase API. Corresponds to the third tab containing the table list.
+    POST the settings of a single table, retrying transient failures with
+    jittered exponential backoff.
     """
+    table_id = table_payload["recordData"]["id"]
 
-    tables_settings = load_wizard_db_table_payloads()
+    response = call_endpoint(
+        APP_UPDATE_TABLE,
+        payload=table_payload,
+        table_id=table_id,
+        retry=TABLE_SETTINGS_RETRY,
+    )
 
-    responses = []
-    for table_payload in tables_settings:
-        table_id = table_payload["recordData"]["id"]
+    result: dict[str, Any] = {
+        "table_id": table_id,
+        "name": table_payload["recordData"].get("name"),
+    }
+    try:
+        data = response_json(response)
+        result["ok"] = response.ok and bool(data.get("success"))
+        result["data"] = data
+    except ValueError:
+        result["ok"] = False
+        result["status_code"] = response.status_code
+        result["response"] = response.text
 
-        url = (
-            f"{get_env('BASE_URL', 'https://localhost')}"
-            "/peff/Crud/update/wizBuildAppGrid"
-            f"?primaryKeyData=%7B%22id%22:{table_id}%7D"
-        )
+    return result
 
-        headers: dict[str, str] = {
-            "Content-Type": "application/json",
-            "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-        }
 
-        response = dib_session_client.request(
-            "POST", url, headers=headers, json=table_payload
-        )
+def _set_table_settings(
+    progress: ProgressReporter = NO_PROGRESS, state: WizardState | None = None
+) -> dict[str, Any]:
+    """
+    Sets the table-level settings via Dropinbase API. Corresponds to the third tab containing the table list.
+
+    Tables are submitted concurrently (TABLE_SETTINGS_MAX_WORKERS) and progress
+    is reported per finished table. Returns an aggregate of all table results.
+    """
+
+    tables_settings = load_wizard_db_table_payloads(state)
+    total = len(tables_settings)
+
+    def _on_done(completed: int, total: int, outcome: TaskOutcome) -> None:
+        progress.report(completed, total, f"Table settings saved: {completed}/{total}")
+
+    outcomes = run_bounded(
+        _submit_table_settings,
+        tables_settings,
+        max_workers=TABLE_SETTINGS_MAX_WORKERS,
+        thread_name_prefix="dib-table-settings",
+        on_done=_on_done,
+    )
 
-        try:
-            responses.append({"data": response.json()})
-        except ValueError:
-            responses.append(
+    results = []
+    for table_payload, outcome in zip(tables_settings, outcomes):
+        if outcome.ok:
+            results.append(outcome.value)
+        else:
+            results.append(
                 {
-                    "status_code": response.status_code,
-                    "response": response.text,
+                    "table_id": table_payload["recordData"]["id"],
+                    "name": table_payload["recordData"].get("name"),
+                    "ok": False,
+                    "error": outcome_error_message(outcome),
                 }
             )
 
-    return responses
+    failed = [r["table_id"] for r in results if not r.get("ok")]
+
+    return {
+        "total": total,
+        "succeeded": total - len(failed),
+        "failed_table_ids": failed,
+        "results": results,
+    }
 
 
-def _execute_create_action(db_id: str, template_id: str, base_container_name: str):
+def _execute_create_action(
+    db_id: str,
+    template_id: str,
+    base_container_name: str,
+    progress: ProgressReporter = NO_PROGRESS,
+):
     """
-    Calls the Dropinbase API to execute the application creation action.
+    Calls the Dropinbase API to execute the application creation action, then
+    tracks the build queue it starts until the build completes or times out.
     """
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    # Step 1
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Sync/executeTasks"
-        f"?containerName=wizBuildApp&queueUid=1765651576"
-    )
+    # Like the Dropinbase client, generate the queue uid for this build
+    queue_uid = str(int(time.time() * 1000))
 
     payload = {
         "clientData": {
@@ -169,34 +217,96 @@ def _execute_create_action(db_id: str, template_id: str, base_container_name: st
         "itemAlias": "btnBuildMyApp",
     }
 
-    response1 = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(APP_BUILD, payload=payload, queueUid=queue_uid)
 
-    # Step 2
-    url2 = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Queue/get/wizBuildApp"
-        "?queueItemId=1765645516918"
-    )
+    try:
+        execute_data = response_json(response)
+    except ValueError:
+        return {
+            "status": "failed",
+            "execute_tasks": {
+                "status_code": response.status_code,
+                "ok": response.ok,
+                "response": response.text,
+            },
+        }
 
-    response2 = dib_session_client.request("POST", url2, headers=headers)
+    if not execute_data.get("success"):
+        return {"status": "failed", "execute_tasks": execute_data}
 
+    progress.report(0, None, "Application build started")
+
+    queue_ids = extract_queue_ids(execute_data, fallback_queue_uid=queue_uid)
+    build = QueueTracker("wizBuildApp").track(queue_ids, progress)
+
+    return {
+        "status": build.status,
+        "execute_tasks": execute_data,
+        "build": build.to_dict(),
+    }
+
+
+def _create_application(
+    state: WizardState,
+    progress: ProgressReporter = NO_PROGRESS,
+    *,
+    persist: bool = True,
+) -> dict[str, Any]:
+    """
+    Call the Dropinbase APIs to create the application from the given wizard
+    state, and mark the wizard as complete. With `persist` false the state is
+    only updated in memory, the saved wizard state is left alone.
+    """
     try:
-        return {"data": [response1.json(), response2.json()]}
-    except ValueError:
+        app_settings_result = _set_application_values(state)
+    except Exception as e:
+        raise RuntimeError("Failed to set application values") from e
+    try:
+        table_settings_result = _set_table_settings(progress, state)
+    except Exception as e:
+        raise RuntimeError("Failed to set table settings") from e
+
+    if table_settings_result["failed_table_ids"]:
+        # Do not build the application on partially applied table settings,
+        # the wizard stays on this step so it can be retried
         return {
-            "data": [
-                {
-                    "status_code": response1.status_code,
-                    "ok": response1.ok,
-                    "response": response1.text,
-                },
-                {
-                    "status_code": response2.status_code,
-                    "ok": response2.ok,
-                    "response": response2.text,
-                },
-            ]
+            "status": "error",
+            "message": "Failed to set table settings for some tables. Submit the confirmation again to retry.",
+            "app_settings_result": app_settings_result,
+            "table_settings_result": table_settings_result,
         }
+    try:
+        db_id = state.answers.get("choose_db").get("db_name")
+        template_id = state.answers.get("choose_base_container_template").get(
+            "base_container_template"
+        )
+        base_container_name = state.answers.get("set_base_container_name").get(
+            "base_container_name"
+        )
+        create_action_result = _execute_create_action(
+            db_id, template_id, base_container_name, progress
+        )
+    except Exception as e:
+        raise RuntimeError("Failed to execute create action") from e
+
+    # Wizard is complete
+    state.current_step_id = None
+    state.completed = True
+    if persist:
+        state.save(StateFile.APPLICATION_WIZARD)
+
+    # Newly created records can make cached option lists stale
+    OPTION_CACHE.clear()
+
+    return {
+        "summary": {
+            "meta": state.meta,
+            "answers": state.answers,
+            "app_settings_result": app_settings_result,
+            "table_settings_result": table_settings_result,
+            "create_action_result": create_action_result,
+        },
+    }
 
 
 @mcp.tool(
@@ -213,14 +323,27 @@ def _execute_create_action(db_id: str, template_id: str, base_container_name: st
         openWorldHint=False,
     ),
 )
-def step_application_wizard(
+async def step_application_wizard(
     step_id: str,
     answers: dict[str, Any],
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
     """
     Validate the user's answers for the current step, persist them,
     and return the next step (or a completion summary).
+
+    The blocking work runs in a worker thread so progress of the final
+    creation step can be reported to the client.
     """
+    return await run_sync_with_progress(ctx, _step_application_wizard, step_id, answers)
+
+
+def _step_application_wizard(
+    step_id: str,
+    answers: dict[str, Any],
+    *,
+    progress: ProgressReporter = NO_PROGRESS,
+) -> dict[str, Any]:
     steps = StepManager.load(STEPS_FILE)
     state = WizardState.load(StateFile.APPLICATION_WIZARD)
 
@@ -272,49 +395,14 @@ def step_application_wizard(
     next_step_cfg = steps.next_after(step_id)
 
     if not next_step_cfg:
-        # Call Dropinbase APIs to create the application
-        try:
-            app_settings_result = _set_application_values()
-        except Exception as e:
-            raise RuntimeError("Failed to set application values") from e
-        try:
-            table_settings_result = _set_table_settings()
-        except Exception as e:
-            raise RuntimeError("Failed to set table settings") from e
-        try:
-            db_id = state.answers.get("choose_db").get("db_name")
-            template_id = state.answers.get("choose_base_container_template").get(
-                "base_container_template"
-            )
-            base_container_name = state.answers.get("set_base_container_name").get(
-                "base_container_name"
-            )
-            create_action_result = _execute_create_action(
-                db_id, template_id, base_container_name
-            )
-        except Exception as e:
-            raise RuntimeError("Failed to execute create action") from e
-
-        # Wizard is complete
-        state.current_step_id = None
-        state.completed = True
-        state.save(StateFile.APPLICATION_WIZARD)
-
-        return {
-            "summary": {
-                "meta": state.meta,
-                "answers": state.answers,
-                "app_settings_result": app_settings_result,
-                "table_settings_result": table_settings_result,
-                "create_action_result": create_action_result,
-            },
-        }
+        return _create_application(state, progress)
 
     # Move on to the next step
     state.current_step_id = next_step_cfg["id"]
     state.save(StateFile.APPLICATION_WIZARD)
 
     next_step_enriched = steps.enrich(next_step_cfg, wizard_state=state.__dict__)
+    steps.prefetch_after(next_step_cfg["id"], wizard_state=state.__dict__)
 
     return {
         "status": "ok",
@@ -323,6 +411,124 @@ def step_application_wizard(
     }
 
 
+@mcp.tool(
+    name="run_application_wizard",
+    title="Run Application Creation Wizard in One Call",
+    description=(
+        "Create a new application in Dropinbase in a single call when all wizard answers are already known. "
+        "`answers` maps each step id to that step's answers, exactly as they would be passed to "
+        '`step_application_wizard`, e.g. {"choose_db": {"db_name": "5"}, ...}. '
+        "Info-only steps need no answers. All steps are validated at once; on validation errors nothing is "
+        "created and the errors are returned per step together with the step definitions and their options. "
+        "Prefer the step-by-step wizard when answers still need to be discussed with the user. "
+        "Set `dry_run` to true to only validate and return the exact payloads that would be sent, with size "
+        "and timing stats, without writing anything to Dropinbase (confirmation is then not required). "
+        "Use a dry run to check large application builds before committing to the slow create path."
+    ),
+    annotations=ToolAnnotations(
+        readOnlyHint=False,
+        destructiveHint=False,
+        idempotentHint=False,
+        openWorldHint=False,
+    ),
+)
+async def run_application_wizard(
+    answers: dict[str, dict[str, Any]],
+    app_name: str | None = None,
+    dry_run: bool = False,
+    ctx: Context | None = None,
+) -> dict[str, Any]:
+    """
+    Walk, validate and complete the whole application wizard in one go.
+    """
+    return await run_sync_with_progress(
+        ctx, _run_application_wizard, answers, app_name, dry_run
+    )
+
+
+def _dry_run_application(state: WizardState, timer: StageTimer) -> dict[str, Any]:
+    """
+    Build the payloads the application creation would send, without sending
+    them. Only (cached) option lookups reach Dropinbase.
+    """
+    with timer.stage("payloads"):
+        app_settings_payload = load_wizard_payload(state)
+        table_payloads = load_wizard_db_table_payloads(state)
+
+    return {
+        "status": "dry_run",
+        "payloads": {
+            "app_settings": app_settings_payload,
+            "table_settings": table_payloads,
+        },
+        "requests": [
+            {"endpoint": "/peff/Sync/updateAllAppSettings", "count": 1},
+            {
+                "endpoint": "/peff/Crud/update/wizBuildAppGrid",
+                "count": len(table_payloads),
+            },
+            {"endpoint": "/peff/Sync/executeTasks", "count": 1},
+        ],
+        "stats": {
+            "table_count": len(table_payloads),
+            "app_settings_bytes": payload_size_bytes(app_settings_payload),
+            "table_settings_bytes": payload_size_bytes(table_payloads),
+            "timings": timer.as_dict(),
+        },
+    }
+
+
+def _run_application_wizard(
+    answers: dict[str, dict[str, Any]],
+    app_name: str | None = None,
+    dry_run: bool = False,
+    *,
+    progress: ProgressReporter = NO_PROGRESS,
+) -> dict[str, Any]:
+    steps = StepManager.load(STEPS_FILE)
+    timer = StageTimer()
+
+    path = steps.included_path(answers)
+    if dry_run:
+        path = [step for step in path if step["id"] != CONFIRM_STEP_ID]
+    if not path:
+        return {
+            "status": "error",
+            "message": "No wizard steps configured.",
+        }
+
+    state = WizardState(meta={"app_name": app_name})
+    state.answers = {step["id"]: dict(answers.get(step["id"]) or {}) for step in path}
+
+    # Options of all steps are resolved as one concurrent batch
+    with timer.stage("options"):
+        enriched_steps = steps.enrich_many(path, wizard_state=state.__dict__)
+    with timer.stage("validation"):
+        errors = validate_steps_answers(
+            enriched_steps, state.answers, validate_step_answers
+        )
+
+    if errors:
+        return {
+            "status": "validation_error",
+            "errors": errors,
+            "steps": [step for step in enriched_steps if step["id"] in errors],
+        }
+
+    if dry_run:
+        return _dry_run_application(state, timer)
+
+    if not state.answers.get("confirm_creation", {}).get("confirm_creation", False):
+        return {
+            "status": "error",
+            "message": "Wizard cannot be completed without confirmation.",
+        }
+
+    # Kept in memory only, a step-by-step wizard in progress stays untouched
+    state.completed_step_ids = [step["id"] for step in path]
+    return _create_application(state, progress, persist=False)
+
+
 @mcp.tool(
     name="get_application_wizard_state",
     title="Get Application Wizard State",
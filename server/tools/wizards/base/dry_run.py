@@ -0,0 +1,43 @@
+import json
+import time
+
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Confirmation is what separates a dry run from a real run, it is not required
+CONFIRM_STEP_ID = "confirm_creation"
+
+
+def payload_size_bytes(payload: Any) -> int:
+    """Size of the payload as it would be sent, i.e. compact JSON in UTF-8."""
+    return len(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+class StageTimer:
+    """
+    Records the wall time of named stages of a wizard run, in milliseconds.
+
+    Usage:
+
+        timer = StageTimer()
+        with timer.stage("options"):
+            ...
+        timer.as_dict()  # {"options_ms": 12.3, "total_ms": 12.3}
+    """
+
+    def __init__(self) -> None:
+        self._stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed_ms
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {f"{name}_ms": round(ms, 2) for name, ms in self._stages.items()}
+        timings["total_ms"] = round(sum(self._stages.values()), 2)
+        return timings
@@ -0,0 +1,91 @@
+import json
+import logging
+import threading
+import time
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from rate_limit import PriorityHandle, current_priority, current_priority_handle
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+
+@dataclass
+class _CacheEntry:
+    future: Future
+    expires_at: float
+    # Set when resolved in the background (prefetch)
+    priority: PriorityHandle | None = None
+
+
+class OptionCache:
+    """
+    Short-lived, thread-safe cache for resolved option provider results.
+
+    Entries are keyed by provider name and resolved arguments. An entry holds a
+    Future, so a caller asking for options that are still being resolved (for
+    example by the prefetcher) waits for that call instead of starting another.
+    An interactive caller waiting on a background resolution boosts its
+    requests to interactive priority. Failed resolutions are never cached.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider_name: str, kwargs: dict[str, Any]) -> str:
+        return json.dumps([provider_name, kwargs], sort_keys=True, default=str)
+
+    def get_or_resolve(self, key: str, resolve: Callable[[], list[Any]]) -> list[Any]:
+        """
+        Return the cached options for `key`, resolving (and caching) them with
+        `resolve` when missing or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            is_owner = entry is None or entry.expires_at <= now
+            if is_owner:
+                entry = _CacheEntry(
+                    future=Future(),
+                    expires_at=now + self.ttl_seconds,
+                    priority=current_priority_handle(),
+                )
+                self._entries[key] = entry
+
+        if not is_owner and entry.priority is not None and not entry.future.done():
+            if current_priority() == "interactive":
+                entry.priority.boost()
+
+        if is_owner:
+            try:
+                entry.future.set_result(resolve())
+            except BaseException as e:
+                entry.future.set_exception(e)
+                self._discard(key, entry)
+
+        return entry.future.result()
+
+    def contains(self, key: str) -> bool:
+        """Whether a valid (possibly still resolving) entry exists for `key`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _discard(self, key: str, entry: _CacheEntry) -> None:
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+
+OPTION_CACHE = OptionCache(ttl_seconds=get_settings().options_cache_ttl_seconds)
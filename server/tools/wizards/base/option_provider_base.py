@@ -1,6 +1,23 @@
+import logging
+
 from dataclasses import dataclass
 from typing import Any, Callable, Protocol
 
+from concurrency import TaskOutcome, outcome_error_message, run_bounded
+from json_codec import response_json
+from settings import get_settings
+from tools.wizards.base.option_cache import OPTION_CACHE, OptionCache
+from tracing import span
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+# Bounded pool used to resolve the option sources of a step concurrently
+OPTIONS_MAX_WORKERS: int = get_settings().options_max_workers
+OPTIONS_PROVIDER_TIMEOUT_SECONDS: float = (
+    get_settings().options_provider_timeout_seconds
+)
+
 
 class OptionProvider(Protocol):
     """
@@ -21,11 +38,20 @@ class OptionProvider(Protocol):
 # Global registry of providers by name
 OPTIONS_REGISTRY: dict[str, OptionProvider] = {}
 
+# Providers whose results must never be served from OPTION_CACHE
+UNCACHED_PROVIDERS: set[str] = set()
+
 
-def register_option_provider(name: str) -> Callable[[OptionProvider], OptionProvider]:
+def register_option_provider(
+    name: str, *, cache: bool = True
+) -> Callable[[OptionProvider], OptionProvider]:
     """
     Decorator to register an option provider function under a given name.
 
+    Results are cached in OPTION_CACHE keyed by the provider name and its
+    resolved arguments. Providers whose result depends on anything other than
+    their arguments (e.g. reading `context` directly) must pass `cache=False`.
+
     Usage:
 
         @register_option_provider("get_db_types")
@@ -38,6 +64,8 @@ def register_option_provider(name: str) -> Callable[[OptionProvider], OptionProv
         if key in OPTIONS_REGISTRY:
             raise ValueError(f"Option provider '{key}' is already registered")
         OPTIONS_REGISTRY[key] = func
+        if not cache:
+            UNCACHED_PROVIDERS.add(key)
         return func
 
     return decorator
@@ -124,6 +152,9 @@ def resolve_options(
     - simple strings
     - dicts with { "value": ..., "label": ... }
 
+    Function results are served from OPTION_CACHE when available, so callers
+    must treat the returned list as read-only.
+
     If source_cfg is None or empty, an empty list is returned.
     """
     if not source_cfg:
@@ -142,7 +173,20 @@ def resolve_options(
         if provider is None:
             raise KeyError(f"No option provider registered with name '{source.name}'")
         kwargs = resolve_dynamic_args(dict(source.args or {}), ctx)
-        return provider(context=ctx, **kwargs)
+        if source.name in UNCACHED_PROVIDERS:
+            with span("wizard.options.provider", provider=source.name, cached=False):
+                return provider(context=ctx, **kwargs)
+
+        key = OptionCache.make_key(source.name, kwargs)
+        with span(
+            "wizard.options.provider",
+            provider=source.name,
+            cached=True,
+            cache_hit=OPTION_CACHE.contains(key),
+        ):
+            return OPTION_CACHE.get_or_resolve(
+                key, lambda: provider(context=ctx, **kwargs)
+            )
 
     raise ValueError(f"Unsupported options_source.type '{source.type}'")
 
@@ -191,6 +235,72 @@ def enrich_field_with_options(
     return new_field
 
 
+def _options_error(field_cfg: dict[str, Any], outcome: TaskOutcome) -> dict[str, Any]:
+    """
+    Return a copy of the field with empty options and a structured error
+    describing why its options_source could not be resolved.
+    """
+    error_type = "timeout" if outcome.timed_out else "provider_error"
+    message = outcome_error_message(outcome)
+
+    logger.warning(
+        "Could not resolve options for field '%s' (%s): %s",
+        field_cfg.get("name"),
+        error_type,
+        message,
+    )
+
+    new_field = dict(field_cfg)
+    new_field["options"] = []
+    new_field["options_error"] = {
+        "type": error_type,
+        "message": message,
+    }
+    return new_field
+
+
+def enrich_fields_with_options(
+    fields: list[dict[str, Any]],
+    *,
+    context: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Apply enrich_field_with_options to a list of field configs.
+
+    Fields with an options_source are resolved concurrently in a bounded pool
+    (OPTIONS_MAX_WORKERS) and every provider must finish within
+    OPTIONS_PROVIDER_TIMEOUT_SECONDS of starting. Results are returned in field order.
+
+    A provider that raises or times out does not abort the whole batch,
+    instead its field is returned with empty `options` and an `options_error`:
+
+        {
+          "name": "db_name",
+          "options": [],
+          "options_error": {"type": "timeout", "message": "..."}
+        }
+    """
+    pending_idx = [idx for idx, f in enumerate(fields) if f.get("options_source")]
+    if not pending_idx:
+        return list(fields)
+
+    with span("wizard.options", fields=len(pending_idx)):
+        outcomes = run_bounded(
+            lambda idx: enrich_field_with_options(fields[idx], context=context),
+            pending_idx,
+            max_workers=OPTIONS_MAX_WORKERS,
+            timeout=OPTIONS_PROVIDER_TIMEOUT_SECONDS,
+            thread_name_prefix="dib-options",
+        )
+
+    enriched = list(fields)
+    for idx, outcome in zip(pending_idx, outcomes):
+        enriched[idx] = (
+            outcome.value if outcome.ok else _options_error(fields[idx], outcome)
+        )
+    return enriched
+
+
 def enrich_step_with_options(
     step_cfg: dict[str, Any],
     *,
@@ -206,15 +316,44 @@ def enrich_step_with_options(
           "title": "Choose a database",
           "required_inputs": [ ...fields... ]
         }
+
+    Fields are resolved concurrently, see enrich_fields_with_options.
     """
     new_step = dict(step_cfg)
     inputs = step_cfg.get("required_inputs") or []
-    new_step["required_inputs"] = [
-        enrich_field_with_options(f, context=context) for f in inputs
-    ]
+    new_step["required_inputs"] = enrich_fields_with_options(inputs, context=context)
     return new_step
 
 
+def enrich_steps_with_options(
+    step_cfgs: list[dict[str, Any]],
+    *,
+    context: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Apply enrich_step_with_options to several steps at once.
+
+    The fields of all steps are resolved as a single concurrent batch, so the
+    slowest provider (not the sum over steps) bounds the total time.
+    """
+    all_fields: list[dict[str, Any]] = []
+    for step_cfg in step_cfgs:
+        all_fields.extend(step_cfg.get("required_inputs") or [])
+
+    enriched_fields = enrich_fields_with_options(all_fields, context=context)
+
+    enriched_steps: list[dict[str, Any]] = []
+    offset = 0
+    for step_cfg in step_cfgs:
+        count = len(step_cfg.get("required_inputs") or [])
+        new_step = dict(step_cfg)
+        new_step["required_inputs"] = enriched_fields[offset : offset + count]
+        enriched_steps.append(new_step)
+        offset += count
+
+    return enriched_steps
+
+
 def extract_options_from_records(records: list) -> list:
     """
     Extract options from records fetched from the server.
@@ -242,7 +381,7 @@ def extract_records_from_response(
     Raises ValueError if the response is unsuccessful or malformed.
     """
     try:
-        data = response.json()
+        data = response_json(response)
 
         # Check for success
         if not data.get("success"):
@@ -0,0 +1,193 @@
+import contextvars
+import copy
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal
+
+from rate_limit import background_priority
+from settings import get_settings
+from tools.wizards.base.option_cache import OPTION_CACHE, OptionCache
+from tools.wizards.base.option_provider_base import (
+    UNCACHED_PROVIDERS,
+    OptionSource,
+    _get_by_path,
+    resolve_options,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+PREFETCH_ENABLED: bool = get_settings().wizard_prefetch_enabled
+PREFETCH_MAX_WORKERS: int = get_settings().wizard_prefetch_max_workers
+
+# Background pool shared by all wizards, kept small so prefetching never
+# competes noticeably with interactive tool calls
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, PREFETCH_MAX_WORKERS), thread_name_prefix="dib-prefetch"
+)
+
+IncludeStatus = Literal["yes", "no", "maybe"]
+
+
+def _include_status(
+    step_cfg: dict[str, Any],
+    answers: dict[str, Any],
+    pending_step_id: str,
+) -> IncludeStatus:
+    """
+    Three-valued version of StepManager._is_included.
+
+    Conditions on the step that is currently being answered (`pending_step_id`)
+    cannot be evaluated yet and make the result "maybe". All other conditions
+    are evaluated against the answers collected so far.
+    """
+    include_if = step_cfg.get("include_if")
+    if not include_if:
+        return "yes"
+
+    status: IncludeStatus = "yes"
+    for key, expected_value in include_if.items():
+        if "." not in key:
+            return "no"
+
+        step_id, field = key.split(".", 1)
+        if step_id == pending_step_id:
+            status = "maybe"
+            continue
+
+        if (answers.get(step_id) or {}).get(field) != expected_value:
+            return "no"
+
+    return status
+
+
+def likely_next_steps(
+    steps: list[dict[str, Any]],
+    pending_step_id: str,
+    answers: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """
+    Return the steps that StepManager.next_after may return once
+    `pending_step_id` has been answered.
+
+    Steps whose `include_if` depends on the pending answers are all candidates;
+    the scan stops at the first step that is included regardless of them.
+    """
+    idx = next((i for i, s in enumerate(steps) if s.get("id") == pending_step_id), None)
+    if idx is None:
+        return []
+
+    candidates: list[dict[str, Any]] = []
+    for step in steps[idx + 1 :]:
+        status = _include_status(step, answers, pending_step_id)
+        if status == "no":
+            continue
+        candidates.append(step)
+        if status == "yes":
+            break
+
+    return candidates
+
+
+def _resolvable_sources(
+    step_cfg: dict[str, Any],
+    context: dict[str, Any],
+    pending_step_id: str,
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Return (cache key, options_source config) pairs for the function-backed
+    sources of a step whose `$from` dependencies can already be resolved, and
+    that are not cached yet.
+    """
+    sources: list[tuple[str, dict[str, Any]]] = []
+    for field in step_cfg.get("required_inputs") or []:
+        source_cfg = field.get("options_source")
+        if not source_cfg:
+            continue
+
+        try:
+            source = OptionSource.from_dict(source_cfg)
+        except ValueError:
+            continue
+
+        if source.type != "function" or source.name in UNCACHED_PROVIDERS:
+            continue
+
+        kwargs: dict[str, Any] = {}
+        resolvable = True
+        for key, val in (source.args or {}).items():
+            if not (isinstance(val, dict) and "$from" in val):
+                kwargs[key] = val
+                continue
+
+            path = str(val["$from"])
+            # Depends on an answer the user is still giving
+            if path.startswith(f"answers.{pending_step_id}."):
+                resolvable = False
+                break
+
+            kwargs[key] = _get_by_path(context, path)
+            if kwargs[key] is None:
+                resolvable = False
+                break
+
+        if not resolvable:
+            continue
+
+        key = OptionCache.make_key(source.name, kwargs)
+        if OPTION_CACHE.contains(key):
+            continue
+
+        sources.append((key, source_cfg))
+
+    return sources
+
+
+def _prefetch_source(source_cfg: dict[str, Any], context: dict[str, Any]) -> None:
+    try:
+        # Queued behind interactive tool calls for Dropinbase slots and tokens
+        with background_priority():
+            resolve_options(source_cfg, context=context)
+    except Exception as e:
+        # The interactive call will retry and surface the error
+        logger.debug("Prefetch of %s failed: %s", source_cfg.get("name"), e)
+
+
+def prefetch_next_step_options(
+    steps: list[dict[str, Any]],
+    pending_step_id: str,
+    wizard_state: dict[str, Any],
+) -> list[str]:
+    """
+    Start resolving, in the background, the option sources of the steps likely
+    to follow `pending_step_id`. Results land in OPTION_CACHE, so the next
+    `step_*_wizard` call can return them without waiting on Dropinbase.
+
+    Returns the names of the providers that were scheduled.
+    """
+    if not PREFETCH_ENABLED:
+        return []
+
+    # Snapshot the state, the caller keeps mutating its own copy
+    context = {"wizard_state": copy.deepcopy(wizard_state)}
+    answers = context["wizard_state"].get("answers") or {}
+
+    scheduled: list[str] = []
+    seen_keys: set[str] = set()
+    for step_cfg in likely_next_steps(steps, pending_step_id, answers):
+        for key, source_cfg in _resolvable_sources(step_cfg, context, pending_step_id):
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            _PREFETCH_EXECUTOR.submit(
+                contextvars.copy_context().run, _prefetch_source, source_cfg, context
+            )
+            scheduled.append(str(source_cfg.get("name")))
+
+    if scheduled:
+        logger.debug(
+            "Prefetching options after step '%s': %s", pending_step_id, scheduled
+        )
+
+    return scheduled
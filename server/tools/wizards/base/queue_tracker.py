@@ -0,0 +1,241 @@
+import logging
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import requests
+
+from endpoints import QUEUE_GET, call_endpoint
+from json_codec import response_json
+from settings import get_settings
+from progress import NO_PROGRESS, ProgressReporter
+from response_shaping import action_messages
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+QUEUE_POLL_MIN_SECONDS: float = get_settings().queue_poll_min_seconds
+QUEUE_POLL_MAX_SECONDS: float = get_settings().queue_poll_max_seconds
+QUEUE_TIMEOUT_SECONDS: float = get_settings().queue_timeout_seconds
+
+# Dropinbase's own client stops polling a queue after 10 requests that do not
+# receive any actions, the tracker stops at that point too. Whether the queue
+# finished is unknown then, so it is reported as "idle" rather than "completed"
+QUEUE_IDLE_POLLS: int = get_settings().queue_idle_polls
+# Failed polls in a row (errors, unsuccessful responses) before giving up
+QUEUE_MAX_FAILED_POLLS: int = get_settings().queue_max_failed_polls
+
+QueueStatus = Literal["completed", "idle", "failed", "timeout"]
+
+
+@dataclass
+class QueueIds:
+    """
+    Identifiers of a Dropinbase queue, as returned by the call that started it.
+
+    Attributes:
+    - queue_uid (str | None): The queue's unique id.
+    - queue_item_id (str | None): The id of the queued item to poll.
+    - interval_seconds (float | None): Poll interval suggested by the server.
+    """
+
+    queue_uid: str | None = None
+    queue_item_id: str | None = None
+    interval_seconds: float | None = None
+
+
+@dataclass
+class QueueResult:
+    status: QueueStatus
+    polls: int
+    elapsed_seconds: float
+    ids: QueueIds
+    messages: list[str] = field(default_factory=list)
+    last_response: Any = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "polls": self.polls,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "queue_uid": self.ids.queue_uid,
+            "queue_item_id": self.ids.queue_item_id,
+            "messages": self.messages,
+            "last_response": self.last_response,
+        }
+
+
+def _find_key(data: Any, key: str) -> Any:
+    """Depth-first search for the first non-empty value of `key`."""
+    if isinstance(data, dict):
+        value = data.get(key)
+        if value not in (None, ""):
+            return value
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+
+    for child in children:
+        value = _find_key(child, key)
+        if value is not None:
+            return value
+    return None
+
+
+def extract_queue_ids(data: Any, fallback_queue_uid: str | None = None) -> QueueIds:
+    """
+    Read the queue identifiers from a Dropinbase response, e.g. executeTasks.
+
+    The standard response envelope carries `queueUid` and `asyncInterval`
+    (milliseconds); the item id may be nested inside the returned actions.
+    """
+    queue_uid = _find_key(data, "queueUid")
+    queue_item_id = _find_key(data, "queueItemId")
+    interval_ms = _find_key(data, "asyncInterval")
+
+    try:
+        interval_seconds = float(interval_ms) / 1000 if interval_ms else None
+    except (TypeError, ValueError):
+        interval_seconds = None
+
+    return QueueIds(
+        queue_uid=str(queue_uid) if queue_uid is not None else fallback_queue_uid,
+        queue_item_id=str(queue_item_id) if queue_item_id is not None else None,
+        interval_seconds=interval_seconds,
+    )
+
+
+def _messages_from_response(data: dict[str, Any]) -> list[str]:
+    messages: list[str] = []
+    if data.get("message"):
+        messages.append(str(data["message"]))
+    messages.extend(action_messages(data.get("actions")))
+    return messages
+
+
+def _is_stop_response(data: dict[str, Any]) -> bool:
+    """Whether the server signals that the queue has stopped."""
+    for action in data.get("actions") or []:
+        if not isinstance(action, dict):
+            continue
+        params = action.get("params") if isinstance(action.get("params"), dict) else {}
+        markers = " ".join(
+            str(v).lower()
+            for v in (
+                action.get("submitUrl"),
+                params.get("action"),
+                params.get("value"),
+            )
+            if v
+        )
+        if ("stop" in markers and "queue" in markers) or params.get("action") == "stop":
+            return True
+    return False
+
+
+class QueueTracker:
+    """
+    Polls `/peff/Queue/get/{container_name}` until a Dropinbase queue finishes.
+
+    The poll interval starts at the server's suggested `asyncInterval` (or
+    QUEUE_POLL_MIN_SECONDS), backs off by 1.5x while nothing happens and drops
+    back to the minimum whenever the queue reports activity. Messages received
+    along the way are forwarded as progress notifications.
+
+    The result is "completed" only when the server signals that the queue
+    stopped, "idle" after `idle_polls` polls without activity and "failed"
+    after `max_failed_polls` failed polls in a row; a single failed poll is
+    retried with backoff.
+    """
+
+    def __init__(
+        self,
+        container_name: str,
+        *,
+        min_interval: float = QUEUE_POLL_MIN_SECONDS,
+        max_interval: float = QUEUE_POLL_MAX_SECONDS,
+        timeout: float = QUEUE_TIMEOUT_SECONDS,
+        idle_polls: int = QUEUE_IDLE_POLLS,
+        max_failed_polls: int = QUEUE_MAX_FAILED_POLLS,
+    ) -> None:
+        self.container_name = container_name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.idle_polls = idle_polls
+        self.max_failed_polls = max_failed_polls
+
+    def _poll(self, ids: QueueIds) -> Any:
+        # Empty ids are left out of the query, like unknown ones
+        try:
+            response = call_endpoint(
+                QUEUE_GET,
+                container_name=self.container_name,
+                queueItemId=ids.queue_item_id or None,
+                queueUid=ids.queue_uid or None,
+            )
+        except (requests.RequestException, TimeoutError) as e:
+            return {"success": False, "message": f"Queue poll failed: {e}"}
+
+        try:
+            return response_json(response)
+        except ValueError:
+            return {
+                "success": False,
+                "status_code": response.status_code,
+                "message": response.text,
+            }
+
+    def track(
+        self, ids: QueueIds, progress: ProgressReporter = NO_PROGRESS
+    ) -> QueueResult:
+        started = time.monotonic()
+        interval = max(self.min_interval, ids.interval_seconds or 0)
+        polls = 0
+        idle = 0
+        failed = 0
+        messages: list[str] = []
+        data: Any = None
+
+        while True:
+            elapsed = time.monotonic() - started
+            if elapsed >= self.timeout:
+                return QueueResult("timeout", polls, elapsed, ids, messages, data)
+
+            time.sleep(min(interval, self.timeout - elapsed))
+            data = self._poll(ids)
+            polls += 1
+
+            if not isinstance(data, dict) or not data.get("success", False):
+                failed += 1
+                if failed >= self.max_failed_polls:
+                    elapsed = time.monotonic() - started
+                    return QueueResult("failed", polls, elapsed, ids, messages, data)
+                logger.debug(
+                    "Queue poll %d failed (%d in a row): %s", polls, failed, data
+                )
+                interval = min(self.max_interval, interval * 1.5)
+                continue
+            failed = 0
+
+            new_messages = _messages_from_response(data)
+            for message in new_messages:
+                progress.report(polls, None, message)
+            messages.extend(new_messages)
+
+            if _is_stop_response(data):
+                elapsed = time.monotonic() - started
+                return QueueResult("completed", polls, elapsed, ids, messages, data)
+
+            if data.get("actions") or new_messages:
+                idle = 0
+                interval = self.min_interval
+            else:
+                idle += 1
+                if idle >= self.idle_polls:
+                    elapsed = time.monotonic() - started
+                    return QueueResult("idle", polls, elapsed, ids, messages, data)
+                interval = min(self.max_interval, interval * 1.5)
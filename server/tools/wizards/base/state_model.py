@@ -5,6 +5,8 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from tracing import span
+
 
 class StateFile(Enum):
     APPLICATION_WIZARD = Path(
@@ -23,10 +25,11 @@ class WizardState:
 
     @classmethod
     def load(cls, state_file: StateFile) -> "WizardState":
-        if not state_file.value.exists():
-            return cls()
-        with state_file.value.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        with span("wizard.state.load", state_file=state_file.name):
+            if not state_file.value.exists():
+                return cls()
+            with state_file.value.open("r", encoding="utf-8") as f:
+                data = json.load(f)
         return cls(
             current_step_id=data.get("current_step_id"),
             completed_step_ids=data.get("completed_step_ids", []),
@@ -36,19 +39,20 @@ class WizardState:
         )
 
     def save(self, state_file: StateFile) -> None:
-        state_file.value.parent.mkdir(parents=True, exist_ok=True)
-        with state_file.value.open("w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "current_step_id": self.current_step_id,
-                    "completed_step_ids": self.completed_step_ids,
-                    "answers": self.answers,
-                    "meta": self.meta,
-                    "completed": self.completed,
-                },
-                f,
-                indent=2,
-            )
+        with span("wizard.state.save", state_file=state_file.name):
+            state_file.value.parent.mkdir(parents=True, exist_ok=True)
+            with state_file.value.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "current_step_id": self.current_step_id,
+                        "completed_step_ids": self.completed_step_ids,
+                        "answers": self.answers,
+                        "meta": self.meta,
+                        "completed": self.completed,
+                    },
+                    f,
+                    indent=2,
+                )
 
     @classmethod
     def reset(
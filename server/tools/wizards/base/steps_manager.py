@@ -5,7 +5,9 @@ from typing import Any
 
 from tools.wizards.base.option_provider_base import (
     enrich_step_with_options,
+    enrich_steps_with_options,
 )
+from tools.wizards.base.prefetch import prefetch_next_step_options
 
 
 class StepManager:
@@ -78,3 +80,31 @@ class StepManager:
         return enrich_step_with_options(
             step_cfg, context={"wizard_state": wizard_state}
         )
+
+    def included_path(
+        self, answers: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Return the steps a user would be taken through given all `answers` up
+        front, following next_after from the first step.
+        """
+        path: list[dict[str, Any]] = []
+        step = self.first()
+        while step is not None:
+            path.append(step)
+            step = self.next_after(step["id"], previous_answers=answers)
+        return path
+
+    def enrich_many(
+        self, step_cfgs: list[dict[str, Any]], wizard_state: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        return enrich_steps_with_options(
+            step_cfgs, context={"wizard_state": wizard_state}
+        )
+
+    def prefetch_after(self, step_id: str, wizard_state: dict[str, Any]) -> list[str]:
+        """
+        Start resolving the options of the step(s) likely to follow `step_id`
+        in the background, while the user is still answering `step_id`.
+        """
+        return prefetch_next_step_options(self._steps, step_id, wizard_state)
@@ -2,11 +2,12 @@ import logging
 
 from typing import Any, Callable, Mapping
 
-from env_variables import get_env
+from settings import get_settings
+from tracing import span
 
 
 logger = logging.getLogger(__name__)
-logger.setLevel(get_env("LOG_LEVEL", "INFO"))
+logger.setLevel(get_settings().log_level)
 
 
 ValidationError = dict[str, str]
@@ -37,6 +38,17 @@ def _validate_boolean(
 
 def _validate_enum(field: FieldCfg, value: Any, errors: list[ValidationError]) -> None:
     name = field["name"]
+
+    # Options could not be resolved, so the value cannot be checked
+    options_error = field.get("options_error")
+    if options_error:
+        _add_error(
+            errors,
+            name,
+            f"Options for '{name}' could not be loaded ({options_error.get('message')}). Retry the step.",
+        )
+        return
+
     options = field.get("options") or []
     allowed_values = [opt.get("value") for opt in options if isinstance(opt, dict)]
     if allowed_values and value not in allowed_values:
@@ -72,28 +84,48 @@ def validate_step_answers(
     if type_validators:
         merged_type_validators.update(type_validators)
 
-    required_inputs = step_cfg.get("required_inputs") or []
-    for field in required_inputs:
-        name = field.get("name")
-        ftype = field.get("type")
-        value = answers.get(name)
-
-        if not name:
-            # Ignore for now
-            continue
-
-        # Required presence check
-        if value is None or value == "":
-            _add_error(errors, name, f"'{name}' is required for this step.")
-            continue
-
-        # Type-specific validation (optional if type missing)
-        validator = merged_type_validators.get(ftype)
-        if validator:
-            validator(field, value, errors)
-        else:
-            logger.warning(
-                f"No validator found for field '{name}' with type '{ftype}'."
-            )
+    with span("wizard.validate", step_id=step_cfg.get("id")):
+        required_inputs = step_cfg.get("required_inputs") or []
+        for field in required_inputs:
+            name = field.get("name")
+            ftype = field.get("type")
+            value = answers.get(name)
+
+            if not name:
+                # Ignore for now
+                continue
+
+            # Required presence check
+            if value is None or value == "":
+                _add_error(errors, name, f"'{name}' is required for this step.")
+                continue
+
+            # Type-specific validation (optional if type missing)
+            validator = merged_type_validators.get(ftype)
+            if validator:
+                validator(field, value, errors)
+            else:
+                logger.warning(
+                    f"No validator found for field '{name}' with type '{ftype}'."
+                )
 
     return errors
+
+
+def validate_steps_answers(
+    step_cfgs: list[dict[str, Any]],
+    answers_by_step: dict[str, dict[str, Any]],
+    validate_step: Callable[[dict[str, Any], dict[str, Any]], list[ValidationError]],
+) -> dict[str, list[ValidationError]]:
+    """
+    Validate the answers of several (enriched) steps in one pass.
+
+    Returns the errors per step id, steps without errors are omitted.
+    """
+    errors_by_step: dict[str, list[ValidationError]] = {}
+    for step_cfg in step_cfgs:
+        step_id = step_cfg.get("id")
+        errors = validate_step(step_cfg, answers_by_step.get(step_id) or {})
+        if errors:
+            errors_by_step[step_id] = errors
+    return errors_by_step
@@ -0,0 +1,92 @@
+import logging
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Iterable, Literal
+
+from concurrency import TaskOutcome, run_bounded
+from settings import get_settings
+from tools.designer.field_schema import record_from_node_info
+from tools.designer.tools_designer import fetch_node_info
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+NODE_RESOLUTION_MAX_WORKERS: int = get_settings().node_resolution_max_workers
+
+NodeType = Literal["item", "container"]
+
+
+class NodeResolutionContext:
+    """
+    Resolves designer nodes (items/containers) for a single wizard run.
+
+    Every node is fetched at most once per context, also when requested from
+    several threads at the same time, so existence checks and item->container
+    lookups made while building payloads share one request. Failed lookups
+    are not memoised and are retried on the next call.
+    """
+
+    def __init__(self) -> None:
+        self._records: dict[tuple[NodeType, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def record(self, node_id: str, node_type: NodeType) -> dict[str, Any] | None:
+        """Return the node's pef_{node_type} record, or None if it does not exist."""
+        key = (node_type, str(node_id))
+
+        with self._lock:
+            future = self._records.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._records[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            node_info = fetch_node_info(str(node_id), node_type)
+            record = record_from_node_info(node_info, node_type)
+        except BaseException as e:
+            with self._lock:
+                self._records.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        future.set_result(record)
+        return record
+
+    def exists(self, node_id: str, node_type: NodeType) -> bool:
+        """
+        Whether the node exists. Errors of the lookup itself (transport errors,
+        open breakers, limiter timeouts) are raised, not reported as missing.
+        """
+        return self.record(node_id, node_type) is not None
+
+    def container_id_for_item(self, item_id: str) -> str:
+        """Return the id of the container that holds the item, or "" if unknown."""
+        record = self.record(item_id, "item")
+        if not record:
+            return ""
+        container_id = record.get("pef_container_id")
+        return "" if container_id is None else str(container_id)
+
+    def resolve_many(
+        self, node_ids: Iterable[str], node_type: NodeType
+    ) -> dict[str, TaskOutcome[dict[str, Any] | None]]:
+        """
+        Fetch several nodes concurrently (bounded by NODE_RESOLUTION_MAX_WORKERS).
+
+        Returns one outcome per distinct node id, whose value is the record or
+        None if the node does not exist. Already resolved nodes are not fetched
+        again.
+        """
+        unique_ids = list(dict.fromkeys(str(node_id) for node_id in node_ids))
+        outcomes = run_bounded(
+            lambda node_id: self.record(node_id, node_type),
+            unique_ids,
+            max_workers=NODE_RESOLUTION_MAX_WORKERS,
+            thread_name_prefix="dib-nodes",
+        )
+        return dict(zip(unique_ids, outcomes))
@@ -1,27 +1,37 @@
 from tools.wizards.base.state_model import WizardState, StateFile
-from tools.designer.tools_designer import get_node_info_from_id_and_type
+from tools.wizards.event_wizard.state.node_resolution_event_wiz import (
+    NodeResolutionContext,
+)
 
 
-def _get_container_id_for_item(item_id: str) -> str:
+def _get_container_id_for_item(
+    state: WizardState, nodes: NodeResolutionContext | None = None
+) -> str:
+    """
+    Container id of the event's item, as resolved when the wizard started.
 
-    node_info = get_node_info_from_id_and_type(item_id, "item")
-    if not node_info:
-        return ""
+    Falls back to resolving the item for states saved before the container id
+    was stored in the meta.
+    """
+    container_id = state.meta.get("container_id")
+    if container_id not in (None, ""):
+        return str(container_id)
 
-    # Container ID path: data -> records -> data -> pef_item -> pef_container_id
-    container_id = (
-        node_info.get("data", {})
-        .get("records", {})
-        .get("data", {})
-        .get("pef_item", {})
-        .get("pef_container_id", "")
-    )
+    nodes = nodes or NodeResolutionContext()
+    return nodes.container_id_for_item(str(state.meta.get("node_id", "")))
 
-    return str(container_id)
 
+def load_php_wizard_payload(
+    state: WizardState | None = None, nodes: NodeResolutionContext | None = None
+) -> dict:
+    """
+    Build the createEvent payload for a PHP event from the wizard answers.
 
-def load_php_wizard_payload() -> dict:
-    state = WizardState.load(StateFile.EVENT_WIZARD)
+    Uses the persisted wizard state unless an in-memory `state` is given, and
+    the run's `nodes` context (if any) to look up the item's container.
+    """
+    if state is None:
+        state = WizardState.load(StateFile.EVENT_WIZARD)
 
     answers = state.answers
 
@@ -38,7 +48,7 @@ def load_php_wizard_payload() -> dict:
         dropin_choice = ""
         new_dropin_name = ""
 
-    class_type = answers.get("select_class_or_new_class").get("class_choice")
+    class_type = answers.get("select_class_or_new_class", {}).get("class_choice")
     if class_type == "existing":
         class_choice = answers.get("choose_existing_class").get("existing_class")
         new_class_name = ""
@@ -80,7 +90,7 @@ def load_php_wizard_payload() -> dict:
 
     alias_dibDesigner = (
         {
-            "containerId": _get_container_id_for_item(node_id),
+            "containerId": _get_container_id_for_item(state, nodes),
         }
         if event_type == "item"
         else {}
@@ -113,9 +123,17 @@ def load_php_wizard_payload() -> dict:
     return payload
 
 
-def load_js_wizard_payload() -> dict:
+def load_js_wizard_payload(
+    state: WizardState | None = None, nodes: NodeResolutionContext | None = None
+) -> dict:
+    """
+    Build the createEvent payload for a JavaScript event from the wizard answers.
 
-    state = WizardState.load(StateFile.EVENT_WIZARD)
+    Uses the persisted wizard state unless an in-memory `state` is given, and
+    the run's `nodes` context (if any) to look up the item's container.
+    """
+    if state is None:
+        state = WizardState.load(StateFile.EVENT_WIZARD)
 
     answers = state.answers
 
@@ -132,7 +150,7 @@ def load_js_wizard_payload() -> dict:
         dropin_choice = ""
         new_dropin_name = ""
 
-    action_type = answers.get("select_action_or_new_action").get("action_choice")
+    action_type = answers.get("select_action_or_new_action", {}).get("action_choice")
     if action_type == "existing":
         action_choice = answers.get("choose_existing_action").get("existing_action")
         new_action_name = ""
@@ -162,7 +180,7 @@ def load_js_wizard_payload() -> dict:
 
     alias_dibDesigner = (
         {
-            "containerId": _get_container_id_for_item(node_id),
+            "containerId": _get_container_id_for_item(state, nodes),
         }
         if event_type == "item"
         else {}
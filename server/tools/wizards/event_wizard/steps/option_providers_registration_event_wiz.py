@@ -4,8 +4,15 @@ from tools.wizards.base.option_provider_base import (
     register_option_provider,
     extract_options_from_response,
 )
-from env_variables import get_env
-from session_auth import dib_session_client
+from endpoints import (
+    EVENT_ACTIONS_JS,
+    EVENT_CLASSES_PHP,
+    EVENT_DROPINS_JS,
+    EVENT_DROPINS_PHP,
+    EVENT_TRIGGERS_JS,
+    EVENT_TRIGGERS_PHP,
+    call_endpoint,
+)
 
 
 @register_option_provider("get_avail_event_triggers_php")
@@ -15,17 +22,6 @@ def get_avail_event_triggers_php(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventPhp&containerItemId=3517&itemAlias=containerTrigger&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
     payload = {
         "clientData": {
             "alias_self": {
@@ -44,7 +40,7 @@ def get_avail_event_triggers_php(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(EVENT_TRIGGERS_PHP, payload=payload)
 
     options = extract_options_from_response(response=response, topic="event triggers")
 
@@ -58,17 +54,6 @@ def get_avail_event_triggers_js(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventJs&containerItemId=8334&itemAlias=containerTrigger&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
     payload = {
         "clientData": {
             "alias_self": {
@@ -84,7 +69,7 @@ def get_avail_event_triggers_js(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(EVENT_TRIGGERS_JS, payload=payload)
 
     options = extract_options_from_response(response=response, topic="event triggers")
 
@@ -98,18 +83,7 @@ def get_existing_dropins_php(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventPhp&containerItemId=56&itemAlias=dropin&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
+    response = call_endpoint(EVENT_DROPINS_PHP)
 
     options = extract_options_from_response(response=response, topic="existing dropins")
 
@@ -123,18 +97,7 @@ def get_existing_dropins_js(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventJs&containerItemId=3497&itemAlias=dropin&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    response = dib_session_client.request("POST", url, headers=headers)
+    response = call_endpoint(EVENT_DROPINS_JS)
 
     options = extract_options_from_response(response=response, topic="existing dropins")
 
@@ -197,17 +160,6 @@ def get_existing_classes_php(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventPhp&containerItemId=60&itemAlias=class&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
     payload = {
         "clientData": {
             "alias_self": {
@@ -226,7 +178,7 @@ def get_existing_classes_php(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(EVENT_CLASSES_PHP, payload=payload)
 
     options = extract_options_from_response(response=response, topic="existing classes")
 
@@ -243,17 +195,6 @@ def get_existing_actions_js(
     context: dict[str, Any] | None = None,
 ) -> list:
 
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/peff/Crud/componentlist"
-        "?containerName=dibDesignerAddEventJs&containerItemId=3500&itemAlias=class&page=1&limit=40&activeFilter=null"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
     payload = {
         "clientData": {
             "alias_self": {
@@ -269,7 +210,7 @@ def get_existing_actions_js(
         }
     }
 
-    response = dib_session_client.request("POST", url, headers=headers, json=payload)
+    response = call_endpoint(EVENT_ACTIONS_JS, payload=payload)
 
     options = extract_options_from_response(response=response, topic="existing actions")
 
@@ -1,6 +1,9 @@
+import logging
+
 from pathlib import Path
 from typing import Any, Literal
 
+from mcp.server.fastmcp import Context
 from mcp.types import ToolAnnotations
 
 from mcp_instance import mcp
@@ -8,16 +11,39 @@ from tools.wizards.base.steps_manager import StepManager
 from tools.wizards.event_wizard.steps.answer_validation_event_wiz import (
     validate_step_answers,
 )
+from tools.wizards.base.validation_base import validate_steps_answers
+from tools.wizards.base.dry_run import CONFIRM_STEP_ID, StageTimer, payload_size_bytes
 from tools.wizards.base.state_model import WizardState, StateFile
+from tools.wizards.base.option_cache import OPTION_CACHE
 from tools.wizards.event_wizard.state.payload_mapping_event_wiz import (
     load_php_wizard_payload,
     load_js_wizard_payload,
 )
 
-from tools.designer.tools_designer import get_node_info_from_id_and_type
+from tools.wizards.event_wizard.state.node_resolution_event_wiz import (
+    NodeResolutionContext,
+)
+
+from endpoints import EVENT_CREATE_JS, EVENT_CREATE_PHP, call_endpoint
+from json_codec import response_json
+from concurrency import TaskOutcome, outcome_error_message, run_bounded
+from settings import get_settings
+from progress import NO_PROGRESS, ProgressReporter, run_sync_with_progress
 
-from env_variables import get_env
-from session_auth import dib_session_client
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+# createEvent calls submitted at the same time by the bulk tool
+EVENT_BULK_MAX_WORKERS: int = get_settings().event_bulk_max_workers
+
+# Steps whose "new" choice creates a drop-in folder, class or action along
+# with the event. Not allowed in bulk runs, where every concurrent call would
+# try to create the same one.
+NEW_CHOICE_ANSWERS: dict[str, str] = {
+    "select_dropin_or_new_dropin": "dropin_choice",
+    "select_class_or_new_class": "class_choice",
+    "select_action_or_new_action": "action_choice",
+}
 
 
 def _get_steps_file(
@@ -52,26 +78,64 @@ def _get_steps_file(
 
 
 def _check_node_existance(
-    node_id: str, event_type: Literal["item", "container"]
+    node_id: str,
+    event_type: Literal["item", "container"],
+    nodes: NodeResolutionContext | None = None,
 ) -> bool:
     """
     Check if a node with the given ID exists in Dropinbase.
+    Raises when Dropinbase could not be asked.
     """
+    nodes = nodes or NodeResolutionContext()
+    return nodes.exists(node_id, event_type)
 
-    node_info = get_node_info_from_id_and_type(node_id, node_type=event_type)
 
-    # Extract relevant information
+def _node_error(
+    node_id: str,
+    event_type: Literal["item", "container"],
+    nodes: NodeResolutionContext,
+) -> dict[str, Any] | None:
+    """
+    Return the error response when the node does not exist or could not be
+    looked up, None when it exists.
+    """
     try:
-        pef_item = (
-            node_info.get("data").get("records").get("data").get(f"pef_{event_type}")
-        )
-
-        if pef_item is None or pef_item == {} or pef_item == []:
-            return False
+        if _check_node_existance(node_id, event_type, nodes):
+            return None
     except Exception as e:
-        return False
+        logger.warning(f"Could not look up {event_type} '{node_id}': {e}")
+        return {
+            "status": "error",
+            "message": f"Could not look up node with ID '{node_id}' in Dropinbase: {e}. Try again later.",
+        }
+
+    return {
+        "status": "error",
+        "message": f"Node with ID '{node_id}' does not exist. Use tool 'get_node_info' to verify or get_project_tree to list available nodes.",
+    }
 
-    return True
+
+def _wizard_meta(
+    event_type: Literal["item", "container"],
+    event_side: Literal["php", "javascript"],
+    node_id: str,
+    nodes: NodeResolutionContext,
+) -> dict[str, Any]:
+    """
+    Build the wizard meta for an existing node.
+
+    For item events the container id is resolved once here (from the already
+    fetched node) and kept in the meta, so building the payload later in the
+    run does not fetch the item again.
+    """
+    meta: dict[str, Any] = {
+        "event_type": event_type,
+        "event_side": event_side,
+        "node_id": node_id,
+    }
+    if event_type == "item":
+        meta["container_id"] = nodes.container_id_for_item(node_id)
+    return meta
 
 
 @mcp.tool(
@@ -100,18 +164,17 @@ def start_event_wizard(
     including dynamic options.
     """
     # Validate node existence
-    if not _check_node_existance(node_id, event_type):
-        return {
-            "status": "error",
-            "message": f"Node with ID '{node_id}' does not exist. Use tool 'get_node_info' to verify or get_project_tree to list available nodes.",
-        }
+    nodes = NodeResolutionContext()
+    node_error = _node_error(node_id, event_type, nodes)
+    if node_error:
+        return node_error
 
     # TODO: Further validation if node type (item/container) corresponds to node_id if possible?
 
     steps_file = _get_steps_file(event_type, event_side)
     steps = StepManager.load(steps_file)
     state = WizardState.reset(
-        meta={"event_type": event_type, "event_side": event_side, "node_id": node_id},
+        meta=_wizard_meta(event_type, event_side, node_id, nodes),
         state_file=StateFile.EVENT_WIZARD,
     )
 
@@ -126,6 +189,7 @@ def start_event_wizard(
     state.save(StateFile.EVENT_WIZARD)
 
     enriched_step = steps.enrich(first_step, wizard_state=state.__dict__)
+    steps.prefetch_after(first_step["id"], wizard_state=state.__dict__)
 
     return {
         "status": "ok",
@@ -141,29 +205,11 @@ def _execute_event_creation(
     Call Dropinbase APIs to create the event based on the wizard payload.
     """
 
-    query_string: str = (
-        "type=js&containerName=dibDesignerAddEventJs"
-        if event_side == "javascript"
-        else "containerName=dibDesignerAddEventPhp"
-    )
-
-    url = (
-        f"{get_env('BASE_URL', 'https://localhost')}"
-        "/dropins/dibAdmin/DDesignerAddOn/createEvent"
-        f"?{query_string}"
-    )
-
-    headers: dict[str, str] = {
-        "Content-Type": "application/json",
-        "RequestVerificationToken": get_env("REQUEST_VERIFICATION_TOKEN"),
-    }
-
-    response = dib_session_client.request(
-        "POST", url, headers=headers, json=wizard_payload
-    )
+    endpoint = EVENT_CREATE_JS if event_side == "javascript" else EVENT_CREATE_PHP
+    response = call_endpoint(endpoint, payload=wizard_payload)
 
     try:
-        data = response.json()
+        data = response_json(response)
 
         # Check for success
         if not data.get("success"):
@@ -180,6 +226,51 @@ def _execute_event_creation(
         raise RuntimeError("Event creation failed") from e
 
 
+def _create_event(state: WizardState, *, persist: bool = True) -> dict[str, Any]:
+    """
+    Call the Dropinbase APIs to create the event from the given wizard state,
+    and mark the wizard as complete. With `persist` false the state is only
+    updated in memory, the saved wizard state is left alone.
+    """
+    try:
+        event_side = state.meta.get("event_side")
+        if event_side == "php":
+            wizard_payload = load_php_wizard_payload(state)
+        elif event_side == "javascript":
+            wizard_payload = load_js_wizard_payload(state)
+        else:
+            raise RuntimeError(f"Unsupported event side: {event_side}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to load wizard payload: {e}")
+    try:
+        creation_results = _execute_event_creation(wizard_payload, event_side)
+    except Exception as e:
+        raise RuntimeError(f"Failed to execute create action: {e}")
+
+    if not creation_results.get("success"):
+        return {
+            "status": "error",
+            "message": f"Event creation failed: {creation_results.get('message')}",
+        }
+
+    # Wizard is complete
+    state.current_step_id = None
+    state.completed = True
+    if persist:
+        state.save(StateFile.EVENT_WIZARD)
+
+    # Newly created records can make cached option lists stale
+    OPTION_CACHE.clear()
+
+    return {
+        "summary": {
+            "meta": state.meta,
+            "answers": state.answers,
+            "message": creation_results.get("message"),
+        },
+    }
+
+
 @mcp.tool(
     name="step_event_wizard",
     title="Step Event Creation Wizard",
@@ -257,46 +348,14 @@ def step_event_wizard(
     next_step_cfg = steps.next_after(step_id, previous_answers=state.answers)
 
     if not next_step_cfg:
-        # Call Dropinbase APIs to create the event
-        try:
-            event_side = state.meta.get("event_side")
-            if event_side == "php":
-                wizard_payload = load_php_wizard_payload()
-            elif event_side == "javascript":
-                wizard_payload = load_js_wizard_payload()
-            else:
-                raise RuntimeError(f"Unsupported event side: {event_side}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to load wizard payload: {e}")
-        try:
-            creation_results = _execute_event_creation(wizard_payload, event_side)
-        except Exception as e:
-            raise RuntimeError(f"Failed to execute create action: {e}")
-
-        if not creation_results.get("success"):
-            return {
-                "status": "error",
-                "message": f"Event creation failed: {creation_results.get('message')}",
-            }
-
-        # Wizard is complete
-        state.current_step_id = None
-        state.completed = True
-        state.save(StateFile.EVENT_WIZARD)
-
-        return {
-            "summary": {
-                "success" "meta": state.meta,
-                "answers": state.answers,
-                "message": creation_results.get("message"),
-            },
-        }
+        return _create_event(state)
 
     # Move on to the next step
     state.current_step_id = next_step_cfg["id"]
     state.save(StateFile.EVENT_WIZARD)
 
     next_step_enriched = steps.enrich(next_step_cfg, wizard_state=state.__dict__)
+    steps.prefetch_after(next_step_cfg["id"], wizard_state=state.__dict__)
 
     return {
         "status": "ok",
@@ -305,6 +364,292 @@ def step_event_wizard(
     }
 
 
+@mcp.tool(
+    name="run_event_wizard",
+    title="Run Event Creation Wizard in One Call",
+    description=(
+        "Create a new item or container event in Dropinbase in a single call when all wizard answers are already known. "
+        "`answers` maps each step id to that step's answers, exactly as they would be passed to "
+        '`step_event_wizard`, e.g. {"select_dropin_or_new_dropin": {"dropin_choice": "existing"}, ...}. '
+        "Only the steps included by the given answers are required. All steps are validated at once; on validation "
+        "errors nothing is created and the errors are returned per step together with the step definitions and their options. "
+        "Prefer the step-by-step wizard when answers still need to be discussed with the user. "
+        "Set `dry_run` to true to only validate and return the exact createEvent payload that would be sent, "
+        "with size and timing stats, without writing anything to Dropinbase (confirmation is then not required)."
+    ),
+    annotations=ToolAnnotations(
+        readOnlyHint=False,
+        destructiveHint=False,
+        idempotentHint=False,
+        openWorldHint=False,
+    ),
+)
+def run_event_wizard(
+    event_type: Literal["item", "container"],
+    event_side: Literal["php", "javascript"],
+    node_id: str,
+    answers: dict[str, dict[str, Any]],
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """
+    Walk, validate and complete the whole event wizard in one go.
+    """
+    timer = StageTimer()
+
+    nodes = NodeResolutionContext()
+    node_error = _node_error(node_id, event_type, nodes)
+    if node_error:
+        return node_error
+
+    steps = StepManager.load(_get_steps_file(event_type, event_side))
+
+    path = steps.included_path(answers)
+    if dry_run:
+        path = [step for step in path if step["id"] != CONFIRM_STEP_ID]
+    if not path:
+        return {
+            "status": "error",
+            "message": "No wizard steps configured.",
+        }
+
+    state = WizardState(meta=_wizard_meta(event_type, event_side, node_id, nodes))
+    state.answers = {step["id"]: dict(answers.get(step["id"]) or {}) for step in path}
+
+    # Options of all steps are resolved as one concurrent batch
+    with timer.stage("options"):
+        enriched_steps = steps.enrich_many(path, wizard_state=state.__dict__)
+    with timer.stage("validation"):
+        errors = validate_steps_answers(
+            enriched_steps, state.answers, validate_step_answers
+        )
+
+    if errors:
+        return {
+            "status": "validation_error",
+            "errors": errors,
+            "steps": [step for step in enriched_steps if step["id"] in errors],
+        }
+
+    if dry_run:
+        with timer.stage("payloads"):
+            wizard_payload = (
+                load_php_wizard_payload(state, nodes)
+                if event_side == "php"
+                else load_js_wizard_payload(state, nodes)
+            )
+
+        return {
+            "status": "dry_run",
+            "payloads": {"create_event": wizard_payload},
+            "requests": [
+                {"endpoint": "/dropins/dibAdmin/DDesignerAddOn/createEvent", "count": 1}
+            ],
+            "stats": {
+                "create_event_bytes": payload_size_bytes(wizard_payload),
+                "timings": timer.as_dict(),
+            },
+        }
+
+    if not state.answers.get("confirm_creation", {}).get("confirm_creation", False):
+        return {
+            "status": "error",
+            "message": "Wizard cannot be completed without confirmation.",
+        }
+
+    # Kept in memory only, a step-by-step wizard in progress stays untouched
+    state.completed_step_ids = [step["id"] for step in path]
+    return _create_event(state, persist=False)
+
+
+@mcp.tool(
+    name="run_event_wizard_bulk",
+    title="Create the Same Event on Many Nodes",
+    description=(
+        "Add the same event to many items or containers in a single call, e.g. the same JS click event "
+        "to 30 grid items. `answers` is one template answer set in the same shape as for `run_event_wizard` "
+        "(including the confirmation) and is applied to every node in `node_ids`. Only existing drop-in folders, "
+        "classes and actions can be used: create a new one first with `run_event_wizard` on a single node, then "
+        "choose it as existing here. All nodes are looked up in one pass and the answers are validated once, "
+        "against the options of the first existing node only; a value that is not available for another node "
+        "makes that node fail. On validation errors nothing is created. The events are then created concurrently "
+        "and a result is returned per node (created, failed, not_found or lookup_failed), so failed nodes can be "
+        "retried on their own."
+    ),
+    annotations=ToolAnnotations(
+        readOnlyHint=False,
+        destructiveHint=False,
+        idempotentHint=False,
+        openWorldHint=False,
+    ),
+)
+async def run_event_wizard_bulk(
+    event_type: Literal["item", "container"],
+    event_side: Literal["php", "javascript"],
+    node_ids: list[str],
+    answers: dict[str, dict[str, Any]],
+    ctx: Context | None = None,
+) -> dict[str, Any]:
+    """
+    Create one event per node from a single, validated answer set.
+    """
+    return await run_sync_with_progress(
+        ctx, _run_event_wizard_bulk, event_type, event_side, node_ids, answers
+    )
+
+
+def _run_event_wizard_bulk(
+    event_type: Literal["item", "container"],
+    event_side: Literal["php", "javascript"],
+    node_ids: list[str],
+    answers: dict[str, dict[str, Any]],
+    *,
+    progress: ProgressReporter = NO_PROGRESS,
+) -> dict[str, Any]:
+    node_ids = list(dict.fromkeys(str(node_id) for node_id in node_ids))
+    if not node_ids:
+        return {
+            "status": "error",
+            "message": "No node ids given.",
+        }
+
+    # Look up all nodes in one concurrent pass, missing nodes are skipped
+    nodes = NodeResolutionContext()
+    results: dict[str, dict[str, Any]] = {}
+    existing_ids: list[str] = []
+    for node_id, outcome in nodes.resolve_many(node_ids, event_type).items():
+        if not outcome.ok:
+            results[node_id] = {
+                "node_id": node_id,
+                "status": "lookup_failed",
+                "message": outcome_error_message(outcome),
+            }
+        elif outcome.value is None:
+            results[node_id] = {
+                "node_id": node_id,
+                "status": "not_found",
+                "message": f"Node with ID '{node_id}' does not exist.",
+            }
+        else:
+            existing_ids.append(node_id)
+
+    if not existing_ids:
+        return {
+            "status": "error",
+            "message": "None of the given nodes exist.",
+            "results": [results[node_id] for node_id in node_ids],
+        }
+
+    steps = StepManager.load(_get_steps_file(event_type, event_side))
+    path = steps.included_path(answers)
+    if not path:
+        return {
+            "status": "error",
+            "message": "No wizard steps configured.",
+        }
+
+    template_answers = {
+        step["id"]: dict(answers.get(step["id"]) or {}) for step in path
+    }
+
+    new_choices = [
+        step_id
+        for step_id, field in NEW_CHOICE_ANSWERS.items()
+        if template_answers.get(step_id, {}).get(field) == "new"
+    ]
+    if new_choices:
+        return {
+            "status": "error",
+            "message": (
+                f"Bulk runs can only use existing drop-in folders, classes and actions, "
+                f"but 'new' was chosen in: {', '.join(new_choices)}. Create it once with "
+                f"'run_event_wizard' on a single node, then choose it as existing."
+            ),
+        }
+
+    # Options and answers are checked once, the first existing node stands in
+    # for all of them (options that differ per node are not checked per node)
+    reference = WizardState(
+        meta=_wizard_meta(event_type, event_side, existing_ids[0], nodes),
+        answers=template_answers,
+    )
+    enriched_steps = steps.enrich_many(path, wizard_state=reference.__dict__)
+    errors = validate_steps_answers(
+        enriched_steps, template_answers, validate_step_answers
+    )
+    if errors:
+        return {
+            "status": "validation_error",
+            "errors": errors,
+            "steps": [step for step in enriched_steps if step["id"] in errors],
+        }
+
+    if not template_answers.get("confirm_creation", {}).get("confirm_creation", False):
+        return {
+            "status": "error",
+            "message": "Wizard cannot be completed without confirmation.",
+        }
+
+    load_payload = (
+        load_php_wizard_payload if event_side == "php" else load_js_wizard_payload
+    )
+
+    def create_for_node(node_id: str) -> dict[str, Any]:
+        state = WizardState(
+            meta=_wizard_meta(event_type, event_side, node_id, nodes),
+            answers=template_answers,
+        )
+        return _execute_event_creation(load_payload(state, nodes), event_side)
+
+    def report(completed: int, total: int, outcome: TaskOutcome[Any]) -> None:
+        progress.report(
+            completed, total, f"Created events for {completed}/{total} nodes"
+        )
+
+    outcomes = run_bounded(
+        create_for_node,
+        existing_ids,
+        max_workers=EVENT_BULK_MAX_WORKERS,
+        thread_name_prefix="dib-events",
+        on_done=report,
+    )
+
+    for node_id, outcome in zip(existing_ids, outcomes):
+        if not outcome.ok:
+            results[node_id] = {
+                "node_id": node_id,
+                "status": "failed",
+                "message": outcome_error_message(outcome),
+            }
+        else:
+            creation_results = outcome.value or {}
+            results[node_id] = {
+                "node_id": node_id,
+                "status": "created" if creation_results.get("success") else "failed",
+                "message": creation_results.get("message"),
+            }
+
+    created = [
+        node_id for node_id in node_ids if results[node_id]["status"] == "created"
+    ]
+    if created:
+        # Newly created records can make cached option lists stale
+        OPTION_CACHE.clear()
+
+    if len(created) == len(node_ids):
+        status = "ok"
+    elif created:
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "created": len(created),
+        "total": len(node_ids),
+        "results": [results[node_id] for node_id in node_ids],
+    }
+
+
 @mcp.tool(
     name="get_event_wizard_state",
     title="Get Event Wizard State",
@@ -0,0 +1,124 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(get_settings().log_level)
+
+TRACING_ENABLED: bool = get_settings().tracing_enabled
+TRACE_FILE = Path(get_settings().trace_file)
+
+
+@dataclass
+class Span:
+    """
+    A timed unit of work. Spans started while another span is active (in the
+    same context, including worker threads that copied it) become its children
+    and share its trace id.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_record(
+        self, duration_ms: float, error: BaseException | None
+    ) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.started_at,
+            "duration_ms": round(duration_ms, 3),
+            "status": "error" if error is not None else "ok",
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+            "thread": threading.current_thread().name,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSON Lines file, one span per line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = self.path.open("a", encoding="utf-8")
+                self._file.write(line + "\n")
+                self._file.flush()
+            except OSError as e:
+                # Tracing must never break the traced work
+                logger.warning("Could not write span to %s: %s", self.path, e)
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "dib_current_span", default=None
+)
+_exporter = JsonlSpanExporter(TRACE_FILE)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Time the enclosed block as a span and export it when the block exits.
+
+    Yields the span (to add attributes with `span.set(...)`), or None when
+    tracing is disabled, in which case nothing is recorded.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else _new_id(16),
+        span_id=_new_id(8),
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    error: BaseException | None = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        duration_ms = (time.perf_counter() - current._started) * 1000
+        _exporter.export(current.to_record(duration_ms, error))